@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+from fastapi.datastructures import Headers
+from fastapi.responses import JSONResponse
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.auth.csrf_exc import CsrfProtectError
+from backend.auth.csrf_protect import CsrfProtect
+
+
+@dataclass(frozen=True)
+class CsrfRule:
+    """
+    Requests to `path` or anything below it (whole path segments only) whose method
+    is in `methods` must carry a valid CSRF token.
+    """
+    path: str
+    methods: frozenset[str] = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+    exempt: bool = False
+
+    def matches(self, path: str) -> bool:
+        if not path.startswith(self.path):
+            return False
+        # "/auth/login" covers "/auth/login" and "/auth/login/x", not "/auth/loginfoo"
+        return len(path) == len(self.path) or self.path.endswith("/") or path[len(self.path)] == "/"
+
+
+class CsrfMiddleware:
+    """
+    Pure ASGI CSRF check. Rules are evaluated in order, the first matching one decides;
+    requests that match no rule pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, rules: Sequence[CsrfRule], csrf_protect: CsrfProtect | None = None) -> None:
+        self.app = app
+        self.rules = tuple(rules)
+        self.csrf_protect = csrf_protect or CsrfProtect()
+
+    def _is_protected(self, path: str, method: str) -> bool:
+        for rule in self.rules:
+            if method in rule.methods and rule.matches(path):
+                return not rule.exempt
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._is_protected(scope["path"], scope["method"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        cookies = cookie_parser(headers.get("cookie", ""))
+        try:
+            self.csrf_protect.validate_token(cookies.get(self.csrf_protect.cookie_key), headers)
+        except CsrfProtectError as exc:
+            response = JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+__all__ = ("CsrfMiddleware", "CsrfRule")
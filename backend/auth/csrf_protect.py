@@ -1,9 +1,11 @@
 """
 #CREATOR: https://github.com/aekasitt/fastapi-csrf-protect
 """
-from hashlib import sha1
-from os import urandom
-from re import match
+import hmac
+import secrets
+import time
+from base64 import urlsafe_b64encode
+from hashlib import sha256
 from typing import Literal, Tuple, Callable, Any, Sequence
 
 from fastapi import Request, Response
@@ -12,8 +14,6 @@ from fastapi.datastructures import Headers
 from pydantic import ValidationError
 from pydantic_settings import BaseSettings
 
-from itsdangerous import URLSafeTimedSerializer, BadData, SignatureExpired
-
 from backend.auth.csrf_exc import InvalidHeaderError, MissingTokenError, TokenValidationError
 from backend.auth.csrf_config import LoadConfig
 
@@ -33,6 +33,9 @@ class CsrfConfig(object):
     _salt: str = "csrf-salt"
     # _token_key: str = "csrf-token"
 
+    # keyed HMAC prepared once per configuration, copied for every signature
+    _mac: "hmac.HMAC | None" = None
+
     @classmethod
     def load_config(cls, settings: Callable[..., Sequence[Tuple[str, Any]] | BaseSettings]) -> None:
         try:
@@ -50,6 +53,7 @@ class CsrfConfig(object):
             cls._token_location = config.token_location or cls._token_location
             cls._salt = config.salt or cls._salt
             # cls._token_key = config.token_key or cls._token_key
+            cls._mac = cls._build_mac(cls._secret_key, cls._salt)
 
         except ValidationError:
             raise
@@ -58,24 +62,52 @@ class CsrfConfig(object):
             print(err)
             raise TypeError('CsrfConfig must be pydantic "BaseSettings" or list of tuple')
 
+    @staticmethod
+    def _build_mac(secret_key: str | None, salt: str) -> "hmac.HMAC | None":
+        if secret_key is None:
+            return None
+        key = hmac.new(secret_key.encode("utf-8"), salt.encode("utf-8"), sha256).digest()
+        return hmac.new(key, digestmod=sha256)
+
 class CsrfProtect(CsrfConfig):
+    """
+    Double-submit token: the client echoes the random token in a header, the cookie
+    carries "<token>.<issued_at>.<hmac>" so the server can check it without state.
+    """
+
+    @property
+    def cookie_key(self) -> str:
+        return self._cookie_key
+
+    def _get_mac(self, secret_key: str | None) -> "hmac.HMAC":
+        if secret_key is not None and secret_key != self._secret_key:
+            mac = self._build_mac(secret_key, self._salt)
+        else:
+            mac = self._mac
+        if mac is None:
+            raise RuntimeError("A secret key must be provided to use CSRF protection")
+        return mac
+
+    @staticmethod
+    def _signature(mac: "hmac.HMAC", payload: str) -> str:
+        mac = mac.copy()
+        mac.update(payload.encode("ascii"))
+        return urlsafe_b64encode(mac.digest()).rstrip(b"=").decode("ascii")
 
     def generate_csrf_token(self, secret_key: str | None = None, salt: str | None = None) -> Tuple[str,str]:
-        secret_key = secret_key or self._secret_key
-        if secret_key is None:
-            raise RuntimeError("A secret key must be provided to use CSRF protection")
-        serializer = URLSafeTimedSerializer(secret_key=secret_key, salt=self._salt)
-        token = sha1(urandom(64)).hexdigest()
-        signed = serializer.dumps(token)
+        mac = self._get_mac(secret_key)
+        token = secrets.token_urlsafe(32)
+        payload = f"{token}.{int(time.time())}"
+        signed = f"{payload}.{self._signature(mac, payload)}"
         return token, signed
     
     def get_csrf_from_headers(self, headers: Headers):
         header_name, header_type = self._header_name, self._header_type
-        header_parts = None
         try:
-            header_parts = headers[header_name].split()
+            header_value = headers[header_name]
         except KeyError:
             raise InvalidHeaderError(f'Bad headers. Expected "{header_name}" in headers')
+        header_parts = header_value.split()
         token = None
         if not header_type:
             # <HeaderName>: <Token>
@@ -84,7 +116,7 @@ class CsrfProtect(CsrfConfig):
             token = header_parts[0]
         else:
         # <HeaderName>: <HeaderType> <Token>
-            if not match(r"{}\s".format(header_type), headers[header_name]) or len(header_parts) != 2:
+            if len(header_parts) != 2 or header_parts[0] != header_type or not header_value.startswith(header_type):
                 raise InvalidHeaderError(
                 f'Bad {header_name} header. Expected value "{header_type} <Token>"'
                 )
@@ -112,41 +144,54 @@ class CsrfProtect(CsrfConfig):
             httponly=self._httponly,
             samesite=self._cookie_samesite,
         )
-    
-    async def validate_csrf(
-        self, 
-        request: Request, 
+
+    def validate_token(
+        self,
+        signed_token: str | None,
+        headers: Headers,
         cookie_key: str | None = None,
         secret_key: str | None = None,
         time_limit: int | None = None,
-    ):
-        secret_key = secret_key or self._secret_key
-        if secret_key is None:
-            raise RuntimeError("A secret key is required to use CsrfProtect extension.")
-        
-        cookie_key = cookie_key or self._cookie_key
-        signed_token = request.cookies.get(cookie_key)
+    ) -> None:
+        mac = self._get_mac(secret_key)
+
         if signed_token is None:
-            raise MissingTokenError(f"Missing cookie: `{cookie_key}`.")
-        
-        time_limit = time_limit or self._max_age
+            raise MissingTokenError(f"Missing cookie: `{cookie_key or self._cookie_key}`.")
 
-        token: str
         if self._token_location == "header":
-            token = self.get_csrf_from_headers(request.headers)
+            token = self.get_csrf_from_headers(headers)
         else:
             raise InvalidHeaderError("The CSRF token must be provided in header.")
-        
-        serializer = URLSafeTimedSerializer(secret_key, salt=self._salt)
+
         try:
-            signature: str = serializer.loads(signed_token, max_age=time_limit)
-            if token != signature:
-                if token != signature:
-                    raise TokenValidationError("The CSRF signatures submitted do not match.")
-        except SignatureExpired:
-            raise TokenValidationError("The CSRF token has expired.")
-        except BadData:
+            payload, signature = signed_token.rsplit(".", 1)
+            signed_value, issued_at = payload.rsplit(".", 1)
+            issued_at = int(issued_at)
+        except ValueError:
+            raise TokenValidationError("The CSRF token is invalid.")
+
+        if not hmac.compare_digest(signature, self._signature(mac, payload)):
             raise TokenValidationError("The CSRF token is invalid.")
+        if time.time() - issued_at > (time_limit or self._max_age):
+            raise TokenValidationError("The CSRF token has expired.")
+        if not hmac.compare_digest(token, signed_value):
+            raise TokenValidationError("The CSRF signatures submitted do not match.")
+    
+    async def validate_csrf(
+        self, 
+        request: Request, 
+        cookie_key: str | None = None,
+        secret_key: str | None = None,
+        time_limit: int | None = None,
+    ):
+        cookie_key = cookie_key or self._cookie_key
+        self.validate_token(
+            request.cookies.get(cookie_key),
+            request.headers,
+            cookie_key=cookie_key,
+            secret_key=secret_key,
+            time_limit=time_limit,
+        )
 
 # class CsrfSettings(BaseSettings):
 #     secret_key: str = "aboba"
@@ -1,12 +1,11 @@
-from datetime import datetime, timezone
-
-from backend.auth.schemas import TokenData
+from backend.auth.principal_cache import principal_cache
+from backend.auth.schemas import PrincipalSchema
 from backend.auth.service import AuthService
-from backend.settings import settings
+from backend.auth.token_verifier import token_verifier
+from backend.models import UserRole
 
 from typing import Annotated
 
-import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
@@ -14,78 +13,63 @@ from jwt.exceptions import InvalidTokenError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], service: Annotated[AuthService, Depends()]):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    blocked_exception = HTTPException(
-        status_code=status.HTTP_403_FORBIDDEN,
-        detail="Blocked"
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
+async def get_token_claims(token: Annotated[str | None, Depends(oauth2_scheme)]) -> dict:
+    if not token:
+        raise credentials_exception
     try:
-        payload = jwt.decode(jwt=token, key=settings.jwt_settings.secret_key.get_secret_value(), algorithms=settings.jwt_settings.algorithm)
-        username = payload.get("sub")
-        if not username:
-            raise credentials_exception
-        
-        expire = payload.get("exp")
-        expire_time = datetime.fromtimestamp(int(expire), tz=timezone.utc)
-        if (not expire) or (expire_time < datetime.now(timezone.utc)):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Token is no longer valid!')
-        
-        token_data = TokenData(username=username)
+        return token_verifier.verify(token)
     except InvalidTokenError as exc:
         raise credentials_exception from exc
-    
-    user = await service.user_dao.find_one_or_none(username=token_data.username)
 
+async def get_principal(claims: Annotated[dict, Depends(get_token_claims)], service: Annotated[AuthService, Depends()]) -> PrincipalSchema:
+    username = claims["sub"]
+    user = await principal_cache.get(
+        username,
+        loader=lambda: service.user_dao.find_one_or_none(username=username)
+    )
     if user is None:
         raise credentials_exception
-    if user.is_blocked:
-        raise blocked_exception
-    
     return user
 
-async def get_current_user_w_verification(token: Annotated[str, Depends(oauth2_scheme)], service: Annotated[AuthService, Depends()]):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    blocked_exception = HTTPException(
-        status_code=status.HTTP_403_FORBIDDEN,
-        detail="Blocked"
-    )
-    verificated_exception = HTTPException(
-        status_code=status.HTTP_403_FORBIDDEN,
-        detail="Account is not verificated"
-    )
+async def get_current_user(user: Annotated[PrincipalSchema, Depends(get_principal)]) -> PrincipalSchema:
+    if user.is_blocked:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Blocked"
+        )
+    return user
 
-    try:
-        payload = jwt.decode(jwt=token, key=settings.jwt_settings.secret_key.get_secret_value(), algorithms=settings.jwt_settings.algorithm)
-        username = payload.get("sub")
-        if not username:
-            raise credentials_exception
-        
-        expire = payload.get("exp")
-        expire_time = datetime.fromtimestamp(int(expire), tz=timezone.utc)
-        if (not expire) or (expire_time < datetime.now(timezone.utc)):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Token is no longer valid!')
-        
-        token_data = TokenData(username=username)
-    except InvalidTokenError as exc:
-        raise credentials_exception from exc
-    
-    user = await service.user_dao.find_one_or_none(username=token_data.username)
+async def get_optional_user(
+    token: Annotated[str | None, Depends(oauth2_scheme)],
+    service: Annotated[AuthService, Depends()],
+) -> PrincipalSchema | None:
+    """None for anonymous requests; a token that is present must still be valid."""
+    if not token:
+        return None
+    claims = await get_token_claims(token)
+    user = await get_principal(claims, service)
+    return await get_current_user(user)
 
-    if user is None:
-        raise credentials_exception
-    if user.is_blocked:
-        raise blocked_exception
+async def get_current_user_w_verification(user: Annotated[PrincipalSchema, Depends(get_current_user)]) -> PrincipalSchema:
     if not user.is_verificated:
-        raise verificated_exception
-    
-    return user
\ No newline at end of file
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is not verificated"
+        )
+    return user
+
+def require_role(*roles: UserRole):
+    async def dependency(user: Annotated[PrincipalSchema, Depends(get_current_user_w_verification)]) -> PrincipalSchema:
+        if user.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return user
+    return dependency
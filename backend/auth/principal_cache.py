@@ -0,0 +1,115 @@
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from backend.auth.schemas import PrincipalSchema
+from backend.cache import TTLCache
+from backend.database.redis_client import redis_manager
+from backend.models import User
+from backend.settings import settings
+
+
+# KEYS[1] entry, KEYS[2] generation; ARGV generation seen before loading ("" for none), entry, ttl.
+# Stores the entry only if no invalidation happened since the load started. Returns 1 if stored.
+PRINCIPAL_SET_LUA = """
+local generation = redis.call('GET', KEYS[2]) or ''
+if generation ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class PrincipalCache:
+    """
+    Two-tier cache of authenticated users keyed by username.
+    The local tier has a short TTL so that invalidations done by other workers
+    (which only reach Redis) become visible quickly.
+
+    Every invalidation bumps a per-user generation counter. A miss reads the
+    generation before loading the row and stores the result only if it is
+    unchanged, so a row loaded before a commit is never cached after the
+    invalidation that followed it.
+    """
+
+    key_prefix = "principal:"
+    generation_prefix = "principal-generation:"
+
+    def __init__(self, maxsize: int, local_ttl: float, redis_ttl: int) -> None:
+        self._local = TTLCache(maxsize=maxsize, ttl=local_ttl)
+        self._redis_ttl = redis_ttl
+        self._set_script = None
+        # counts local invalidations, the same check as the Redis generation for the local tier
+        self._invalidations = 0
+
+    def _key(self, username: str) -> str:
+        return f"{self.key_prefix}{username}"
+
+    def _generation_key(self, username: str) -> str:
+        return f"{self.generation_prefix}{username}"
+
+    async def get(self, username: str, loader: Callable[[], Awaitable[User | None]]) -> PrincipalSchema | None:
+        principal = self._local.get(username)
+        if principal is not None:
+            return principal
+
+        invalidations = self._invalidations
+        try:
+            raw, generation = await redis_manager.client.mget([self._key(username), self._generation_key(username)])
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            raw, generation = None, False
+        if raw is not None:
+            principal = PrincipalSchema.model_validate_json(raw)
+            self._local.set(username, principal)
+            return principal
+
+        user = await loader()
+        if user is None:
+            return None
+        principal = PrincipalSchema.model_validate(user)
+        # without Redis the principal is only cached locally, for the local TTL
+        stored = generation is False or await self._store(username, generation, principal)
+        if stored and invalidations == self._invalidations:
+            self._local.set(username, principal)
+        return principal
+
+    async def _store(self, username: str, generation: bytes | None, principal: PrincipalSchema) -> bool:
+        try:
+            if self._set_script is None:
+                self._set_script = redis_manager.client.register_script(PRINCIPAL_SET_LUA)
+            return bool(await self._set_script(
+                keys=[self._key(username), self._generation_key(username)],
+                args=[generation or b"", principal.model_dump_json(), self._redis_ttl],
+            ))
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            return True
+
+    async def invalidate(self, *usernames: str) -> None:
+        if not usernames:
+            return
+        self._invalidations += 1
+        for username in usernames:
+            self._local.pop(username)
+        try:
+            async with redis_manager.client.pipeline(transaction=True) as pipe:
+                for username in usernames:
+                    pipe.incr(self._generation_key(username))
+                    # outlives any load that started before this invalidation
+                    pipe.expire(self._generation_key(username), self._redis_ttl)
+                pipe.delete(*(self._key(username) for username in usernames))
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.cache_settings.principal_cache_size,
+    local_ttl=settings.cache_settings.principal_local_ttl,
+    redis_ttl=settings.cache_settings.principal_redis_ttl,
+)
+
+
+__all__ = ("principal_cache",)
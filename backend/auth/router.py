@@ -9,6 +9,8 @@ from backend.auth.csrf_protect import CsrfProtect
 from backend.auth.dependencies import get_current_user
 from backend.auth.schemas import InvalidTokenResponse, OkResponse, PasswordRecoveryConfirmRequest, PasswordRecoveryRequest, Token, UserResponseSchema, UserRegisterSchema
 from backend.auth.service import AuthService
+from backend.cart.dependencies import anonymous_cart_id
+from backend.rate_limit import RateLimit, RateLimitPolicy, client_ip, rate_limiter
 
 # from backend.auth.dao_tokens import UserTokenDao
 
@@ -27,10 +29,19 @@ def get_csrf_config():
     return CsrfSettings()
 
 
+LOGIN_IP_POLICY = RateLimitPolicy("login-ip", capacity=20, refill_per_second=20 / 60)
+# keyed by (IP, username): a per-username bucket would let anyone lock a user out
+LOGIN_IP_USER_POLICY = RateLimitPolicy("login-ip-user", capacity=5, refill_per_second=5 / 60)
+REGISTER_IP_POLICY = RateLimitPolicy("register-ip", capacity=5, refill_per_second=5 / 600)
+EMAIL_IP_POLICY = RateLimitPolicy("email-ip", capacity=5, refill_per_second=5 / 600)
+EMAIL_ADDRESS_POLICY = RateLimitPolicy("email-address", capacity=3, refill_per_second=3 / 3600)
+
+
 
 @router.post(
     "/token",
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(RateLimit(LOGIN_IP_POLICY))],
     response_model=Token,
     description="Endpoint for creating access token",
     responses={
@@ -44,14 +55,27 @@ def get_csrf_config():
         }
     }
 )
-async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestFormStrict, Depends()], service: Annotated[AuthService, Depends()], response: Response) -> Token:
-    token = await service.login_for_access_token(username=form_data.username, password=form_data.password, response=response)
+async def login_for_access_token(
+    form_data: Annotated[OAuth2PasswordRequestFormStrict, Depends()],
+    service: Annotated[AuthService, Depends()],
+    request: Request,
+    response: Response,
+    cart_id: Annotated[str | None, Depends(anonymous_cart_id)],
+) -> Token:
+    await rate_limiter.hit(LOGIN_IP_USER_POLICY, f"{client_ip(request)}:{form_data.username}")
+    token = await service.login_for_access_token(
+        username=form_data.username,
+        password=form_data.password,
+        response=response,
+        cart_id=cart_id,
+    )
     return token
 
 
 @router.post(
     "/register",
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RateLimit(REGISTER_IP_POLICY))],
     response_model=UserResponseSchema,
     description="Endpoint for registration",
     responses={
@@ -72,6 +96,7 @@ async def register_new_user(user_data: UserRegisterSchema, service: Annotated[Au
 @router.post(
     "/resend-email-verification",
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(RateLimit(EMAIL_IP_POLICY))],
     response_model=OkResponse,
     description="Resend verification message",
     responses={
@@ -86,6 +111,7 @@ async def register_new_user(user_data: UserRegisterSchema, service: Annotated[Au
     }
 )
 async def resend_verification_message(data: PasswordRecoveryRequest, service: Annotated[AuthService, Depends()]) -> OkResponse:
+    await rate_limiter.hit(EMAIL_ADDRESS_POLICY, data.email)
     response = await service.resend_verification_message(data=data)
     return response
 
@@ -114,6 +140,7 @@ async def register_confirmation(token:str,  service: Annotated[AuthService, Depe
 @router.post(
     "/password-recovery",
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(RateLimit(EMAIL_IP_POLICY))],
     response_model=OkResponse,
     description="Endpoint for password recovery",
     responses={
@@ -132,6 +159,7 @@ async def register_confirmation(token:str,  service: Annotated[AuthService, Depe
     }
 )
 async def reset_password(data: PasswordRecoveryRequest, service: Annotated[AuthService, Depends()]) -> OkResponse:
+    await rate_limiter.hit(EMAIL_ADDRESS_POLICY, data.email)
     response = await service.reset_password(data=data)
     return response
 
@@ -165,7 +193,7 @@ async def get_me(current_user: Annotated[UserResponseSchema, Depends(get_current
     return {"aboba":"aboba"}
 
 @router.post("/me")
-async def post_me(current_user: Annotated[UserResponseSchema, Depends(get_current_user)], csrf_protect: Annotated[CsrfProtect, Depends()], request: Request, response: Response):
-    await csrf_protect.validate_csrf(request)
+async def post_me(current_user: Annotated[UserResponseSchema, Depends(get_current_user)], csrf_protect: Annotated[CsrfProtect, Depends()], response: Response):
+    # CSRF token is checked by CsrfMiddleware
     csrf_protect.unset_csrf_cookie(response)
     return {"aboba":"aboba"}
@@ -1,7 +1,12 @@
+import datetime
 import re
 
+from uuid import UUID
+
 from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationInfo, field_validator
 
+from backend.models import UserRole
+
 
 class UserRegisterSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -42,6 +47,19 @@ class UserResponseSchema(BaseModel):
     last_name: str
     is_verificated: bool = False
 
+class PrincipalSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    username: str
+    email: EmailStr
+    first_name: str
+    last_name: str
+    role: UserRole
+    is_verificated: bool = False
+    is_blocked: bool = False
+    updated_at: datetime.datetime | None = None
+
 class Token(BaseModel):
     access_token: str
     token_type: str
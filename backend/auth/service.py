@@ -1,28 +1,36 @@
 from fastapi import Depends, HTTPException, Response, status
 
 from itsdangerous import BadSignature, URLSafeTimedSerializer
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 
+from backend.auth.principal_cache import principal_cache
 from backend.auth.schemas import OkResponse, PasswordRecoveryConfirmRequest, PasswordRecoveryRequest, Token, UserResponseSchema, UserRegisterSchema
-from backend.auth.tasks import send_confirm_email, send_passw_recovery_email
-from backend.auth.utils import create_token, hash_password, verify_password
+from backend.auth.utils import create_token, hash_password_async, verify_password_or_dummy_async
+from backend.cart.store import CartOwner, CartStore, get_cart_store
 from backend.database.db import get_session
+from backend.outbox.dao_outbox import OutboxDao
+from backend.outbox.events import OutboxEventType, outbox_event
+from backend.outbox.tasks import relay_after_commit
 from backend.users.dao_users import UserDao
 
 from backend.settings import settings
 
 class AuthService:
     
-    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+    def __init__(self, session: AsyncSession = Depends(get_session), cart_store: CartStore = Depends(get_cart_store)) -> None:
         self.user_dao = UserDao(session)
+        self.outbox_dao = OutboxDao(session)
+        self.cart_store = cart_store
 
 
-    async def login_for_access_token(self, *, username: str, password: str, response: Response) -> Token:
+    async def login_for_access_token(self, *, username: str, password: str, response: Response, cart_id: str | None = None) -> Token:
         user = await self.user_dao.find_one_or_none(username=username)
 
-        if verify_password(plain_password=password, hashed_password=user.password) is False:
+        hashed_password = user.password if user is not None else None
+        if await verify_password_or_dummy_async(plain_password=password, hashed_password=hashed_password) is False:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
@@ -32,23 +40,13 @@ class AuthService:
         access_token = create_token(data={"sub": user.username, "role": user.role}, expire_time_minutes=60*24)
 
         response.set_cookie(key="access_token", value=access_token, httponly=True, secure=True, samesite='lax')
+
+        if cart_id is not None:
+            await self._merge_anonymous_cart(cart_id=cart_id, user_id=user.id)
+            response.delete_cookie(key="cart_id", httponly=True, secure=True, samesite='lax')
         return Token(access_token=access_token, token_type="Bearer")
     
-    async def register_new_user(self, *, user_data: UserRegisterSchema) -> UserResponseSchema:
-        user_username = await self.user_dao.find_one_or_none(username=user_data.username)
-        user_email = await self.user_dao.find_one_or_none(email=user_data.email)
-        if user_username or user_email:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="User already exists"
-            )
-
-        user_dict = user_data.model_dump()
-        user_dict["password"] = hash_password(user_data.password)
-        user_dict.pop("repeat_password")
-
-        await self.user_dao.add_user(**user_dict)
-
+    async def _commit(self) -> None:
         try:
             await self.user_dao.session.commit()
         except SQLAlchemyError as e:
@@ -58,10 +56,34 @@ class AuthService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Oops.. Something unexpected happened"
             )
-        
-        serializer = URLSafeTimedSerializer(secret_key=settings.url_secret_keys.secret_key_url_reg.get_secret_value())
-        confirm_token = serializer.dumps(user_dict["email"])
-        await send_confirm_email(to_email=user_dict["email"], token=confirm_token)
+
+    async def _merge_anonymous_cart(self, *, cart_id: str, user_id) -> None:
+        # a failed merge must not fail the login, the anonymous cart simply expires
+        try:
+            await self.cart_store.merge(CartOwner.anonymous(cart_id), CartOwner.user(user_id))
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+
+    async def register_new_user(self, *, user_data: UserRegisterSchema) -> UserResponseSchema:
+        user_dict = user_data.model_dump()
+        user_dict["password"] = await hash_password_async(user_data.password)
+        user_dict.pop("repeat_password")
+
+        new_user = await self.user_dao.insert_user(**user_dict)
+        if new_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User already exists"
+            )
+        # the confirmation mail is sent by the outbox relay once this commits
+        await self.outbox_dao.add(outbox_event(
+            OutboxEventType.USER_REGISTERED,
+            aggregate_type="user",
+            aggregate_id=new_user.id,
+            payload={"email": new_user.email},
+        ))
+        await self._commit()
+        await relay_after_commit()
         return UserResponseSchema(**user_dict)
         
     async def resend_verification_message(self, *, data: PasswordRecoveryRequest) -> OkResponse:
@@ -73,11 +95,15 @@ class AuthService:
         
         if user.is_verificated:
             return OkResponse(status=f'{data.email} already verificated.')
-        
-        serializer = URLSafeTimedSerializer(secret_key=settings.url_secret_keys.secret_key_url_reg.get_secret_value())
-        confirm_token = serializer.dumps(data.email)
-        await send_confirm_email(to_email=data.email, token=confirm_token)
 
+        await self.outbox_dao.add(outbox_event(
+            OutboxEventType.USER_VERIFICATION_REQUESTED,
+            aggregate_type="user",
+            aggregate_id=user.id,
+            payload={"email": data.email},
+        ))
+        await self._commit()
+        await relay_after_commit()
         return OkResponse()
     
     async def register_confirmation(self, *, token: str) -> OkResponse:
@@ -88,17 +114,9 @@ class AuthService:
             raise HTTPException(  
                 status_code=400, detail="Token is invalid or expired!"  
             )
-        await self.user_dao.update_verification(email=email)
-
-        try:
-            await self.user_dao.session.commit()
-        except SQLAlchemyError as e:
-            await self.user_dao.session.rollback()
-            print(f"SQLAlchemyError: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Oops.. Something unexpected happened"
-            )
+        usernames = await self.user_dao.update_verification(email=email)
+        await self._commit()
+        await principal_cache.invalidate(*usernames)
         return OkResponse()
     
     async def reset_password(self, *, data: PasswordRecoveryRequest) -> OkResponse:
@@ -108,9 +126,14 @@ class AuthService:
                 status_code=404, detail=f"User with email {data.email} not found."  
             )
         
-        serializer = URLSafeTimedSerializer(secret_key=settings.url_secret_keys.secret_key_url_pwd.get_secret_value())
-        password_recovery_token = serializer.dumps(data.email)
-        await send_passw_recovery_email(to_email=data.email, token=password_recovery_token)
+        await self.outbox_dao.add(outbox_event(
+            OutboxEventType.USER_PASSWORD_RECOVERY_REQUESTED,
+            aggregate_type="user",
+            aggregate_id=user.id,
+            payload={"email": data.email},
+        ))
+        await self._commit()
+        await relay_after_commit()
         return OkResponse()
     
     async def reset_password_confirm(self, *, token: str, passwords: PasswordRecoveryConfirmRequest) -> OkResponse:
@@ -122,17 +145,9 @@ class AuthService:
                 status_code=400, detail="Token is invalid or expired!"  
             )
         
-        new_passw_hash = hash_password(password=passwords.new_password)
-        await self.user_dao.update_password(email=email, new_passw=new_passw_hash)
-
-        try:
-            await self.user_dao.session.commit()
-        except SQLAlchemyError as e:
-            await self.user_dao.session.rollback()
-            print(f"SQLAlchemyError: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Oops.. Something unexpected happened"
-            )
+        new_passw_hash = await hash_password_async(password=passwords.new_password)
+        usernames = await self.user_dao.update_password(email=email, new_passw=new_passw_hash)
+        await self._commit()
+        await principal_cache.invalidate(*usernames)
         return OkResponse()
 
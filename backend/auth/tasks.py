@@ -1,64 +1,73 @@
-import aiosmtplib
+import asyncio
+import threading
 from email.message import EmailMessage
 
-from backend.settings import settings
+import aiosmtplib
+from itsdangerous import URLSafeTimedSerializer
 
-async def send_confirm_email(to_email: str, token:str) -> None:
-    confirm_url = f"http://127.0.0.1:8000/api/v1/auth/register-confirm?token={token}"
-    print(confirm_url)
-    text = f"""Thank you for registration! For verification, follow the link: {confirm_url}"""
+from backend.celery_app import celery_app, run_in_worker_loop
+from backend.mail.dispatcher import MailDispatcher, create_mail_dispatcher
+from backend.settings import settings
 
+def build_message(to_email: str, subject: str, text: str) -> EmailMessage:
     message = EmailMessage()
     message.set_content(text)
     message["From"] = settings.email_settings.email_username
-    print(settings.email_settings.email_username)
     message["To"] = to_email
-    print(to_email)
-    message["Subject"] = "Email confirmation"
-
-
-    async with aiosmtplib.SMTP(
-        hostname=settings.email_settings.email_host, 
-        port=settings.email_settings.email_port,
-        use_tls=True
-    ) as smtp:
-        try:
-            resp = await smtp.login(
-                settings.email_settings.email_username,
-                settings.email_settings.email_password.get_secret_value(),
-            )
-            print(resp.code)
-        except Exception as err:
-            raise aiosmtplib.SMTPException("Couldnt login") from err
-        await smtp.send_message(message)
-
-
-async def send_passw_recovery_email(to_email: str, token:str) -> None:
+    message["Subject"] = subject
+    return message
+
+
+def build_confirm_email(to_email: str, token: str) -> EmailMessage:
+    confirm_url = f"http://127.0.0.1:8000/api/v1/auth/register-confirm?token={token}"
+    text = f"""Thank you for registration! For verification, follow the link: {confirm_url}"""
+    return build_message(to_email, "Email confirmation", text)
+
+
+def build_passw_recovery_email(to_email: str, token: str) -> EmailMessage:
     confirm_url = f"http://127.0.0.1:8000/api/v1/auth/password-recovery-confirm?token={token}"
-    print(confirm_url)
     text = f"""For password recovery follow the link: {confirm_url}"""
+    return build_message(to_email, "Password recovery", text)
 
-    message = EmailMessage()
-    message.set_content(text)
-    message["From"] = settings.email_settings.email_username
-    print(settings.email_settings.email_username)
-    message["To"] = to_email
-    print(to_email)
-    message["Subject"] = "Password recovery"
-
-
-    async with aiosmtplib.SMTP(
-        hostname=settings.email_settings.email_host, 
-        port=settings.email_settings.email_port,
-        use_tls=True
-    ) as smtp:
-        try:
-            resp = await smtp.login(
-                settings.email_settings.email_username,
-                settings.email_settings.email_password.get_secret_value(),
-            )
-            print(resp.code)
-        except Exception as err:
-            raise aiosmtplib.SMTPException("Couldnt login") from err
-        await smtp.send_message(message)
-        
\ No newline at end of file
+
+EMAIL_BUILDERS = {
+    "confirm": build_confirm_email,
+    "password_recovery": build_passw_recovery_email,
+}
+
+_worker_state = threading.local()
+
+def _get_worker_dispatcher() -> MailDispatcher:
+    # one dispatcher per worker thread, bound to that thread's event loop
+    if getattr(_worker_state, "dispatcher", None) is None:
+        _worker_state.dispatcher = create_mail_dispatcher()
+    return _worker_state.dispatcher
+
+
+@celery_app.task(
+    name="auth.send_email",
+    autoretry_for=(aiosmtplib.SMTPException, OSError),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=settings.celery_settings.celery_email_max_retries,
+)
+def send_email(kind: str, to_email: str) -> None:
+    # minted on every attempt, a retry after a long backoff still mails a link with its full max_age
+    message = EMAIL_BUILDERS[kind](to_email, email_token(kind, to_email))
+    run_in_worker_loop(_get_worker_dispatcher().send(message))
+
+
+EMAIL_TOKEN_SECRETS = {
+    "confirm": settings.url_secret_keys.secret_key_url_reg,
+    "password_recovery": settings.url_secret_keys.secret_key_url_pwd,
+}
+
+def email_token(kind: str, to_email: str) -> str:
+    serializer = URLSafeTimedSerializer(secret_key=EMAIL_TOKEN_SECRETS[kind].get_secret_value())
+    return serializer.dumps(to_email)
+
+
+async def enqueue_email(kind: str, to_email: str) -> None:
+    # publishing talks to the broker synchronously (and runs the task inline in eager mode)
+    await asyncio.to_thread(send_email.delay, kind, to_email)
@@ -0,0 +1,43 @@
+import time
+from hashlib import sha256
+from typing import Sequence
+
+import jwt
+from jwt.exceptions import InvalidTokenError
+
+from backend.cache import TTLCache
+from backend.settings import settings
+
+
+class TokenVerifier:
+    """
+    Decodes access tokens with key material prepared once at startup and keeps
+    decoded claims in memory, keyed by token digest, until the token expires.
+    """
+
+    def __init__(self, key: str, algorithms: Sequence[str], cache_size: int = 10000) -> None:
+        self._key = key
+        self._algorithms = list(algorithms)
+        self._options = {"require": ["exp", "sub"]}
+        self._claims = TTLCache(maxsize=cache_size, ttl=0)
+
+    def verify(self, token: str) -> dict:
+        digest = sha256(token.encode("utf-8")).digest()
+        claims = self._claims.get(digest)
+        if claims is not None:
+            return claims
+
+        claims = jwt.decode(jwt=token, key=self._key, algorithms=self._algorithms, options=self._options)
+        if not claims.get("sub"):
+            raise InvalidTokenError("Token has no subject")
+        self._claims.set(digest, claims, ttl=claims["exp"] - time.time())
+        return claims
+
+
+token_verifier = TokenVerifier(
+    key=settings.jwt_settings.secret_key.get_secret_value(),
+    algorithms=[settings.jwt_settings.algorithm],
+)
+
+
+__all__ = ("token_verifier",)
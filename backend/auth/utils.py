@@ -1,5 +1,8 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 import bcrypt
-from fastapi import Request
+from fastapi import HTTPException, Request, status
 
 import jwt
 
@@ -19,6 +22,108 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     hashed_password_bytes = hashed_password.encode("utf-8")
     return bcrypt.checkpw(password = password_byte_enc , hashed_password = hashed_password_bytes)
 
+
+# bcrypt hash (default cost) of a random password nobody knows. Unknown usernames are
+# verified against it so a failed login costs the same with or without a real account.
+DUMMY_PASSWORD_HASH = "$2b$12$cGWEZV6.lJt2ptil.FGAl.mWPlFh2WRzgGH6crOkPN88DJr.nZMdW"
+
+
+class PoolSaturatedError(Exception):
+    pass
+
+
+class HasherPool:
+    """
+    Bounded executor for bcrypt work. At most `max_workers` jobs run at once,
+    at most `max_queue` more wait for a worker, everything beyond that is rejected
+    immediately instead of piling up behind the event loop.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_queue: int) -> None:
+        self._kind = kind
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self._max_workers)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self._kind,
+            "max_workers": self._max_workers,
+            "max_queue": self._max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    async def run(self, func, *args):
+        if self._in_flight >= self._max_workers + self._max_queue:
+            self._rejected += 1
+            raise PoolSaturatedError(f"Hasher pool is saturated ({self._in_flight} jobs in flight)")
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+            self._completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hasher_pool = HasherPool(
+    kind=settings.hashing_settings.hash_pool_kind,
+    max_workers=settings.hashing_settings.hash_pool_workers,
+    max_queue=settings.hashing_settings.hash_pool_max_queue,
+)
+
+
+async def _run_in_hasher_pool(func, *args):
+    try:
+        return await hasher_pool.run(func, *args)
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hasher_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hasher_pool(verify_password, plain_password, hashed_password)
+
+
+async def verify_password_or_dummy_async(plain_password: str, hashed_password: str | None) -> bool:
+    if hashed_password is None:
+        await _run_in_hasher_pool(verify_password, plain_password, DUMMY_PASSWORD_HASH)
+        return False
+    return await verify_password_async(plain_password=plain_password, hashed_password=hashed_password)
+
+
 def generate_fingerprint(request: Request):
     user_agent = request.headers.get("User-Agent")
     ip_address = request.client.host
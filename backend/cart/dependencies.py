@@ -0,0 +1,39 @@
+import secrets
+from typing import Annotated
+
+from fastapi import Depends, Request, Response
+
+from backend.auth.dependencies import get_optional_user
+from backend.auth.schemas import PrincipalSchema
+from backend.cart.store import CartOwner
+from backend.settings import settings
+
+
+CART_COOKIE = "cart_id"
+
+
+def anonymous_cart_id(request: Request) -> str | None:
+    cart_id = request.cookies.get(CART_COOKIE)
+    if cart_id and len(cart_id) <= 64 and cart_id.replace("-", "").replace("_", "").isalnum():
+        return cart_id
+    return None
+
+
+async def get_cart_owner(
+    request: Request,
+    response: Response,
+    user: Annotated[PrincipalSchema | None, Depends(get_optional_user)],
+) -> CartOwner:
+    """Signed-in users own their cart by id, anonymous visitors by a random cookie."""
+    if user is not None:
+        return CartOwner.user(user.id)
+    cart_id = anonymous_cart_id(request) or secrets.token_urlsafe(24)
+    response.set_cookie(
+        key=CART_COOKIE,
+        value=cart_id,
+        max_age=settings.cart_settings.cart_anonymous_ttl,
+        httponly=True,
+        secure=True,
+        samesite="lax",
+    )
+    return CartOwner.anonymous(cart_id)
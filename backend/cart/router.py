@@ -0,0 +1,130 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, status
+
+from backend.cart.dependencies import get_cart_owner
+from backend.cart.schemas import CartItemUpdateSchema, CartItemsAddSchema, CartSchema
+from backend.cart.service import CartService
+from backend.cart.store import CartOwner
+
+
+router = APIRouter()
+
+cart_unavailable = {
+    status.HTTP_503_SERVICE_UNAVAILABLE: {
+        "description": "Cart store is unavailable",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Cart is temporarily unavailable"}
+            }
+        }
+    }
+}
+
+
+@router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=CartSchema,
+    description="Current cart with live prices. Anonymous visitors are tracked by the cart_id cookie",
+    responses=cart_unavailable,
+)
+async def get_cart(
+    owner: Annotated[CartOwner, Depends(get_cart_owner)],
+    service: Annotated[CartService, Depends()],
+) -> CartSchema:
+    response = await service.get_cart(owner=owner)
+    return response
+
+
+@router.post(
+    "/items",
+    status_code=status.HTTP_200_OK,
+    response_model=CartSchema,
+    description="Add one or more products; quantities are added to what is already in the cart",
+    responses={
+        **cart_unavailable,
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Unknown products",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Products not found: 3fa85f64-5717-4562-b3fc-2c963f66afa6"}
+                }
+            }
+        },
+        status.HTTP_409_CONFLICT: {
+            "description": "Cart is full",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "A cart holds at most 100 products"}
+                }
+            }
+        },
+    },
+)
+async def add_cart_items(
+    data: CartItemsAddSchema,
+    owner: Annotated[CartOwner, Depends(get_cart_owner)],
+    service: Annotated[CartService, Depends()],
+) -> CartSchema:
+    response = await service.add_items(owner=owner, data=data)
+    return response
+
+
+@router.put(
+    "/items/{product_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=CartSchema,
+    description="Set the quantity of a product in the cart, 0 removes it",
+    responses={
+        **cart_unavailable,
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Product is not in the cart",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Product is not in the cart"}
+                }
+            }
+        },
+    },
+)
+async def update_cart_item(
+    product_id: UUID,
+    data: CartItemUpdateSchema,
+    owner: Annotated[CartOwner, Depends(get_cart_owner)],
+    service: Annotated[CartService, Depends()],
+) -> CartSchema:
+    response = await service.update_item(owner=owner, product_id=product_id, quantity=data.quantity)
+    return response
+
+
+@router.delete(
+    "/items/{product_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=CartSchema,
+    description="Remove a product from the cart",
+    responses=cart_unavailable,
+)
+async def remove_cart_item(
+    product_id: UUID,
+    owner: Annotated[CartOwner, Depends(get_cart_owner)],
+    service: Annotated[CartService, Depends()],
+) -> CartSchema:
+    response = await service.remove_item(owner=owner, product_id=product_id)
+    return response
+
+
+@router.post(
+    "/clear",
+    status_code=status.HTTP_200_OK,
+    response_model=CartSchema,
+    description="Empty the cart",
+    responses=cart_unavailable,
+)
+async def clear_cart(
+    owner: Annotated[CartOwner, Depends(get_cart_owner)],
+    service: Annotated[CartService, Depends()],
+) -> CartSchema:
+    response = await service.clear(owner=owner)
+    return response
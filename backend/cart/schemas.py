@@ -0,0 +1,28 @@
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class CartItemAddSchema(BaseModel):
+    product_id: UUID
+    quantity: int = Field(default=1, ge=1, le=1000)
+
+class CartItemsAddSchema(BaseModel):
+    items: list[CartItemAddSchema] = Field(default=..., min_length=1, max_length=100)
+
+class CartItemUpdateSchema(BaseModel):
+    quantity: int = Field(default=..., ge=0, le=1000, description="0 removes the product from the cart")
+
+class CartLineSchema(BaseModel):
+    product_id: UUID
+    product_name: str
+    quantity: int
+    unit_price: Decimal
+    line_total: Decimal
+    available: bool
+
+class CartSchema(BaseModel):
+    items: list[CartLineSchema]
+    item_count: int
+    total: Decimal
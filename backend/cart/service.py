@@ -0,0 +1,133 @@
+from decimal import Decimal
+from typing import Awaitable, TypeVar
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.cart.schemas import CartItemsAddSchema, CartLineSchema, CartSchema
+from backend.cart.store import CartFullError, CartOwner, CartStore, get_cart_store
+from backend.database.db import get_read_session
+from backend.products.dao_products import ProductDao
+from backend.products.hot_inventory import hot_inventory
+
+
+T = TypeVar("T")
+
+
+def unit_price(price: Decimal, discount: Decimal) -> Decimal:
+    return max(price - discount, Decimal("0"))
+
+
+class CartService:
+    """
+    The cart lives only in the store (Redis); prices and stock are always read
+    from the catalog in one batched query, so a cart never shows a stale price.
+    Nothing is written to Postgres until checkout.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_read_session),
+        store: CartStore = Depends(get_cart_store),
+    ) -> None:
+        self.product_dao = ProductDao(session)
+        self.store = store
+
+    async def _call(self, operation: Awaitable[T]) -> T:
+        try:
+            return await operation
+        except CartFullError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Cart is temporarily unavailable"
+            )
+
+    async def _find_prices(self, product_ids) -> dict[UUID, Row | None]:
+        """Catalog rows by product id, None for products that no longer exist."""
+        products = await self.product_dao.find_prices(list(product_ids))
+        return {product_id: products.get(product_id) for product_id in product_ids}
+
+    async def _priced(self, owner: CartOwner, items: dict[UUID, int], prices: dict[UUID, Row | None] | None = None) -> CartSchema:
+        """`prices` already looked up by the caller; only lines it does not cover are queried."""
+        prices = dict(prices or {})
+        unpriced = [product_id for product_id in items if product_id not in prices]
+        if unpriced:
+            prices.update(await self._find_prices(unpriced))
+        gone = [product_id for product_id in items if prices[product_id] is None]
+        if gone:
+            await self._call(self.store.remove(owner, gone))
+
+        # product_quantity of hot products is only the last write-back, their stock is the Redis counter
+        hot = [product_id for product_id in items if prices[product_id] is not None and prices[product_id].is_hot_inventory]
+        counters = await self._call(hot_inventory.counters(hot))
+
+        lines = []
+        for product_id, quantity in items.items():
+            product = prices[product_id]
+            if product is None:
+                continue
+            price = unit_price(product.product_price, product.product_discount)
+            # a missing counter reads as out of stock, as it does at checkout
+            stock = (counters[product_id] or 0) if product.is_hot_inventory else product.product_quantity
+            lines.append(CartLineSchema(
+                product_id=product_id,
+                product_name=product.product_name,
+                quantity=quantity,
+                unit_price=price,
+                line_total=price * quantity,
+                available=stock >= quantity,
+            ))
+        return CartSchema(
+            items=lines,
+            item_count=sum(line.quantity for line in lines),
+            total=sum((line.line_total for line in lines), Decimal("0")),
+        )
+
+    async def get_cart(self, *, owner: CartOwner) -> CartSchema:
+        items = await self._call(self.store.get(owner))
+        return await self._priced(owner, items)
+
+    async def add_items(self, *, owner: CartOwner, data: CartItemsAddSchema) -> CartSchema:
+        additions: dict[UUID, int] = {}
+        for item in data.items:
+            additions[item.product_id] = additions.get(item.product_id, 0) + item.quantity
+
+        # one catalog lookup validates the additions and prices the lines already in the cart
+        current = await self._call(self.store.get(owner))
+        prices = await self._find_prices(additions.keys() | current.keys())
+        unknown = [str(product_id) for product_id in additions if prices[product_id] is None]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Products not found: {', '.join(unknown)}"
+            )
+
+        items = await self._call(self.store.add(owner, additions))
+        return await self._priced(owner, items, prices)
+
+    async def update_item(self, *, owner: CartOwner, product_id: UUID, quantity: int) -> CartSchema:
+        # the store only touches a line that is still there, a concurrent remove wins
+        items = await self._call(self.store.set_quantity(owner, product_id, quantity))
+        if items is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product is not in the cart"
+            )
+        return await self._priced(owner, items)
+
+    async def remove_item(self, *, owner: CartOwner, product_id: UUID) -> CartSchema:
+        await self._call(self.store.remove(owner, [product_id]))
+        return await self.get_cart(owner=owner)
+
+    async def clear(self, *, owner: CartOwner) -> CartSchema:
+        await self._call(self.store.clear(owner))
+        return CartSchema(items=[], item_count=0, total=Decimal("0"))
@@ -0,0 +1,235 @@
+import time
+from dataclasses import dataclass
+from typing import Protocol
+from uuid import UUID
+
+from backend.database.redis_client import redis_manager
+from backend.settings import settings
+
+
+@dataclass(frozen=True)
+class CartOwner:
+    key: str
+    ttl: int
+
+    @classmethod
+    def user(cls, user_id: UUID) -> "CartOwner":
+        return cls(f"user:{user_id}", settings.cart_settings.cart_ttl)
+
+    @classmethod
+    def anonymous(cls, cart_id: str) -> "CartOwner":
+        return cls(f"anon:{cart_id}", settings.cart_settings.cart_anonymous_ttl)
+
+
+class CartFullError(Exception):
+    pass
+
+
+class CartStore(Protocol):
+    async def get(self, owner: CartOwner) -> dict[UUID, int]: ...
+    async def add(self, owner: CartOwner, items: dict[UUID, int]) -> dict[UUID, int]: ...
+    async def set_quantity(self, owner: CartOwner, product_id: UUID, quantity: int) -> dict[UUID, int] | None: ...
+    async def remove(self, owner: CartOwner, product_ids: list[UUID]) -> None: ...
+    async def clear(self, owner: CartOwner) -> None: ...
+    async def merge(self, source: CartOwner, target: CartOwner) -> int: ...
+
+
+# KEYS[1] cart; ARGV ttl, max quantity, max items, then product_id / delta pairs.
+# Returns the whole cart after the add as HGETALL does, or -1 when the new lines do not fit.
+CART_ADD_LUA = """
+local max_quantity = tonumber(ARGV[2])
+local max_items = tonumber(ARGV[3])
+local new_lines = 0
+for i = 4, #ARGV, 2 do
+    if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 0 then
+        new_lines = new_lines + 1
+    end
+end
+if redis.call('HLEN', KEYS[1]) + new_lines > max_items then
+    return -1
+end
+for i = 4, #ARGV, 2 do
+    local quantity = redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+    if quantity > max_quantity then
+        redis.call('HSET', KEYS[1], ARGV[i], max_quantity)
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# KEYS[1] cart; ARGV ttl, product_id, quantity (already capped, 0 removes the line).
+# Only touches a line that is still in the cart: returns the whole cart, or -1 if the line is gone.
+CART_SET_LUA = """
+if redis.call('HEXISTS', KEYS[1], ARGV[2]) == 0 then
+    return -1
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+else
+    redis.call('HDEL', KEYS[1], ARGV[2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# KEYS[1] source cart, KEYS[2] target cart; ARGV ttl, max quantity, max items.
+# Lines that no longer fit into the target are dropped. Returns the number of merged lines.
+CART_MERGE_LUA = """
+local max_quantity = tonumber(ARGV[2])
+local max_items = tonumber(ARGV[3])
+local source = redis.call('HGETALL', KEYS[1])
+local merged = 0
+for i = 1, #source, 2 do
+    local field = source[i]
+    if redis.call('HEXISTS', KEYS[2], field) == 1 or redis.call('HLEN', KEYS[2]) < max_items then
+        local quantity = redis.call('HINCRBY', KEYS[2], field, source[i + 1])
+        if quantity > max_quantity then
+            redis.call('HSET', KEYS[2], field, max_quantity)
+        end
+        merged = merged + 1
+    end
+end
+redis.call('DEL', KEYS[1])
+if merged > 0 then
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+end
+return merged
+"""
+
+
+class RedisCartStore:
+    """
+    One hash per cart (product_id -> quantity) with a sliding TTL.
+    Multi-item and conditional writes are a single Lua call that returns the resulting cart.
+    """
+
+    key_prefix = "cart:"
+
+    def __init__(self, max_items: int, max_quantity: int) -> None:
+        self._max_items = max_items
+        self._max_quantity = max_quantity
+        self._add_script = None
+        self._set_script = None
+        self._merge_script = None
+
+    def _key(self, owner: CartOwner) -> str:
+        return f"{self.key_prefix}{owner.key}"
+
+    @staticmethod
+    def _parse_flat(raw: list) -> dict[UUID, int]:
+        return {UUID(raw[i].decode()): int(raw[i + 1]) for i in range(0, len(raw), 2)}
+
+    async def get(self, owner: CartOwner) -> dict[UUID, int]:
+        async with redis_manager.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._key(owner))
+            pipe.expire(self._key(owner), owner.ttl)
+            raw, _ = await pipe.execute()
+        return {UUID(product_id.decode()): int(quantity) for product_id, quantity in raw.items()}
+
+    async def add(self, owner: CartOwner, items: dict[UUID, int]) -> dict[UUID, int]:
+        if self._add_script is None:
+            self._add_script = redis_manager.client.register_script(CART_ADD_LUA)
+        args = [owner.ttl, self._max_quantity, self._max_items]
+        for product_id, quantity in items.items():
+            args += [str(product_id), quantity]
+        result = await self._add_script(keys=[self._key(owner)], args=args)
+        if result == -1:
+            raise CartFullError(f"A cart holds at most {self._max_items} products")
+        return self._parse_flat(result)
+
+    async def set_quantity(self, owner: CartOwner, product_id: UUID, quantity: int) -> dict[UUID, int] | None:
+        if self._set_script is None:
+            self._set_script = redis_manager.client.register_script(CART_SET_LUA)
+        result = await self._set_script(
+            keys=[self._key(owner)],
+            args=[owner.ttl, str(product_id), max(0, min(quantity, self._max_quantity))],
+        )
+        if result == -1:
+            return None
+        return self._parse_flat(result)
+
+    async def remove(self, owner: CartOwner, product_ids: list[UUID]) -> None:
+        if product_ids:
+            await redis_manager.client.hdel(self._key(owner), *(str(product_id) for product_id in product_ids))
+
+    async def clear(self, owner: CartOwner) -> None:
+        await redis_manager.client.delete(self._key(owner))
+
+    async def merge(self, source: CartOwner, target: CartOwner) -> int:
+        if self._merge_script is None:
+            self._merge_script = redis_manager.client.register_script(CART_MERGE_LUA)
+        return int(await self._merge_script(
+            keys=[self._key(source), self._key(target)],
+            args=[target.ttl, self._max_quantity, self._max_items],
+        ))
+
+
+class InMemoryCartStore:
+    """Same semantics as RedisCartStore inside one process, for tests (app.dependency_overrides)."""
+
+    def __init__(self, max_items: int, max_quantity: int) -> None:
+        self._max_items = max_items
+        self._max_quantity = max_quantity
+        self._carts: dict[str, tuple[dict[UUID, int], float]] = {}
+
+    def _cart(self, owner: CartOwner) -> dict[UUID, int]:
+        cart, expires_at = self._carts.get(owner.key, ({}, 0.0))
+        if expires_at <= time.monotonic():
+            cart = {}
+        self._carts[owner.key] = (cart, time.monotonic() + owner.ttl)
+        return cart
+
+    async def get(self, owner: CartOwner) -> dict[UUID, int]:
+        return dict(self._cart(owner))
+
+    async def add(self, owner: CartOwner, items: dict[UUID, int]) -> dict[UUID, int]:
+        cart = self._cart(owner)
+        if len(cart) + len([product_id for product_id in items if product_id not in cart]) > self._max_items:
+            raise CartFullError(f"A cart holds at most {self._max_items} products")
+        for product_id, quantity in items.items():
+            cart[product_id] = min(cart.get(product_id, 0) + quantity, self._max_quantity)
+        return dict(cart)
+
+    async def set_quantity(self, owner: CartOwner, product_id: UUID, quantity: int) -> dict[UUID, int] | None:
+        cart = self._cart(owner)
+        if product_id not in cart:
+            return None
+        if quantity > 0:
+            cart[product_id] = min(quantity, self._max_quantity)
+        else:
+            cart.pop(product_id)
+        return dict(cart)
+
+    async def remove(self, owner: CartOwner, product_ids: list[UUID]) -> None:
+        cart = self._cart(owner)
+        for product_id in product_ids:
+            cart.pop(product_id, None)
+
+    async def clear(self, owner: CartOwner) -> None:
+        self._carts.pop(owner.key, None)
+
+    async def merge(self, source: CartOwner, target: CartOwner) -> int:
+        source_cart = self._cart(source)
+        target_cart = self._cart(target)
+        merged = 0
+        for product_id, quantity in source_cart.items():
+            if product_id in target_cart or len(target_cart) < self._max_items:
+                target_cart[product_id] = min(target_cart.get(product_id, 0) + quantity, self._max_quantity)
+                merged += 1
+        self._carts.pop(source.key, None)
+        return merged
+
+
+cart_store = RedisCartStore(
+    max_items=settings.cart_settings.cart_max_items,
+    max_quantity=settings.cart_settings.cart_max_quantity,
+)
+
+
+def get_cart_store() -> CartStore:
+    """Override with an InMemoryCartStore (app.dependency_overrides) to run without Redis."""
+    return cart_store
+
+
+__all__ = ("CartOwner", "CartFullError", "CartStore", "InMemoryCartStore", "RedisCartStore", "get_cart_store")
@@ -0,0 +1,12 @@
+from sqlalchemy import select
+
+from backend.dao_base import BaseDao
+from backend.models import Category
+
+class CategoryDao(BaseDao):
+
+    model = Category
+
+    async def find_all(self) -> list[Category]:
+        result = await self.session.scalars(select(Category).order_by(Category.id))
+        return list(result.all())
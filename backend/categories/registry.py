@@ -0,0 +1,129 @@
+import asyncio
+import datetime
+from dataclasses import dataclass
+from hashlib import sha1
+from types import MappingProxyType
+from typing import Mapping
+
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.categories.dao_categories import CategoryDao
+from backend.categories.schemas import CategoryListSchema, CategoryResponseSchema
+from backend.database.db import db_manager
+from backend.database.redis_client import redis_manager
+
+
+@dataclass(frozen=True)
+class CategorySnapshot:
+    version: int
+    etag: str
+    by_id: Mapping[int, CategoryResponseSchema]
+    listing: CategoryListSchema
+    last_modified: datetime.datetime | None = None
+
+
+EMPTY_SNAPSHOT = CategorySnapshot(
+    version=0,
+    etag='"empty"',
+    by_id=MappingProxyType({}),
+    listing=CategoryListSchema(items=[]),
+)
+
+
+class CategoryRegistry:
+    """
+    The whole categories table held in process memory as an immutable snapshot.
+
+    Readers grab `snapshot` once and never see a half-updated map: a reload builds
+    a new snapshot and swaps the reference. Writers call `publish()` after commit,
+    every worker listening on the Redis channel reloads from the primary.
+    The ETag is a hash of the content, so all workers agree on it; `version` only
+    counts local swaps.
+    """
+
+    channel = "categories:changed"
+
+    def __init__(self, reconnect_delay: float = 1.0) -> None:
+        self._snapshot = EMPTY_SNAPSHOT
+        self._reconnect_delay = reconnect_delay
+        self._listener: asyncio.Task | None = None
+        self._reload_lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> CategorySnapshot:
+        return self._snapshot
+
+    def get(self, category_id: int) -> CategoryResponseSchema | None:
+        return self._snapshot.by_id.get(category_id)
+
+    def name(self, category_id: int) -> str | None:
+        category = self._snapshot.by_id.get(category_id)
+        return category.category_name if category is not None else None
+
+    def _build(self, categories: list[CategoryResponseSchema]) -> CategorySnapshot:
+        listing = CategoryListSchema(items=categories)
+        etag = f'"{sha1(listing.model_dump_json().encode("utf-8")).hexdigest()}"'
+        if etag == self._snapshot.etag:
+            return self._snapshot
+        return CategorySnapshot(
+            version=self._snapshot.version + 1,
+            etag=etag,
+            by_id=MappingProxyType({category.id: category for category in categories}),
+            listing=listing,
+            last_modified=max((category.updated_at for category in categories if category.updated_at), default=None),
+        )
+
+    async def load(self) -> CategorySnapshot:
+        # always the primary: a reload triggered by a write must not read a lagging replica
+        async with self._reload_lock:
+            async with db_manager.sessionmaker() as session:
+                categories = await CategoryDao(session).find_all()
+            self._snapshot = self._build([CategoryResponseSchema.model_validate(category) for category in categories])
+        return self._snapshot
+
+    async def publish(self) -> None:
+        try:
+            await self.load()
+        except (SQLAlchemyError, OSError) as e:
+            print(f"SQLAlchemyError: {e}")
+        try:
+            await redis_manager.client.publish(self.channel, self._snapshot.etag)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with redis_manager.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # anything published while we were not subscribed is picked up here
+                    await self.load()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message" and message["data"].decode() != self._snapshot.etag:
+                            await self.load()
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, SQLAlchemyError, OSError) as e:
+                print(f"Category registry listener error: {e}")
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def start(self) -> None:
+        await self.load()
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+category_registry = CategoryRegistry()
+
+
+__all__ = ("CategorySnapshot", "category_registry")
@@ -0,0 +1,91 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request, Response, status
+
+from backend.auth.dependencies import require_role
+from backend.categories.schemas import CategoryCreateSchema, CategoryListSchema, CategoryResponseSchema
+from backend.categories.service import CategoryService, CategoryWriteService
+from backend.conditional import conditional, make_etag
+from backend.models import UserRole
+
+
+router = APIRouter()
+admin_router = APIRouter(dependencies=[Depends(require_role(UserRole.ADMIN))])
+
+category_not_found = {
+    status.HTTP_404_NOT_FOUND: {
+        "description": "Category not found",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Category not found"}
+            }
+        }
+    }
+}
+
+
+@router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=CategoryListSchema,
+    description="All categories",
+)
+async def list_categories(request: Request, response: Response, service: Annotated[CategoryService, Depends()]) -> CategoryListSchema:
+    snapshot = service.snapshot()
+    not_modified = conditional(request, response, etag=snapshot.etag, last_modified=snapshot.last_modified)
+    if not_modified is not None:
+        return not_modified
+    return snapshot.listing
+
+
+@router.get(
+    "/{category_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=CategoryResponseSchema,
+    description="Category by id",
+    responses=category_not_found,
+)
+async def get_category(category_id: int, request: Request, response: Response, service: Annotated[CategoryService, Depends()]) -> CategoryResponseSchema:
+    category = service.get_category(category_id=category_id)
+    not_modified = conditional(
+        request,
+        response,
+        etag=make_etag("category", category.id, category.category_name, category.updated_at),
+        last_modified=category.updated_at,
+    )
+    if not_modified is not None:
+        return not_modified
+    return category
+
+
+@admin_router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=CategoryResponseSchema,
+    description="Create category",
+)
+async def create_category(data: CategoryCreateSchema, service: Annotated[CategoryWriteService, Depends()]) -> CategoryResponseSchema:
+    response = await service.create_category(data=data)
+    return response
+
+
+@admin_router.put(
+    "/{category_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=CategoryResponseSchema,
+    description="Update category",
+    responses=category_not_found,
+)
+async def update_category(category_id: int, data: CategoryCreateSchema, service: Annotated[CategoryWriteService, Depends()]) -> CategoryResponseSchema:
+    response = await service.update_category(category_id=category_id, data=data)
+    return response
+
+
+@admin_router.delete(
+    "/{category_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description="Delete category that has no products",
+    responses=category_not_found,
+)
+async def delete_category(category_id: int, service: Annotated[CategoryWriteService, Depends()]) -> None:
+    await service.delete_category(category_id=category_id)
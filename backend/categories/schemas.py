@@ -0,0 +1,17 @@
+import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CategoryCreateSchema(BaseModel):
+    category_name: str = Field(default=..., min_length=1, max_length=30, description="Category name, 1 to 30 symbols")
+
+class CategoryResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    category_name: str
+    updated_at: datetime.datetime | None = None
+
+class CategoryListSchema(BaseModel):
+    items: list[CategoryResponseSchema]
@@ -0,0 +1,80 @@
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.categories.dao_categories import CategoryDao
+from backend.categories.schemas import CategoryCreateSchema, CategoryListSchema, CategoryResponseSchema
+from backend.categories.registry import CategorySnapshot, category_registry
+from backend.database.db import get_session
+from backend.models import Category
+
+class CategoryService:
+    """Reads never touch the database, they are answered from the in-memory registry."""
+
+    def snapshot(self) -> CategorySnapshot:
+        return category_registry.snapshot
+
+    def list_categories(self) -> CategoryListSchema:
+        return category_registry.snapshot.listing
+
+    def get_category(self, *, category_id: int) -> CategoryResponseSchema:
+        category = category_registry.get(category_id)
+        if category is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+        return category
+
+
+class CategoryWriteService:
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.category_dao = CategoryDao(session)
+
+    async def _commit(self) -> None:
+        try:
+            await self.category_dao.session.commit()
+        except IntegrityError:
+            await self.category_dao.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Category is still in use"
+            )
+        except SQLAlchemyError as e:
+            await self.category_dao.session.rollback()
+            print(f"SQLAlchemyError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Oops.. Something unexpected happened"
+            )
+
+    async def create_category(self, *, data: CategoryCreateSchema) -> CategoryResponseSchema:
+        category = await self.category_dao.insert_returning(data.model_dump())
+        await self._commit()
+        await category_registry.publish()
+        return CategoryResponseSchema.model_validate(category)
+
+    async def update_category(self, *, category_id: int, data: CategoryCreateSchema) -> CategoryResponseSchema:
+        query = update(Category).filter_by(id=category_id).values(**data.model_dump()).returning(Category)
+        category = (await self.category_dao.session.execute(query)).scalar_one_or_none()
+        if category is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+        await self._commit()
+        await category_registry.publish()
+        return CategoryResponseSchema.model_validate(category)
+
+    async def delete_category(self, *, category_id: int) -> None:
+        # plain DELETE: a category that still has products is rejected by the foreign key
+        result = await self.category_dao.session.execute(delete(Category).filter_by(id=category_id).returning(Category.id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+        await self._commit()
+        await category_registry.publish()
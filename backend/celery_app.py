@@ -0,0 +1,55 @@
+"""
+Celery application. Worker: celery -A backend.celery_app worker
+Periodic tasks: celery -A backend.celery_app beat
+Eager mode (CELERY_TASK_ALWAYS_EAGER) runs tasks inline and has no beat, the
+outbox is then relayed after each commit that adds events (backend.outbox.tasks).
+"""
+import asyncio
+import threading
+
+from celery import Celery
+
+from backend.settings import settings
+
+
+celery_app = Celery(
+    "online_shop",
+    broker=settings.celery_settings.celery_broker_url or settings.redis_settings.redis_url,
+    include=["backend.auth.tasks", "backend.products.tasks", "backend.orders.tasks", "backend.outbox.tasks"],
+)
+
+celery_app.conf.update(
+    task_always_eager=settings.celery_settings.celery_task_always_eager,
+    task_eager_propagates=True,
+    task_ignore_result=True,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=4,
+    broker_connection_retry_on_startup=True,
+    beat_schedule={
+        "reconcile-inventory": {
+            "task": "orders.reconcile_inventory",
+            "schedule": settings.inventory_settings.inventory_reconcile_interval,
+        },
+        "relay-outbox": {
+            "task": "outbox.relay",
+            "schedule": settings.outbox_settings.outbox_poll_interval,
+        },
+    },
+)
+
+
+# Every worker thread keeps its own event loop, so async resources created by
+# tasks (pooled SMTP connections and the like) survive between tasks.
+_worker_state = threading.local()
+
+def worker_loop() -> asyncio.AbstractEventLoop:
+    if getattr(_worker_state, "loop", None) is None:
+        _worker_state.loop = asyncio.new_event_loop()
+    return _worker_state.loop
+
+def run_in_worker_loop(coro):
+    return worker_loop().run_until_complete(coro)
+
+
+__all__ = ("celery_app", "run_in_worker_loop")
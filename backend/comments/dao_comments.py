@@ -0,0 +1,15 @@
+from uuid import UUID
+
+from sqlalchemy import select
+
+from backend.dao_base import BaseDao
+from backend.models import Comment
+
+class CommentDao(BaseDao):
+
+    model = Comment
+
+    async def find_for_update(self, comment_id: UUID) -> Comment | None:
+        query = select(Comment).filter_by(id=comment_id).with_for_update()
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
@@ -0,0 +1,70 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, status
+
+from backend.auth.dependencies import get_current_user_w_verification
+from backend.auth.schemas import PrincipalSchema
+from backend.comments.schemas import CommentCreateSchema, CommentResponseSchema
+from backend.comments.service import CommentService
+
+
+router = APIRouter()
+
+comment_not_found = {
+    status.HTTP_404_NOT_FOUND: {
+        "description": "Comment not found",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Comment not found"}
+            }
+        }
+    }
+}
+
+
+@router.post(
+    "/products/{product_id}/comments",
+    status_code=status.HTTP_201_CREATED,
+    response_model=CommentResponseSchema,
+    description="Comment and rate a product",
+)
+async def create_comment(
+    product_id: UUID,
+    data: CommentCreateSchema,
+    user: Annotated[PrincipalSchema, Depends(get_current_user_w_verification)],
+    service: Annotated[CommentService, Depends()],
+) -> CommentResponseSchema:
+    response = await service.create_comment(product_id=product_id, data=data, user=user)
+    return response
+
+
+@router.put(
+    "/comments/{comment_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=CommentResponseSchema,
+    description="Edit own comment",
+    responses=comment_not_found,
+)
+async def update_comment(
+    comment_id: UUID,
+    data: CommentCreateSchema,
+    user: Annotated[PrincipalSchema, Depends(get_current_user_w_verification)],
+    service: Annotated[CommentService, Depends()],
+) -> CommentResponseSchema:
+    response = await service.update_comment(comment_id=comment_id, data=data, user=user)
+    return response
+
+
+@router.delete(
+    "/comments/{comment_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description="Delete own comment (moderators and admins may delete any)",
+    responses=comment_not_found,
+)
+async def delete_comment(
+    comment_id: UUID,
+    user: Annotated[PrincipalSchema, Depends(get_current_user_w_verification)],
+    service: Annotated[CommentService, Depends()],
+) -> None:
+    await service.delete_comment(comment_id=comment_id, user=user)
@@ -0,0 +1,21 @@
+import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from backend.models import RatingEnum
+
+
+class CommentCreateSchema(BaseModel):
+    content: str | None = Field(default=None, max_length=5000)
+    rating: RatingEnum = RatingEnum.FIVE
+
+class CommentResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    content: str | None
+    rating: RatingEnum
+    created_at: datetime.datetime
+    user_id: UUID
+    product_id: UUID
@@ -0,0 +1,80 @@
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.auth.schemas import PrincipalSchema
+from backend.comments.dao_comments import CommentDao
+from backend.comments.schemas import CommentCreateSchema, CommentResponseSchema
+from backend.database.db import get_session
+from backend.models import UserRole
+from backend.products.dao_products import ProductDao
+from backend.products.service import product_scopes
+from backend.response_cache import catalog_cache
+
+class CommentService:
+    """Every comment write shifts the product's rating aggregates in the same transaction."""
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.comment_dao = CommentDao(session)
+        self.product_dao = ProductDao(session)
+
+    async def _commit(self) -> None:
+        try:
+            await self.comment_dao.session.commit()
+        except SQLAlchemyError as e:
+            await self.comment_dao.session.rollback()
+            print(f"SQLAlchemyError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Oops.. Something unexpected happened"
+            )
+
+    async def _apply_rating_delta(self, product_id: UUID, sum_delta: int, count_delta: int):
+        product = await self.product_dao.apply_rating_delta(product_id, sum_delta, count_delta)
+        if product is None:
+            await self.comment_dao.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+        return product
+
+    async def _get_own_comment(self, comment_id: UUID, user: PrincipalSchema, allow_staff: bool = False):
+        comment = await self.comment_dao.find_for_update(comment_id)
+        if comment is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Comment not found"
+            )
+        if comment.user_id != user.id and not (allow_staff and user.role in (UserRole.ADMIN, UserRole.MODERATOR)):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return comment
+
+    async def create_comment(self, *, product_id: UUID, data: CommentCreateSchema, user: PrincipalSchema) -> CommentResponseSchema:
+        # aggregates first: the row lock on the product also proves it exists
+        product = await self._apply_rating_delta(product_id, data.rating.value, 1)
+        comment = await self.comment_dao.insert_returning({**data.model_dump(), "product_id": product_id, "user_id": user.id})
+        await self._commit()
+        await catalog_cache.bump(*product_scopes(product_id, product.category_id, product.merchant_id))
+        return CommentResponseSchema.model_validate(comment)
+
+    async def update_comment(self, *, comment_id: UUID, data: CommentCreateSchema, user: PrincipalSchema) -> CommentResponseSchema:
+        comment = await self._get_own_comment(comment_id, user)
+        product = await self._apply_rating_delta(comment.product_id, data.rating.value - comment.rating.value, 0)
+        comment.content = data.content
+        comment.rating = data.rating
+        await self._commit()
+        await catalog_cache.bump(*product_scopes(comment.product_id, product.category_id, product.merchant_id))
+        return CommentResponseSchema.model_validate(comment)
+
+    async def delete_comment(self, *, comment_id: UUID, user: PrincipalSchema) -> None:
+        comment = await self._get_own_comment(comment_id, user, allow_staff=True)
+        product = await self._apply_rating_delta(comment.product_id, -comment.rating.value, -1)
+        await self.comment_dao.session.delete(comment)
+        await self._commit()
+        await catalog_cache.bump(*product_scopes(comment.product_id, product.category_id, product.merchant_id))
@@ -0,0 +1,72 @@
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """Weak validator: equal parts mean a semantically equal representation."""
+    digest = sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    # timestamps are stored as naive UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def http_date(value: datetime.datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime.datetime | None = None) -> bool:
+    """RFC 9110: If-None-Match (weak comparison) wins, If-Modified-Since is only used without it."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have second precision
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    *,
+    etag: str,
+    last_modified: datetime.datetime | None = None,
+    cache_control: str = "no-cache",
+) -> Response | None:
+    """
+    Sets the validators on `response`. Returns a ready 304 when the client's copy
+    is still current; the endpoint returns it as is instead of the body.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+__all__ = ("conditional", "http_date", "is_not_modified", "make_etag")
@@ -1,14 +1,71 @@
-from sqlalchemy import select
+from typing import Any, Sequence
+
+from sqlalchemy import exists, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 class BaseDao:
 
     model = None
-    
-    @classmethod
-    async def find_one_or_none(cls, session: AsyncSession, **filter_by):
-        query = select(cls.model).filter_by(**filter_by)
-        result = await session.execute(query)
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def find_one_or_none(self, **filter_by):
+        query = select(self.model).filter_by(**filter_by)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def exists(self, **filter_by) -> bool:
+        query = select(exists().where(*(getattr(self.model, key) == value for key, value in filter_by.items())))
+        return bool(await self.session.scalar(query))
+
+    async def find_conflicts(self, **values) -> set[str]:
+        """
+        Names of the given (unique) columns that already hold the given values,
+        checked in a single query: find_conflicts(username="bob", email="b@x.io").
+        """
+        conditions = {key: getattr(self.model, key) == value for key, value in values.items()}
+        query = select(*(condition.label(key) for key, condition in conditions.items())).where(or_(*conditions.values()))
+        result = await self.session.execute(query)
+        return {key for row in result.mappings() for key, matched in row.items() if matched}
+
+    async def insert_returning(
+        self,
+        values: dict[str, Any],
+        *,
+        conflict_columns: Sequence[str] | None = None,
+        update_columns: Sequence[str] | None = None,
+    ):
+        """
+        INSERT ... ON CONFLICT ... RETURNING in one round trip.
+        Without `update_columns` a conflicting row is skipped and None is returned;
+        with them the existing row (matched on `conflict_columns`) is updated and returned.
+        """
+        query = insert(self.model).values(**values)
+        if update_columns:
+            query = query.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={column: query.excluded[column] for column in update_columns},
+            )
+        else:
+            query = query.on_conflict_do_nothing(index_elements=conflict_columns)
+        result = await self.session.execute(query.returning(self.model))
         return result.scalar_one_or_none()
 
-        
\ No newline at end of file
+    async def bulk_insert(self, rows: Sequence[dict[str, Any]]) -> None:
+        if rows:
+            await self.session.execute(insert(self.model), rows)
+
+    async def bulk_insert_returning(self, rows: Sequence[dict[str, Any]]) -> list:
+        if not rows:
+            return []
+        result = await self.session.scalars(insert(self.model).returning(self.model), rows)
+        return list(result.all())
+
+    async def bulk_update_by_key(self, rows: Sequence[dict[str, Any]]) -> None:
+        """Executemany UPDATE; every row must contain the primary key."""
+        if rows:
+            await self.session.execute(update(self.model), rows)
+
+        
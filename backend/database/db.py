@@ -1,26 +1,181 @@
 import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
 
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker, AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
+from backend.database.query_counter import install_query_counter
 from backend.settings import settings
 from backend.models import Base
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that also records how long callers waited for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "wait_count": self.wait_count,
+            "wait_avg": self.wait_total / self.wait_count if self.wait_count else 0.0,
+            "wait_max": self.wait_max,
+            "timeouts": self.timeouts,
+        }
+
+
+def create_engine(url: str) -> AsyncEngine:
+    db_settings = settings.postgres_settings
+    return create_async_engine(
+        url = url,
+        echo = db_settings.db_echo,
+        poolclass = InstrumentedPool,
+        pool_size = db_settings.db_pool_size,
+        max_overflow = db_settings.db_max_overflow,
+        pool_timeout = db_settings.db_pool_timeout,
+        pool_recycle = db_settings.db_pool_recycle,
+        pool_pre_ping = db_settings.db_pool_pre_ping,
+        connect_args = {"statement_cache_size": db_settings.db_statement_cache_size},
+    )
+
+def create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind = engine,
+        expire_on_commit = False,
+        class_= AsyncSession
+    )
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class ReplicaNode:
+    def __init__(self, url: str) -> None:
+        self.engine: AsyncEngine = create_engine(url)
+        self.sessionmaker = create_sessionmaker(self.engine)
+        self.ejected_until = 0.0
+        self.lag = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def eject(self, seconds: float) -> None:
+        self.ejected_until = time.monotonic() + seconds
+
+    def restore(self) -> None:
+        self.ejected_until = 0.0
+
 class DatabaseSessionManager:
     def __init__(self) -> None:
-        self._engine: AsyncEngine = create_async_engine(
-            url = settings.postgres_settings.postgres_url,
-            echo = True
-        )
-        self.sessionmaker: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind = self._engine,
-            expire_on_commit = False,
-            class_= AsyncSession
-        )
+        self._engine: AsyncEngine = create_engine(settings.postgres_settings.postgres_url)
+        self.sessionmaker: async_sessionmaker[AsyncSession] = create_sessionmaker(self._engine)
+
+        self._replicas = [ReplicaNode(url) for url in settings.postgres_settings.db_replica_urls]
+        if settings.postgres_settings.db_query_counter:
+            for engine in [self._engine, *(node.engine for node in self._replicas)]:
+                install_query_counter(engine)
+        self._round_robin = itertools.count()
+        self._health_task: asyncio.Task | None = None
+
+    def _replica_candidates(self) -> list[ReplicaNode]:
+        if not self._replicas:
+            return []
+        start = next(self._round_robin) % len(self._replicas)
+        ordered = self._replicas[start:] + self._replicas[:start]
+        return [node for node in ordered if node.healthy]
+
+    async def open_read_session(self) -> AsyncSession:
+        """
+        Session bound to the next healthy replica. A replica that fails to hand out
+        a connection is ejected and the next one is tried; the primary is the last resort.
+        """
+        for node in self._replica_candidates():
+            session = node.sessionmaker()
+            try:
+                await session.connection()
+            except (SQLAlchemyError, OSError) as e:
+                await session.close()
+                node.eject(settings.postgres_settings.db_replica_eject_seconds)
+                print(f"Replica ejected: {e}")
+                continue
+            return session
+        return self.sessionmaker()
+
+    async def check_replicas(self) -> None:
+        for node in self._replicas:
+            try:
+                async with node.engine.connect() as conn:
+                    node.lag = float(await conn.scalar(REPLICA_LAG_QUERY))
+            except (SQLAlchemyError, OSError) as e:
+                node.eject(settings.postgres_settings.db_replica_eject_seconds)
+                print(f"Replica health check failed: {e}")
+                continue
+            if node.lag > settings.postgres_settings.db_replica_max_lag:
+                node.eject(settings.postgres_settings.db_replica_eject_seconds)
+            else:
+                node.restore()
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(settings.postgres_settings.db_replica_check_interval)
+
+    def start_health_checks(self) -> None:
+        if self._replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
     
     async def init_models(self):
         async with self._engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
             await conn.run_sync(Base.metadata.create_all)
+
+    def pool_stats(self) -> dict:
+        return self._engine.pool.stats()
+
+    def replica_stats(self) -> list[dict]:
+        return [
+            {
+                "host": node.engine.url.host,
+                "healthy": node.healthy,
+                "lag": node.lag,
+                "pool": node.engine.pool.stats(),
+            }
+            for node in self._replicas
+        ]
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for node in self._replicas:
+            await node.engine.dispose()
+        await self._engine.dispose()
     
 
 
@@ -30,9 +185,28 @@ async def get_session():
     async with db_manager.sessionmaker() as session:
         yield session
 
+async def get_read_session():
+    session = await db_manager.open_read_session()
+    async with session:
+        yield session
+
+
+@asynccontextmanager
+async def standalone_session():
+    """
+    Session on a private, unpooled engine for code running outside the app's event loop
+    (Celery tasks, scripts): pooled asyncpg connections cannot move between loops.
+    """
+    engine = create_async_engine(settings.postgres_settings.postgres_url, poolclass=NullPool)
+    try:
+        async with create_sessionmaker(engine)() as session:
+            yield session
+    finally:
+        await engine.dispose()
+
 
 if __name__ == "__main__":
     asyncio.run(db_manager.init_models())
 
 
-__all__ = ("get_session",)
+__all__ = ("get_session", "get_read_session", "standalone_session")
@@ -0,0 +1,84 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class QueryStats:
+    """Statements executed while serving one request."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Identical statements run `threshold` times or more. Parameters are bound
+        separately, so a lazy load per row shows up as one statement repeated N times.
+        """
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement)
+
+
+def install_query_counter(engine: AsyncEngine) -> None:
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+class QueryCounterMiddleware:
+    """
+    Dev-mode instrument: counts the statements of every request, reports the count
+    in the X-Query-Count header and prints the statements that look like an N+1.
+    Needs install_query_counter() on the engines; costs a dict update per statement.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 5) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_count(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Query-Count"] = str(stats.count)
+                repeated = stats.repeated(self.repeat_threshold)
+                if repeated:
+                    headers["X-Query-Repeated"] = str(len(repeated))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _current_stats.reset(token)
+            for statement, times in stats.repeated(self.repeat_threshold):
+                print(
+                    f"Possible N+1: {scope['method']} {scope['path']} ran {times}x "
+                    f"({stats.count} statements, {time.perf_counter() - start:.3f}s): {statement[:200]}"
+                )
+
+
+__all__ = ("QueryCounterMiddleware", "QueryStats", "install_query_counter")
@@ -0,0 +1,24 @@
+from redis.asyncio import Redis
+
+from backend.settings import settings
+
+class RedisManager:
+    def __init__(self) -> None:
+        self._client: Redis | None = None
+
+    @property
+    def client(self) -> Redis:
+        if self._client is None:
+            self._client = Redis.from_url(settings.redis_settings.redis_url)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+redis_manager = RedisManager()
+
+
+__all__ = ("redis_manager",)
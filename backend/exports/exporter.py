@@ -0,0 +1,110 @@
+import csv
+import datetime
+import io
+import json
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.sql.elements import ColumnElement
+
+from backend.database.db import db_manager
+from backend.exports.schemas import ExportFormat
+
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """
+    Rows of one export. They are streamed in (time_column, id_column) order,
+    which is also the key a client resumes on after an interrupted download.
+    """
+    name: str
+    query: Select
+    time_column: ColumnElement
+    id_column: ColumnElement
+    # extra sort keys inside one (time, id), e.g. order items of one order
+    tie_breakers: tuple[ColumnElement, ...] = ()
+
+
+def windowed(
+    spec: ExportSpec,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    after_id: UUID | None = None,
+) -> Select:
+    """
+    [since, until) window over the time column; with `after_id` the window starts
+    right after the row (since, after_id), which is how an export is resumed.
+    """
+    query = spec.query
+    if since is not None:
+        if after_id is not None:
+            query = query.where(tuple_(spec.time_column, spec.id_column) > tuple_(since, after_id))
+        else:
+            query = query.where(spec.time_column >= since)
+    if until is not None:
+        query = query.where(spec.time_column < until)
+    return query.order_by(spec.time_column, spec.id_column, *spec.tie_breakers)
+
+
+async def stream_batches(query: Select) -> AsyncIterator[Sequence[RowMapping]]:
+    """
+    Server-side cursor: at most EXPORT_BATCH_SIZE rows are held at a time. The session
+    lives inside the generator because a StreamingResponse body outlives the
+    request's dependencies.
+    """
+    session = await db_manager.open_read_session()
+    async with session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for batch in result.mappings().partitions():
+            yield batch
+
+
+def plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+async def ndjson_chunks(batches: AsyncIterator[Sequence[RowMapping]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(json.dumps({key: plain(value) for key, value in row.items()}, ensure_ascii=False) + "\n" for row in batch)
+
+
+async def csv_chunks(columns: Sequence[str], batches: AsyncIterator[Sequence[RowMapping]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for batch in batches:
+        writer.writerows([plain(row[column]) for column in columns] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_chunks(query: Select, export_format: ExportFormat) -> AsyncIterator[str]:
+    batches = stream_batches(query)
+    if export_format is ExportFormat.CSV:
+        return csv_chunks([column.key for column in query.selected_columns], batches)
+    return ndjson_chunks(batches)
+
+
+__all__ = ("ExportSpec", "MEDIA_TYPES", "export_chunks", "windowed")
@@ -0,0 +1,91 @@
+import datetime
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from backend.auth.dependencies import require_role
+from backend.exports.exporter import MEDIA_TYPES
+from backend.exports.schemas import ExportFormat
+from backend.exports.service import ExportService
+from backend.models import UserRole
+
+
+admin_router = APIRouter(dependencies=[Depends(require_role(UserRole.ADMIN))])
+
+export_description = (
+    "Streams every {what} in ({time}, id) order as NDJSON or CSV. "
+    "[since, until) limits the window; to resume an interrupted export pass the {time} "
+    "and id of the last complete row as since and after_id."
+)
+
+
+def naive_utc(value: datetime.datetime | None) -> datetime.datetime | None:
+    # the timestamp columns are naive UTC, an aware bound would only fail once the stream is running
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def stream_export(service: ExportService, name: str, export_format: ExportFormat, since, until, after_id) -> StreamingResponse:
+    if after_id is not None and since is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="after_id needs since"
+        )
+    since, until = naive_utc(since), naive_utc(until)
+    return StreamingResponse(
+        service.export(name, export_format=export_format, since=since, until=until, after_id=after_id),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'},
+    )
+
+
+@admin_router.get(
+    "/products",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    description=export_description.format(what="product", time="created_at"),
+)
+async def export_products(
+    service: Annotated[ExportService, Depends()],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    after_id: UUID | None = None,
+) -> StreamingResponse:
+    return stream_export(service, "products", export_format, since, until, after_id)
+
+
+@admin_router.get(
+    "/orders",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    description=export_description.format(what="order item, joined with its order,", time="order_date")
+        + " Resume on an order id: the items of that order are not sent again.",
+)
+async def export_orders(
+    service: Annotated[ExportService, Depends()],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    after_id: UUID | None = None,
+) -> StreamingResponse:
+    return stream_export(service, "orders", export_format, since, until, after_id)
+
+
+@admin_router.get(
+    "/users",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    description=export_description.format(what="user", time="created_at"),
+)
+async def export_users(
+    service: Annotated[ExportService, Depends()],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    after_id: UUID | None = None,
+) -> StreamingResponse:
+    return stream_export(service, "users", export_format, since, until, after_id)
@@ -0,0 +1,89 @@
+import datetime
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import select
+
+from backend.exports.exporter import ExportSpec, export_chunks, windowed
+from backend.exports.schemas import ExportFormat
+from backend.models import Order, OrderItem, Product, User
+
+
+PRODUCTS_EXPORT = ExportSpec(
+    name="products",
+    query=select(
+        Product.id,
+        Product.sku,
+        Product.product_name,
+        Product.product_price,
+        Product.product_discount,
+        Product.product_quantity,
+        Product.category_id,
+        Product.merchant_id,
+        Product.rating_avg,
+        Product.rating_count,
+        Product.created_at,
+        Product.updated_at,
+    ),
+    time_column=Product.created_at,
+    id_column=Product.id,
+)
+
+# one row per order item, orders without items appear once with empty item columns
+ORDERS_EXPORT = ExportSpec(
+    name="orders",
+    query=select(
+        Order.id.label("order_id"),
+        Order.user_id,
+        Order.order_date,
+        Order.status,
+        Order.fulfillment_status,
+        Order.shipment_status,
+        Order.total_amount,
+        Order.payment_method,
+        Order.transaction_id,
+        OrderItem.id.label("item_id"),
+        OrderItem.product_id,
+        OrderItem.quantity,
+        OrderItem.price_at_purchase,
+    ).outerjoin(OrderItem, OrderItem.order_id == Order.id),
+    time_column=Order.order_date,
+    id_column=Order.id,
+    tie_breakers=(OrderItem.id,),
+)
+
+# password hashes never leave the database
+USERS_EXPORT = ExportSpec(
+    name="users",
+    query=select(
+        User.id,
+        User.username,
+        User.email,
+        User.phone_number,
+        User.first_name,
+        User.last_name,
+        User.role,
+        User.is_verificated,
+        User.is_blocked,
+        User.created_at,
+    ),
+    time_column=User.created_at,
+    id_column=User.id,
+)
+
+EXPORTS = {spec.name: spec for spec in (PRODUCTS_EXPORT, ORDERS_EXPORT, USERS_EXPORT)}
+
+
+class ExportService:
+
+    def export(
+        self,
+        name: str,
+        *,
+        export_format: ExportFormat,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        after_id: UUID | None = None,
+    ) -> AsyncIterator[str]:
+        query = windowed(EXPORTS[name], since=since, until=until, after_id=after_id)
+        return export_chunks(query, export_format)
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+
+from sqlalchemy import Select
+from sqlalchemy.orm import load_only, raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from backend.models import Order, OrderItem, Product, User
+
+
+@dataclass(frozen=True)
+class LoaderProfile:
+    """
+    Named set of loader options for one use case. Every profile ends with
+    raiseload("*"): a relationship the profile does not load explicitly raises
+    on access instead of silently issuing one query per row.
+    """
+    name: str
+    options: tuple[LoaderOption, ...]
+
+    def apply(self, query: Select) -> Select:
+        return query.options(*self.options, raiseload("*"))
+
+
+PRODUCT_CARD_COLUMNS = (
+    Product.id,
+    Product.sku,
+    Product.product_name,
+    Product.product_price,
+    Product.product_description,
+    Product.product_discount,
+    Product.product_quantity,
+    Product.is_hot_inventory,
+    Product.category_id,
+    Product.merchant_id,
+    Product.created_at,
+    Product.updated_at,
+    Product.rating_avg,
+    Product.rating_count,
+)
+
+PRODUCT_CARD = LoaderProfile(
+    name="product_card",
+    options=(load_only(*PRODUCT_CARD_COLUMNS),),
+)
+
+ORDER_DETAIL = LoaderProfile(
+    name="order_detail",
+    options=(
+        selectinload(Order.items)
+        .joinedload(OrderItem.product)
+        .load_only(Product.id, Product.product_name, Product.merchant_id),
+    ),
+)
+
+ADMIN_USER_LIST = LoaderProfile(
+    name="admin_user_list",
+    options=(
+        load_only(
+            User.id,
+            User.username,
+            User.email,
+            User.first_name,
+            User.last_name,
+            User.role,
+            User.is_verificated,
+            User.is_blocked,
+            User.created_at,
+        ),
+    ),
+)
+
+
+LOADER_PROFILES = {
+    profile.name: profile
+    for profile in (PRODUCT_CARD, ORDER_DETAIL, ADMIN_USER_LIST)
+}
+
+
+__all__ = (
+    "LoaderProfile",
+    "LOADER_PROFILES",
+    "PRODUCT_CARD",
+    "PRODUCT_CARD_COLUMNS",
+    "ORDER_DETAIL",
+    "ADMIN_USER_LIST",
+)
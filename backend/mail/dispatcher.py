@@ -0,0 +1,180 @@
+import asyncio
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from backend.settings import settings
+
+
+class MailDispatcherClosedError(Exception):
+    pass
+
+
+class MailDispatcher:
+    """
+    Keeps `pool_size` authenticated SMTP connections open. Each connection is owned
+    by a worker that drains the shared queue in batches of up to `batch_size`
+    messages, reconnecting when the server drops it. Batches only form when several
+    senders share one dispatcher: the auth.send_email task sends a single message
+    per call and waits for it, so there each batch holds one message.
+    """
+
+    def __init__(
+        self,
+        *,
+        hostname: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = True,
+        pool_size: int = 2,
+        batch_size: int = 20,
+        timeout: float = 30,
+        queue_size: int = 1000,
+    ) -> None:
+        self._hostname = hostname
+        self._port = port
+        self._username = username
+        self._password = password
+        self._use_tls = use_tls
+        self._pool_size = pool_size
+        self._batch_size = batch_size
+        self._timeout = timeout
+        self._queue_size = queue_size
+
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+
+        self._sent = 0
+        self._failed = 0
+        self._batches = 0
+        self._reconnects = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"mail-dispatcher-{i}")
+            for i in range(self._pool_size)
+        ]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # nobody is left to send what is still queued, fail it instead of leaving senders hanging
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                self._abandon(future)
+        self._queue = None
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        if not future.done():
+            self._failed += 1
+            future.set_exception(MailDispatcherClosedError("Mail dispatcher was closed before the message was sent"))
+
+    async def send(self, message: EmailMessage) -> None:
+        """Queue a message and wait until it is accepted by the SMTP server."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future, time.monotonic()))
+        await future
+
+    def stats(self) -> dict:
+        return {
+            "sent": self._sent,
+            "failed": self._failed,
+            "batches": self._batches,
+            "reconnects": self._reconnects,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "avg_latency": self._latency_total / self._sent if self._sent else 0.0,
+            "max_latency": self._latency_max,
+        }
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self._hostname,
+            port=self._port,
+            use_tls=self._use_tls,
+            timeout=self._timeout,
+        )
+        await smtp.connect()
+        if self._username and self._password:
+            try:
+                await smtp.login(self._username, self._password)
+            except Exception as err:
+                smtp.close()
+                raise aiosmtplib.SMTPException("Couldnt login") from err
+        return smtp
+
+    async def _send_one(self, smtp: aiosmtplib.SMTP | None, message: EmailMessage) -> aiosmtplib.SMTP:
+        if smtp is None or not smtp.is_connected:
+            smtp = await self._connect()
+        try:
+            await smtp.send_message(message)
+        except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError):
+            # stale pooled connection: reconnect once and retry
+            smtp.close()
+            self._reconnects += 1
+            smtp = await self._connect()
+            await smtp.send_message(message)
+        return smtp
+
+    async def _worker(self) -> None:
+        smtp: aiosmtplib.SMTP | None = None
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while len(batch) < self._batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                self._batches += 1
+
+                for message, future, queued_at in batch:
+                    try:
+                        smtp = await self._send_one(smtp, message)
+                    except Exception as err:
+                        self._failed += 1
+                        if smtp is not None:
+                            smtp.close()
+                            smtp = None
+                        if not future.done():
+                            future.set_exception(err)
+                    else:
+                        latency = time.monotonic() - queued_at
+                        self._sent += 1
+                        self._latency_total += latency
+                        self._latency_max = max(self._latency_max, latency)
+                        if not future.done():
+                            future.set_result(None)
+                    finally:
+                        self._queue.task_done()
+        finally:
+            # cancelled mid-batch: the rest of the batch is never going to be sent
+            for _, future, _ in batch:
+                self._abandon(future)
+            if smtp is not None:
+                smtp.close()
+
+
+def create_mail_dispatcher() -> MailDispatcher:
+    return MailDispatcher(
+        hostname=settings.email_settings.email_host,
+        port=settings.email_settings.email_port,
+        username=settings.email_settings.email_username,
+        password=settings.email_settings.email_password.get_secret_value(),
+        use_tls=settings.email_settings.email_use_tls,
+        pool_size=settings.email_settings.email_pool_size,
+        batch_size=settings.email_settings.email_batch_size,
+        timeout=settings.email_settings.email_timeout,
+        queue_size=settings.email_settings.email_queue_size,
+    )
+
+
+__all__ = ("MailDispatcher", "MailDispatcherClosedError", "create_mail_dispatcher")
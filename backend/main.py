@@ -42,17 +42,62 @@ import os
 app_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(1, app_dir)
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI#, Request
+from backend.auth.csrf_middleware import CsrfMiddleware, CsrfRule
 from backend.auth.router import router as auth_router
-# from backend.users.router import router as users_router
+from backend.auth.utils import hasher_pool
+from backend.database.db import db_manager
+from backend.database.query_counter import QueryCounterMiddleware
+from backend.merchants.router import router as merchants_router
+from backend.products.router import router as products_router, admin_router as admin_products_router
+from backend.comments.router import router as comments_router
+from backend.cart.router import router as cart_router
+from backend.orders.router import router as orders_router
+from backend.categories.registry import category_registry
+from backend.categories.router import router as categories_router, admin_router as admin_categories_router
+from backend.database.redis_client import redis_manager
+from backend.exports.router import admin_router as admin_exports_router
+from backend.outbox.router import admin_router as admin_outbox_router
+from backend.settings import settings
+from backend.users.router import admin_router as admin_users_router, router as users_router
 # from fastapi.staticfiles import StaticFiles
 
 
-app = FastAPI(docs_url="/docs/api")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db_manager.start_health_checks()
+    await category_registry.start()
+    yield
+    await category_registry.close()
+    hasher_pool.shutdown()
+    await redis_manager.close()
+    await db_manager.close()
+
+
+app = FastAPI(docs_url="/docs/api", lifespan=lifespan)
+
+app.add_middleware(CsrfMiddleware, rules=[
+    CsrfRule("/api/v1/auth/me"),
+])
+if settings.postgres_settings.db_query_counter:
+    app.add_middleware(QueryCounterMiddleware, repeat_threshold=settings.postgres_settings.db_query_repeat_threshold)
 
 # app.mount('/static', StaticFiles(directory='app/static'), 'static')
 app.include_router(prefix="/api/v1/auth", router=auth_router, tags=["API v1/Auth"])
-# app.include_router(prefix="/api/v1/users", router=users_router, tags=["API v1/Users"])
+app.include_router(prefix="/api/v1/users", router=users_router, tags=["API v1/Users"])
+app.include_router(prefix="/api/v1/products", router=products_router, tags=["API v1/Products"])
+app.include_router(prefix="/api/v1/merchant", router=merchants_router, tags=["API v1/Merchant"])
+app.include_router(prefix="/api/v1", router=comments_router, tags=["API v1/Comments"])
+app.include_router(prefix="/api/v1/cart", router=cart_router, tags=["API v1/Cart"])
+app.include_router(prefix="/api/v1/orders", router=orders_router, tags=["API v1/Orders"])
+app.include_router(prefix="/api/v1/categories", router=categories_router, tags=["API v1/Categories"])
+app.include_router(prefix="/api/v1/admin/products", router=admin_products_router, tags=["API v1/Admin"])
+app.include_router(prefix="/api/v1/admin/categories", router=admin_categories_router, tags=["API v1/Admin"])
+app.include_router(prefix="/api/v1/admin/users", router=admin_users_router, tags=["API v1/Admin"])
+app.include_router(prefix="/api/v1/admin/exports", router=admin_exports_router, tags=["API v1/Admin"])
+app.include_router(prefix="/api/v1/admin/outbox", router=admin_outbox_router, tags=["API v1/Admin"])
 
 # @app.get("/", response_class=RedirectResponse)
 # def home_page():
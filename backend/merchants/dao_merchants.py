@@ -0,0 +1,6 @@
+from backend.dao_base import BaseDao
+from backend.models import Merchant
+
+class MerchantDao(BaseDao):
+
+    model = Merchant
@@ -0,0 +1,24 @@
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.auth.dependencies import require_role
+from backend.auth.schemas import PrincipalSchema
+from backend.database.db import get_session
+from backend.merchants.dao_merchants import MerchantDao
+from backend.models import Merchant, UserRole
+
+
+async def get_current_merchant(
+    user: Annotated[PrincipalSchema, Depends(require_role(UserRole.MERCHANT))],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Merchant:
+    """Merchant account of the authenticated user, matched by email."""
+    merchant = await MerchantDao(session).find_one_or_none(email=user.email)
+    if merchant is None or not merchant.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No active merchant account"
+        )
+    return merchant
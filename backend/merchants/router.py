@@ -0,0 +1,186 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from backend.conditional import conditional, make_etag
+from backend.merchants.dependencies import get_current_merchant
+from backend.merchants.schemas import MerchantResponseSchema
+from backend.models import Merchant
+from backend.orders.schemas import BulkTransitionResultSchema, OrderTransitionSchema
+from backend.orders.service import OrderTransitionService
+from backend.products.router import product_etag, product_not_found
+from backend.products.schemas import ProductCreateSchema, ProductImportResultSchema, ProductPageSchema, ProductResponseSchema, ProductSort, ProductUpdateSchema
+from backend.products.service import ProductService, ProductWriteService
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/me",
+    status_code=status.HTTP_200_OK,
+    response_model=MerchantResponseSchema,
+    description="Merchant account of the current user",
+)
+async def get_merchant_me(
+    request: Request,
+    response: Response,
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+) -> MerchantResponseSchema:
+    not_modified = conditional(
+        request,
+        response,
+        etag=make_etag("merchant", merchant.id, merchant.updated_at),
+        last_modified=merchant.updated_at,
+        cache_control="private, no-cache",
+    )
+    if not_modified is not None:
+        return not_modified
+    return MerchantResponseSchema.model_validate(merchant)
+
+
+@router.get(
+    "/products",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductPageSchema,
+    description="Products of the current merchant, paginated with an opaque cursor",
+)
+async def list_merchant_products(
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+    service: Annotated[ProductService, Depends()],
+    sort: ProductSort = ProductSort.NEWEST,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+    category_id: int | None = None,
+) -> ProductPageSchema:
+    response = await service.list_products(
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+        category_id=category_id,
+        merchant_id=merchant.id,
+    )
+    return response
+
+
+@router.get(
+    "/products/{product_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductResponseSchema,
+    description="Product of the current merchant",
+    responses=product_not_found,
+)
+async def get_merchant_product(
+    product_id: UUID,
+    request: Request,
+    response: Response,
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+    service: Annotated[ProductService, Depends()],
+) -> ProductResponseSchema:
+    product = await service.get_product(product_id=product_id)
+    if product.merchant_id != merchant.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    not_modified = conditional(
+        request, response, etag=product_etag(product), last_modified=product.updated_at, cache_control="private, no-cache"
+    )
+    if not_modified is not None:
+        return not_modified
+    return product
+
+
+@router.post(
+    "/products",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ProductResponseSchema,
+    description="Create product of the current merchant",
+)
+async def create_merchant_product(
+    data: ProductCreateSchema,
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+    service: Annotated[ProductWriteService, Depends()],
+) -> ProductResponseSchema:
+    response = await service.create_product(data=data, merchant_id=merchant.id)
+    return response
+
+
+@router.post(
+    "/products/import",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductImportResultSchema,
+    description=(
+        "Bulk upsert of the current merchant's products by SKU. The body is streamed: "
+        "text/csv with a header line, or application/x-ndjson with one product object per line. "
+        "Invalid rows are skipped and reported by line number."
+    ),
+    responses={
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {
+            "description": "Unsupported upload format",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Upload text/csv or application/x-ndjson"}
+                }
+            }
+        }
+    },
+)
+async def import_merchant_products(
+    request: Request,
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+    service: Annotated[ProductWriteService, Depends()],
+) -> ProductImportResultSchema:
+    response = await service.import_products(
+        merchant_id=merchant.id,
+        content_type=request.headers.get("content-type"),
+        body=request.stream(),
+    )
+    return response
+
+
+@router.put(
+    "/products/{product_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductResponseSchema,
+    description="Update product of the current merchant",
+    responses=product_not_found,
+)
+async def update_merchant_product(
+    product_id: UUID,
+    data: ProductUpdateSchema,
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+    service: Annotated[ProductWriteService, Depends()],
+) -> ProductResponseSchema:
+    response = await service.update_product(product_id=product_id, data=data, merchant_id=merchant.id)
+    return response
+
+
+@router.delete(
+    "/products/{product_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description="Delete product of the current merchant",
+    responses=product_not_found,
+)
+async def delete_merchant_product(
+    product_id: UUID,
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+    service: Annotated[ProductWriteService, Depends()],
+) -> None:
+    await service.delete_product(product_id=product_id, merchant_id=merchant.id)
+
+
+@router.post(
+    "/orders/transitions",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkTransitionResultSchema,
+    description=(
+        "Move up to 1000 orders to a new status, fulfillment status or shipment status at once. "
+        "Orders the state machine does not allow to move are reported per order and skipped"
+    ),
+)
+async def transition_merchant_orders(
+    data: OrderTransitionSchema,
+    merchant: Annotated[Merchant, Depends(get_current_merchant)],
+    service: Annotated[OrderTransitionService, Depends()],
+) -> BulkTransitionResultSchema:
+    response = await service.transition(data=data, merchant_id=merchant.id)
+    return response
@@ -0,0 +1,18 @@
+import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, EmailStr
+
+
+class MerchantResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    merchant_name: str
+    email: EmailStr
+    first_name: str
+    last_name: str
+    description: str
+    is_active: bool
+    created_at: datetime.datetime
+    updated_at: datetime.datetime | None = None
@@ -7,9 +7,9 @@ import datetime
 from enum import Enum
 
 
-from sqlalchemy import Boolean, Numeric, String, text, ForeignKey, Text#, ARRAY
+from sqlalchemy import DDL, BigInteger, Boolean, CheckConstraint, Index, Numeric, String, UniqueConstraint, event, text, ForeignKey, Text#, ARRAY
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
 class UserRole(str, Enum):
@@ -52,25 +52,57 @@ class RatingEnum(int, Enum):
     TEN = 10
 
 class Base(AsyncAttrs, DeclarativeBase):
-    pass
+    # updated_at is set by the database on UPDATE: fetch it with RETURNING instead of
+    # expiring it, responses built after commit must not lazy-load on the async session
+    __mapper_args__ = {"eager_defaults": True}
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # keyset pagination: (filter, sort key, id) so every page is a single index range scan
+        Index("ix_products_price_id", "product_price", "id"),
+        Index("ix_products_category_price_id", "category_id", "product_price", "id"),
+        Index("ix_products_merchant_price_id", "merchant_id", "product_price", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_category_created_at_id", "category_id", "created_at", "id"),
+        Index("ix_products_merchant_created_at_id", "merchant_id", "created_at", "id"),
+        Index("ix_products_rating_avg_id", "rating_avg", "id"),
+        Index("ix_products_category_rating_avg_id", "category_id", "rating_avg", "id"),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        # merchant's own article number, the key bulk imports upsert on
+        UniqueConstraint("merchant_id", "sku", name="uq_products_merchant_sku"),
+        # last line of defence against oversell, checkout never lets it fire
+        CheckConstraint("product_quantity >= 0", name="ck_products_quantity_non_negative"),
+        # the inventory reconciler walks only the few hot products
+        Index("ix_products_hot_inventory", "id", postgresql_where=text("is_hot_inventory")),
+    )
     
     id: Mapped[uuid.UUID]                           = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
+    sku: Mapped[str | None]                         = mapped_column(String(64), nullable=True)
     product_name: Mapped[str]                       = mapped_column(String(50), nullable=False)
     product_price: Mapped[Decimal]                  = mapped_column(Numeric(10,2), nullable=False)
     product_description: Mapped[str]                = mapped_column(String(500), nullable=False)
     product_discount: Mapped[Decimal]               = mapped_column(Numeric(10,2), default=0)
 
     product_quantity: Mapped[int]                   = mapped_column(default=0)
+    # stock of hot products is counted in Redis (backend.products.hot_inventory), this column lags by one reconcile
+    is_hot_inventory: Mapped[bool]                  = mapped_column(Boolean, default=False, server_default=text("false"))
+    created_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"))
+    updated_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"), onupdate=text("TIMEZONE('utc',now())"))
+    # denormalized from comments, updated in the same transaction as every comment write
+    rating_sum: Mapped[int]                         = mapped_column(default=0, server_default=text("0"))
+    rating_count: Mapped[int]                       = mapped_column(default=0, server_default=text("0"))
+    rating_avg: Mapped[Decimal]                     = mapped_column(Numeric(4,2), default=0, server_default=text("0"))
+    # maintained by the products_search_vector trigger, never written by the app
+    search_vector: Mapped[str | None]               = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     category_id: Mapped[int]                        = mapped_column(ForeignKey("categories.id"))
     category: Mapped["Category"] = relationship(
         "Category",
         back_populates="products",
-        lazy="joined"
+        # category names come from the in-memory registry, never from a join
+        lazy="raise_on_sql"
     )
 
     merchant_id: Mapped[uuid.UUID]                  = mapped_column(ForeignKey("merchants.id"))
@@ -91,6 +123,23 @@ class Product(Base):
         cascade="all, delete-orphan"
     )
 
+# name weighs more than description when ranking search results
+event.listen(Product.__table__, "after_create", DDL("""
+CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.product_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.product_description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""").execute_if(dialect="postgresql"))
+event.listen(Product.__table__, "after_create", DDL("""
+CREATE TRIGGER products_search_vector
+BEFORE INSERT OR UPDATE OF product_name, product_description ON products
+FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()
+""").execute_if(dialect="postgresql"))
+
 class Merchant(Base):
     __tablename__ = "merchants"
 
@@ -105,6 +154,7 @@ class Merchant(Base):
     is_active: Mapped[bool]                         = mapped_column(default=False, server_default=text('false'))
     
     created_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"))
+    updated_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"), onupdate=text("TIMEZONE('utc',now())"))
 
     
     products: Mapped[list["Product"]] = relationship(
@@ -115,6 +165,9 @@ class Merchant(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id: Mapped[uuid.UUID]                           = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4) 
     username: Mapped[str]                           = mapped_column(String(50), unique=True, nullable=False)
@@ -123,6 +176,7 @@ class User(Base):
     first_name: Mapped[str]                         = mapped_column(String(50), nullable=False)
     last_name: Mapped[str]                          = mapped_column(String(50), nullable=False)
     created_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"))
+    updated_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"), onupdate=text("TIMEZONE('utc',now())"))
     password: Mapped[str]                           = mapped_column(String(256), nullable=False)
 
 
@@ -165,6 +219,7 @@ class Category(Base):
     
     id: Mapped[int]                                 = mapped_column(primary_key=True, autoincrement=True)
     category_name: Mapped[str]                      = mapped_column(String(30), nullable=False)
+    updated_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"), onupdate=text("TIMEZONE('utc',now())"))
     
     products: Mapped[list["Product"]] = relationship(
         "Product", 
@@ -194,6 +249,9 @@ class Comment(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_order_date_id", "order_date", "id"),
+    )
     
     id: Mapped[uuid.UUID]                           = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID]                      = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -216,6 +274,9 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+    )
 
     id: Mapped[uuid.UUID]                           = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -226,3 +287,33 @@ class OrderItem(Base):
 
     order: Mapped["Order"] = relationship("Order", back_populates="items")
     product: Mapped["Product"] = relationship("Product", back_populates="order_items")
+
+class OutboxEvent(Base):
+    """
+    Side effects of a business change, written in the same transaction and
+    published later by backend.outbox.relay. Events of one aggregate are
+    published strictly in id order.
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # what the relay scans: unfinished events, oldest first
+        Index("ix_outbox_events_unfinished", "id", postgresql_where=text("published_at IS NULL AND failed_at IS NULL")),
+        Index(
+            "ix_outbox_events_aggregate_unfinished",
+            "aggregate_type", "aggregate_id", "id",
+            postgresql_where=text("published_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int]                                 = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    aggregate_type: Mapped[str]                     = mapped_column(String(50), nullable=False)
+    aggregate_id: Mapped[str]                       = mapped_column(String(100), nullable=False)
+    event_type: Mapped[str]                         = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict]                           = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime.datetime]           = mapped_column(server_default=text("TIMEZONE('utc',now())"))
+    attempts: Mapped[int]                           = mapped_column(default=0, server_default=text("0"))
+    next_attempt_at: Mapped[datetime.datetime]      = mapped_column(server_default=text("TIMEZONE('utc',now())"))
+    last_error: Mapped[str | None]                  = mapped_column(Text, nullable=True)
+    published_at: Mapped[datetime.datetime | None]  = mapped_column(nullable=True)
+    # set when the relay gives up; the aggregate's later events are released
+    failed_at: Mapped[datetime.datetime | None]     = mapped_column(nullable=True)
@@ -0,0 +1,103 @@
+import datetime
+from uuid import UUID
+
+from enum import Enum
+
+from sqlalchemy import exists, select, update
+from sqlalchemy.engine import Row
+
+from backend.dao_base import BaseDao
+from backend.loader_profiles import ORDER_DETAIL
+from backend.models import Order, OrderItem, OrderStatus, Product
+from backend.orders.transitions import StateMachine
+
+
+class OrderDao(BaseDao):
+
+    model = Order
+
+    async def find_detail(self, order_id: UUID) -> Order | None:
+        query = ORDER_DETAIL.apply(select(Order)).filter_by(id=order_id)
+        return await self.session.scalar(query)
+
+    async def lock_abandoned(self, cutoff: datetime.datetime, limit: int) -> list[UUID]:
+        """Oldest unpaid orders placed before `cutoff`; rows locked by a concurrent payment are skipped."""
+        query = (
+            select(Order.id)
+            .where(Order.status == OrderStatus.PENDING, Order.order_date < cutoff)
+            .order_by(Order.order_date)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list((await self.session.scalars(query)).all())
+
+    async def find_statuses(self, order_ids: list[UUID]) -> dict[UUID, OrderStatus]:
+        if not order_ids:
+            return {}
+        result = await self.session.execute(select(Order.id, Order.status).where(Order.id.in_(order_ids)))
+        return {row.id: row.status for row in result.all()}
+
+    async def set_status(self, order_ids: list[UUID], status: OrderStatus) -> None:
+        if order_ids:
+            await self.session.execute(update(Order).where(Order.id.in_(order_ids)).values(status=status))
+
+    async def transition(self, order_ids: list[UUID], machine: StateMachine, target: Enum, merchant_id: UUID) -> list[Row]:
+        """
+        Moves every order of `order_ids` that may move to `target` in one statement.
+        The orders among them with a line of the merchant are locked in id order;
+        only those without lines of other merchants are moved, the state guard is
+        part of the UPDATE. Returns one row per order found, with its state before
+        the statement, whether it is shared with other merchants and whether it was moved.
+        """
+        def lines(merchant_condition):
+            return exists().where(
+                OrderItem.order_id == Order.id,
+                OrderItem.product_id == Product.id,
+                merchant_condition,
+            )
+
+        locked = (
+            select(
+                Order.id,
+                Order.status,
+                Order.fulfillment_status,
+                Order.shipment_status,
+                lines(Product.merchant_id != merchant_id).label("shared"),
+            )
+            .where(Order.id.in_(order_ids), lines(Product.merchant_id == merchant_id))
+            .order_by(Order.id)
+            .with_for_update(key_share=True, of=Order)
+            .cte("locked")
+        )
+        moved = (
+            update(Order)
+            .where(Order.id == locked.c.id, locked.c.shared.is_(False), *machine.conditions(target))
+            .values({machine.field.value: target})
+            .returning(Order.id)
+            .cte("moved")
+        )
+        query = (
+            select(
+                locked.c.id,
+                locked.c.status,
+                locked.c.fulfillment_status,
+                locked.c.shipment_status,
+                locked.c.shared,
+                moved.c.id.is_not(None).label("applied"),
+            )
+            .outerjoin(moved, moved.c.id == locked.c.id)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+
+class OrderItemDao(BaseDao):
+
+    model = OrderItem
+
+    async def find_for_orders(self, order_ids: list[UUID]) -> list[Row]:
+        if not order_ids:
+            return []
+        query = select(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity).where(OrderItem.order_id.in_(order_ids))
+        result = await self.session.execute(query)
+        return result.all()
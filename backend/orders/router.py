@@ -0,0 +1,70 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, status
+
+from backend.auth.dependencies import get_current_user, get_current_user_w_verification
+from backend.auth.schemas import PrincipalSchema
+from backend.orders.schemas import CheckoutSchema, OrderResponseSchema
+from backend.orders.service import CheckoutService, OrderService
+
+
+router = APIRouter()
+
+
+@router.post(
+    "/checkout",
+    status_code=status.HTTP_201_CREATED,
+    response_model=OrderResponseSchema,
+    description="Create an order from the cart, reserving stock for every line at once",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Cart is empty",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Cart is empty"}
+                }
+            }
+        },
+        status.HTTP_409_CONFLICT: {
+            "description": "Not enough stock, nothing was reserved",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Not enough stock for products: 3fa85f64-5717-4562-b3fc-2c963f66afa6"}
+                }
+            }
+        },
+    },
+)
+async def checkout(
+    data: CheckoutSchema,
+    user: Annotated[PrincipalSchema, Depends(get_current_user_w_verification)],
+    service: Annotated[CheckoutService, Depends()],
+) -> OrderResponseSchema:
+    response = await service.checkout(data=data, user=user)
+    return response
+
+
+@router.get(
+    "/{order_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=OrderResponseSchema,
+    description="Own order with its items",
+    responses={
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Order not found",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Order not found"}
+                }
+            }
+        }
+    },
+)
+async def get_order(
+    order_id: UUID,
+    user: Annotated[PrincipalSchema, Depends(get_current_user)],
+    service: Annotated[OrderService, Depends()],
+) -> OrderResponseSchema:
+    response = await service.get_order(order_id=order_id, user=user)
+    return response
@@ -0,0 +1,61 @@
+import datetime
+from decimal import Decimal
+from uuid import UUID
+
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from backend.models import FulfillmentStatus, OrderStatus, ShipmentStatus
+from backend.orders.transitions import STATE_MACHINES, TransitionField
+
+
+class CheckoutSchema(BaseModel):
+    shipping_address: str = Field(default=..., min_length=1, max_length=500)
+    payment_method: str = Field(default=..., min_length=1, max_length=50)
+
+class OrderItemSchema(BaseModel):
+    product_id: UUID
+    product_name: str
+    quantity: int
+    price_at_purchase: Decimal
+
+class OrderResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    order_date: datetime.datetime
+    status: OrderStatus
+    fulfillment_status: FulfillmentStatus
+    shipment_status: ShipmentStatus
+    total_amount: Decimal
+    shipping_address: str
+    payment_method: str
+    transaction_id: str
+    items: list[OrderItemSchema]
+
+class OrderTransitionSchema(BaseModel):
+    field: TransitionField
+    target: str = Field(default=..., description="New value of `field`, e.g. \"In transit\" for shipment_status")
+    order_ids: list[UUID] = Field(default=..., min_length=1, max_length=1000)
+
+    @model_validator(mode="after")
+    def check_target(self) -> "OrderTransitionSchema":
+        STATE_MACHINES[self.field].parse(self.target)
+        return self
+
+class TransitionOutcome(str, Enum):
+    APPLIED = "applied"
+    REJECTED = "rejected"
+    NOT_FOUND = "not_found"
+
+class OrderTransitionResultSchema(BaseModel):
+    order_id: UUID
+    outcome: TransitionOutcome
+    previous: str | None = None
+    reason: str | None = None
+
+class BulkTransitionResultSchema(BaseModel):
+    applied: int
+    rejected: int
+    results: list[OrderTransitionResultSchema]
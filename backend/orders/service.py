@@ -0,0 +1,327 @@
+import uuid
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.auth.schemas import PrincipalSchema
+from backend.cart.service import unit_price
+from backend.cart.store import CartOwner, CartStore, get_cart_store
+from backend.database.db import get_read_session, get_session
+from backend.models import Order, OrderStatus, UserRole
+from backend.orders.dao_orders import OrderDao, OrderItemDao
+from backend.orders.schemas import (
+    BulkTransitionResultSchema,
+    CheckoutSchema,
+    OrderItemSchema,
+    OrderResponseSchema,
+    OrderTransitionResultSchema,
+    OrderTransitionSchema,
+    TransitionOutcome,
+)
+from backend.orders.stock import bump_products, release_reserved, restock_canceled
+from backend.orders.transitions import STATE_MACHINES, TransitionField
+from backend.outbox.dao_outbox import OutboxDao
+from backend.outbox.events import OutboxEventType, outbox_event
+from backend.outbox.tasks import relay_after_commit
+from backend.products.dao_products import ProductDao
+from backend.products.hot_inventory import hot_inventory
+from backend.products.service import product_scopes
+from backend.response_cache import catalog_cache
+from backend.settings import settings
+
+
+def order_response(order: Order, items: list[OrderItemSchema]) -> OrderResponseSchema:
+    return OrderResponseSchema(
+        id=order.id,
+        order_date=order.order_date,
+        status=order.status,
+        fulfillment_status=order.fulfillment_status,
+        shipment_status=order.shipment_status,
+        total_amount=order.total_amount,
+        shipping_address=order.shipping_address,
+        payment_method=order.payment_method,
+        transaction_id=order.transaction_id,
+        items=items,
+    )
+
+
+class CheckoutService:
+    """
+    Turns the user's cart into an order. Stock for all regular lines is reserved
+    by one conditional UPDATE; the order and its items are written in the same
+    transaction, so any shortage or failure leaves stock untouched. Lines of hot
+    products are reserved in Redis first and released again if the order fails.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_session),
+        cart_store: CartStore = Depends(get_cart_store),
+    ) -> None:
+        self.order_dao = OrderDao(session)
+        self.order_item_dao = OrderItemDao(session)
+        self.product_dao = ProductDao(session)
+        self.outbox_dao = OutboxDao(session)
+        self.cart_store = cart_store
+
+    async def _rollback(self) -> None:
+        await self.order_dao.session.rollback()
+
+    async def _cart_items(self, owner: CartOwner) -> dict[UUID, int]:
+        try:
+            items = await self.cart_store.get(owner)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Cart is temporarily unavailable"
+            )
+        if not items:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cart is empty"
+            )
+        return items
+
+    def _not_enough_stock(self, product_ids) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Not enough stock for products: {', '.join(sorted(str(product_id) for product_id in product_ids))}"
+        )
+
+    async def _reserve_hot(self, order_id: UUID, items: dict[UUID, int]) -> None:
+        try:
+            short = await hot_inventory.reserve(order_id, items, settings.inventory_settings.inventory_reservation_ttl)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Inventory is temporarily unavailable"
+            )
+        if short:
+            raise self._not_enough_stock(short)
+
+    async def _release_hot(self, order_id: UUID) -> None:
+        # on failure the reservation simply expires and the reconciler releases it
+        try:
+            orphaned = await hot_inventory.release(order_id)
+            if orphaned:
+                await self.product_dao.restock(orphaned)
+                await self.order_dao.session.commit()
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+        except SQLAlchemyError as e:
+            await self._rollback()
+            print(f"SQLAlchemyError: {e}")
+
+    async def checkout(self, *, data: CheckoutSchema, user: PrincipalSchema) -> OrderResponseSchema:
+        owner = CartOwner.user(user.id)
+        items = await self._cart_items(owner)
+        order_id = uuid.uuid4()
+
+        products = await self.product_dao.find_prices(list(items))
+        if items.keys() - products.keys():
+            raise self._not_enough_stock(items.keys() - products.keys())
+        # hot products are reserved in Redis and never touch their row here
+        hot = {product_id: quantity for product_id, quantity in items.items() if products[product_id].is_hot_inventory}
+        cold = {product_id: quantity for product_id, quantity in items.items() if product_id not in hot}
+        if hot:
+            await self._reserve_hot(order_id, hot)
+
+        try:
+            reserved = await self.product_dao.reserve_stock(cold) if cold else []
+            if len(reserved) != len(cold):
+                await self._rollback()
+                if hot:
+                    await self._release_hot(order_id)
+                raise self._not_enough_stock(cold.keys() - {row.id for row in reserved})
+
+            # cold prices come from the locked rows, hot ones from the read above
+            priced = {**{product_id: products[product_id] for product_id in hot}, **{row.id: row for row in reserved}}
+            lines = [
+                OrderItemSchema(
+                    product_id=product_id,
+                    product_name=priced[product_id].product_name,
+                    quantity=quantity,
+                    price_at_purchase=unit_price(priced[product_id].product_price, priced[product_id].product_discount),
+                )
+                for product_id, quantity in items.items()
+            ]
+            order = await self.order_dao.insert_returning({
+                "id": order_id,
+                "user_id": user.id,
+                "total_amount": sum((line.price_at_purchase * line.quantity for line in lines), Decimal("0")),
+                "status": OrderStatus.PENDING,
+                "shipping_address": data.shipping_address,
+                "payment_method": data.payment_method,
+                "transaction_id": uuid.uuid4().hex,
+            })
+            await self.order_item_dao.bulk_insert([
+                {
+                    "id": uuid.uuid4(),
+                    "order_id": order_id,
+                    "product_id": line.product_id,
+                    "quantity": line.quantity,
+                    "price_at_purchase": line.price_at_purchase,
+                }
+                for line in lines
+            ])
+            await self.outbox_dao.add(outbox_event(
+                OutboxEventType.ORDER_PLACED,
+                aggregate_type="order",
+                aggregate_id=order_id,
+                payload={
+                    "order_id": str(order_id),
+                    "user_id": str(user.id),
+                    "total_amount": str(order.total_amount),
+                    "items": [{"product_id": str(line.product_id), "quantity": line.quantity} for line in lines],
+                },
+            ))
+            await self.order_dao.session.commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            print(f"SQLAlchemyError: {e}")
+            if hot:
+                await self._release_hot(order_id)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Oops.. Something unexpected happened"
+            )
+
+        await relay_after_commit()
+        try:
+            await self.cart_store.clear(owner)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+        scopes = set()
+        for row in reserved:
+            scopes.update(product_scopes(row.id, row.category_id, row.merchant_id))
+        await catalog_cache.bump(*scopes)
+
+        return order_response(order, lines)
+
+
+class OrderService:
+
+    def __init__(self, session: AsyncSession = Depends(get_read_session)) -> None:
+        self.order_dao = OrderDao(session)
+
+    async def get_order(self, *, order_id: UUID, user: PrincipalSchema) -> OrderResponseSchema:
+        order = await self.order_dao.find_detail(order_id)
+        if order is None or (order.user_id != user.id and user.role != UserRole.ADMIN):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        return order_response(order, [
+            OrderItemSchema(
+                product_id=item.product_id,
+                product_name=item.product.product_name,
+                quantity=item.quantity,
+                price_at_purchase=item.price_at_purchase,
+            )
+            for item in order.items
+        ])
+
+
+class OrderTransitionService:
+    """
+    Bulk status changes for merchants: one statement per request whatever the
+    number of orders. Orders that may not move are reported, the rest of the
+    batch is applied. Statuses are per order, not per merchant: a merchant may
+    only change orders whose lines are all its own products. Orders shared with
+    other merchants are reported as rejected.
+    """
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.order_dao = OrderDao(session)
+        self.outbox_dao = OutboxDao(session)
+
+    async def transition(self, *, data: OrderTransitionSchema, merchant_id: UUID) -> BulkTransitionResultSchema:
+        machine = STATE_MACHINES[data.field]
+        target = machine.parse(data.target)
+        order_ids = list(dict.fromkeys(data.order_ids))
+        canceling = data.field == TransitionField.STATUS and target == OrderStatus.CANCELED
+        session = self.order_dao.session
+
+        try:
+            rows = await self.order_dao.transition(order_ids, machine, target, merchant_id)
+            applied = [row.id for row in rows if row.applied]
+            release, restocked = await restock_canceled(session, applied) if canceling else ([], [])
+            await self.outbox_dao.add(*(
+                outbox_event(
+                    OutboxEventType.ORDER_STATUS_CHANGED,
+                    aggregate_type="order",
+                    aggregate_id=row.id,
+                    payload={
+                        "order_id": str(row.id),
+                        "field": data.field.value,
+                        "from": getattr(row, data.field.value).value,
+                        "to": target.value,
+                    },
+                )
+                for row in rows if row.applied
+            ))
+            await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            print(f"SQLAlchemyError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Oops.. Something unexpected happened"
+            )
+        except (RedisError, OSError) as e:
+            await session.rollback()
+            print(f"RedisError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Inventory is temporarily unavailable"
+            )
+
+        await relay_after_commit()
+        # hot reservations are settled by the inventory reconciler if this fails
+        try:
+            if canceling:
+                restocked += await release_reserved(session, release)
+            elif data.field == TransitionField.STATUS and target == OrderStatus.PROCESSING:
+                await hot_inventory.confirm(applied)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+        except SQLAlchemyError as e:
+            await session.rollback()
+            print(f"SQLAlchemyError: {e}")
+        await bump_products(restocked)
+
+        found = {row.id: row for row in rows}
+        results = []
+        for order_id in order_ids:
+            row = found.get(order_id)
+            if row is None:
+                results.append(OrderTransitionResultSchema(
+                    order_id=order_id,
+                    outcome=TransitionOutcome.NOT_FOUND,
+                    reason="Order not found"
+                ))
+                continue
+            previous = getattr(row, data.field.value)
+            if row.applied:
+                reason = None
+            elif row.shared:
+                reason = "Order also contains products of other merchants"
+            else:
+                reason = machine.rejection(row._mapping, target)
+            results.append(OrderTransitionResultSchema(
+                order_id=order_id,
+                outcome=TransitionOutcome.APPLIED if row.applied else TransitionOutcome.REJECTED,
+                previous=previous.value,
+                reason=reason,
+            ))
+        return BulkTransitionResultSchema(
+            applied=len(applied),
+            rejected=sum(result.outcome == TransitionOutcome.REJECTED for result in results),
+            results=results,
+        )
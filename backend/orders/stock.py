@@ -0,0 +1,59 @@
+from uuid import UUID
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.orders.dao_orders import OrderItemDao
+from backend.products.dao_products import ProductDao
+from backend.products.hot_inventory import hot_inventory
+from backend.products.service import product_scopes
+from backend.response_cache import catalog_cache
+
+
+def add_quantities(total: dict[UUID, int], items: dict[UUID, int]) -> None:
+    for product_id, quantity in items.items():
+        total[product_id] = total.get(product_id, 0) + quantity
+
+
+async def bump_products(rows: list[Row]) -> None:
+    scopes = set()
+    for row in rows:
+        scopes.update(product_scopes(row.id, row.category_id, row.merchant_id))
+    await catalog_cache.bump(*scopes)
+
+
+async def restock_canceled(session: AsyncSession, order_ids: list[UUID]) -> tuple[list[UUID], list[Row]]:
+    """
+    First half of canceling orders, inside the canceling transaction: lines that
+    are not reserved in Redis go back to their product rows. Returns the orders
+    whose hot reservations must be released after commit (release_reserved) and
+    the restocked products.
+    """
+    if not order_ids:
+        return [], []
+    reserved = await hot_inventory.reserved(order_ids)
+    cold: dict[UUID, int] = {}
+    for row in await OrderItemDao(session).find_for_orders(order_ids):
+        if row.product_id not in reserved[row.order_id]:
+            add_quantities(cold, {row.product_id: row.quantity})
+    restocked = await ProductDao(session).restock(cold)
+    return [order_id for order_id in order_ids if reserved[order_id]], restocked
+
+
+async def release_reserved(session: AsyncSession, order_ids: list[UUID]) -> list[Row]:
+    """
+    Second half, after commit: hot reservations go back to their Redis counters,
+    lines of products that left hot mode meanwhile to their rows. Returns the
+    restocked products.
+    """
+    orphaned: dict[UUID, int] = {}
+    for order_id in order_ids:
+        add_quantities(orphaned, await hot_inventory.release(order_id))
+    if not orphaned:
+        return []
+    restocked = await ProductDao(session).restock(orphaned)
+    await session.commit()
+    return restocked
+
+
+__all__ = ("add_quantities", "bump_products", "release_reserved", "restock_canceled")
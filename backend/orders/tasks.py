@@ -0,0 +1,108 @@
+import datetime
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.celery_app import celery_app, run_in_worker_loop
+from backend.database.db import standalone_session
+from backend.models import OrderStatus
+from backend.orders.dao_orders import OrderDao
+from backend.orders.stock import bump_products, release_reserved, restock_canceled
+from backend.outbox.dao_outbox import OutboxDao
+from backend.outbox.events import OutboxEventType, outbox_event
+from backend.products.dao_products import ProductDao
+from backend.products.hot_inventory import hot_inventory
+from backend.settings import settings
+
+
+async def cancel_abandoned_orders(session: AsyncSession, batch_size: int) -> int:
+    """Cancels unpaid orders older than the reservation TTL and returns their stock."""
+    cutoff = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(
+        seconds=settings.inventory_settings.inventory_reservation_ttl
+    )
+    order_dao = OrderDao(session)
+    order_ids = await order_dao.lock_abandoned(cutoff, batch_size)
+    if not order_ids:
+        await session.rollback()
+        return 0
+
+    release, restocked = await restock_canceled(session, order_ids)
+    await order_dao.set_status(order_ids, OrderStatus.CANCELED)
+    await OutboxDao(session).add(*(
+        outbox_event(
+            OutboxEventType.ORDER_STATUS_CHANGED,
+            aggregate_type="order",
+            aggregate_id=order_id,
+            payload={
+                "order_id": str(order_id),
+                "field": "status",
+                "from": OrderStatus.PENDING.value,
+                "to": OrderStatus.CANCELED.value,
+                "reason": "abandoned",
+            },
+        )
+        for order_id in order_ids
+    ))
+    await session.commit()
+    restocked += await release_reserved(session, release)
+    await bump_products(restocked)
+    return len(order_ids)
+
+
+async def settle_expired_reservations(session: AsyncSession, batch_size: int) -> int:
+    """Reservations past their TTL: released unless the order was paid meanwhile."""
+    order_ids = await hot_inventory.expired(batch_size)
+    statuses = await OrderDao(session).find_statuses(order_ids)
+    await session.rollback()
+    # pending orders are left to cancel_abandoned_orders, which also fixes their regular lines
+    release = [order_id for order_id in order_ids if statuses.get(order_id) in (None, OrderStatus.CANCELED)]
+    confirm = [order_id for order_id in order_ids if statuses.get(order_id) not in (None, OrderStatus.CANCELED, OrderStatus.PENDING)]
+    await hot_inventory.confirm(confirm)
+    await bump_products(await release_reserved(session, release))
+    return len(release) + len(confirm)
+
+
+async def write_back_counters(session: AsyncSession, batch_size: int) -> int:
+    """Copies hot counters to product_quantity batch by batch and seeds missing counters."""
+    product_dao = ProductDao(session)
+    written = 0
+    after_id = None
+    while True:
+        page = await product_dao.hot_products_page(after_id, batch_size)
+        if not page:
+            break
+        counters = await hot_inventory.counters([row.id for row in page])
+        await hot_inventory.seed(
+            {row.id: row.product_quantity for row in page if counters[row.id] is None},
+            overwrite=False,
+        )
+        changed = await product_dao.write_back_quantities(
+            {product_id: quantity for product_id, quantity in counters.items() if quantity is not None}
+        )
+        await session.commit()
+        await bump_products(changed)
+        written += len(changed)
+        after_id = page[-1].id
+    return written
+
+
+async def reconcile_inventory_async() -> dict[str, int]:
+    batch_size = settings.inventory_settings.inventory_reconcile_batch_size
+    async with standalone_session() as session:
+        canceled = await cancel_abandoned_orders(session, batch_size)
+        settled = await settle_expired_reservations(session, batch_size)
+        written = await write_back_counters(session, batch_size)
+    return {"canceled": canceled, "settled": settled, "written": written}
+
+
+@celery_app.task(name="orders.reconcile_inventory")
+def reconcile_inventory() -> dict[str, int] | None:
+    """Periodic (celery beat): abandoned orders, expired hot reservations, hot counter write-back."""
+    try:
+        stats = run_in_worker_loop(reconcile_inventory_async())
+    except (RedisError, OSError) as e:
+        # the next run picks up where this one stopped
+        print(f"RedisError: {e}")
+        return None
+    print(f"Inventory reconciled: {stats}")
+    return stats
@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Mapping
+
+from sqlalchemy import ColumnElement
+
+from backend.models import FulfillmentStatus, Order, OrderStatus, ShipmentStatus
+
+
+class TransitionField(str, Enum):
+    STATUS = "status"
+    FULFILLMENT = "fulfillment_status"
+    SHIPMENT = "shipment_status"
+
+
+@dataclass(frozen=True)
+class StateMachine:
+    """
+    Allowed transitions of one status column. `requires` pins other columns of
+    the order: under the key None for every move of this column, under a target
+    state only for moves into it. The same tables drive the SQL guard of the
+    bulk UPDATE and the reason reported for a rejected order.
+    """
+    field: TransitionField
+    states: type[Enum]
+    allowed: Mapping[Enum, frozenset[Enum]]
+    requires: Mapping[Enum | None, Mapping[TransitionField, Enum]] = field(default_factory=dict)
+
+    def sources(self, target: Enum) -> list[Enum]:
+        return [state for state, targets in self.allowed.items() if target in targets]
+
+    def requirements(self, target: Enum) -> dict[TransitionField, Enum]:
+        return {**self.requires.get(None, {}), **self.requires.get(target, {})}
+
+    def parse(self, value: str) -> Enum:
+        try:
+            return self.states(value)
+        except ValueError:
+            raise ValueError(f"{value!r} is not a valid {self.field.value}, expected one of: {', '.join(state.value for state in self.states)}")
+
+    def conditions(self, target: Enum) -> list[ColumnElement[bool]]:
+        """WHERE clause admitting exactly the orders `target` is reachable from."""
+        return [
+            getattr(Order, self.field.value).in_(self.sources(target)),
+            *(getattr(Order, other.value) == state for other, state in self.requirements(target).items()),
+        ]
+
+    def rejection(self, current: Mapping[str, Any], target: Enum) -> str | None:
+        """Why an order in `current` state cannot move to `target`; None if it can."""
+        state = current[self.field.value]
+        if state == target:
+            return f"Already {target.value}"
+        if target not in self.allowed.get(state, frozenset()):
+            return f"Cannot change {self.field.value} from {state.value} to {target.value}"
+        for other, required in self.requirements(target).items():
+            if current[other.value] != required:
+                return f"{other.value} must be {required.value}, is {current[other.value].value}"
+        return None
+
+
+ORDER_STATUS = StateMachine(
+    field=TransitionField.STATUS,
+    states=OrderStatus,
+    allowed={
+        OrderStatus.PENDING: frozenset({OrderStatus.PROCESSING, OrderStatus.CANCELED}),
+        OrderStatus.PROCESSING: frozenset({OrderStatus.COMPLETED, OrderStatus.CANCELED, OrderStatus.EXCEPTION}),
+        OrderStatus.EXCEPTION: frozenset({OrderStatus.PROCESSING, OrderStatus.CANCELED}),
+        OrderStatus.COMPLETED: frozenset(),
+        OrderStatus.CANCELED: frozenset(),
+    },
+    requires={
+        OrderStatus.COMPLETED: {
+            TransitionField.FULFILLMENT: FulfillmentStatus.FULFILLED,
+            TransitionField.SHIPMENT: ShipmentStatus.DELIVERED,
+        },
+        # shipped goods cannot be canceled, only handled as an exception
+        OrderStatus.CANCELED: {TransitionField.SHIPMENT: ShipmentStatus.AWAITING_PICKUP},
+    },
+)
+
+FULFILLMENT_STATUS = StateMachine(
+    field=TransitionField.FULFILLMENT,
+    states=FulfillmentStatus,
+    allowed={
+        FulfillmentStatus.UNFULFILLED: frozenset({FulfillmentStatus.FULFILLED, FulfillmentStatus.ON_HOLD}),
+        FulfillmentStatus.ON_HOLD: frozenset({FulfillmentStatus.UNFULFILLED, FulfillmentStatus.FULFILLED}),
+        FulfillmentStatus.FULFILLED: frozenset(),
+    },
+    requires={None: {TransitionField.STATUS: OrderStatus.PROCESSING}},
+)
+
+SHIPMENT_STATUS = StateMachine(
+    field=TransitionField.SHIPMENT,
+    states=ShipmentStatus,
+    allowed={
+        ShipmentStatus.AWAITING_PICKUP: frozenset({
+            ShipmentStatus.IN_TRANSIT,
+            ShipmentStatus.AVAILABLE_FOR_PICKUP,
+            ShipmentStatus.EXCEPTION,
+        }),
+        ShipmentStatus.IN_TRANSIT: frozenset({
+            ShipmentStatus.DELAYED,
+            ShipmentStatus.OUT_FOR_DELIVERY,
+            ShipmentStatus.AVAILABLE_FOR_PICKUP,
+            ShipmentStatus.EXCEPTION,
+        }),
+        ShipmentStatus.DELAYED: frozenset({
+            ShipmentStatus.IN_TRANSIT,
+            ShipmentStatus.OUT_FOR_DELIVERY,
+            ShipmentStatus.EXCEPTION,
+        }),
+        ShipmentStatus.OUT_FOR_DELIVERY: frozenset({
+            ShipmentStatus.DELIVERED,
+            ShipmentStatus.DELAYED,
+            ShipmentStatus.AVAILABLE_FOR_PICKUP,
+            ShipmentStatus.EXCEPTION,
+        }),
+        ShipmentStatus.AVAILABLE_FOR_PICKUP: frozenset({ShipmentStatus.DELIVERED, ShipmentStatus.EXCEPTION}),
+        ShipmentStatus.EXCEPTION: frozenset({ShipmentStatus.AWAITING_PICKUP, ShipmentStatus.IN_TRANSIT}),
+        ShipmentStatus.DELIVERED: frozenset(),
+    },
+    requires={
+        # nothing leaves the warehouse before it is packed
+        None: {
+            TransitionField.STATUS: OrderStatus.PROCESSING,
+            TransitionField.FULFILLMENT: FulfillmentStatus.FULFILLED,
+        },
+    },
+)
+
+STATE_MACHINES = {machine.field: machine for machine in (ORDER_STATUS, FULFILLMENT_STATUS, SHIPMENT_STATUS)}
+
+
+__all__ = ("StateMachine", "TransitionField", "STATE_MACHINES", "ORDER_STATUS", "FULFILLMENT_STATUS", "SHIPMENT_STATUS")
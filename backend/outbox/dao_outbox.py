@@ -0,0 +1,67 @@
+import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import exists, func, select, text, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+
+from backend.dao_base import BaseDao
+from backend.models import OutboxEvent
+
+
+def unfinished(event=OutboxEvent):
+    return (event.published_at.is_(None), event.failed_at.is_(None))
+
+
+class OutboxDao(BaseDao):
+
+    model = OutboxEvent
+
+    async def add(self, *events: dict[str, Any]) -> None:
+        """Queues events in the caller's transaction, they are published only if it commits."""
+        await self.bulk_insert(events)
+
+    async def claim(self, limit: int, now: datetime.datetime) -> Sequence[OutboxEvent]:
+        """
+        Locks up to `limit` due events. An event whose aggregate still has an earlier
+        unfinished event is not due, so one aggregate never has two events in flight
+        and they are published in id order. Rows locked by another relay are skipped.
+        """
+        earlier = aliased(OutboxEvent)
+        blocked = exists().where(
+            earlier.aggregate_type == OutboxEvent.aggregate_type,
+            earlier.aggregate_id == OutboxEvent.aggregate_id,
+            earlier.id < OutboxEvent.id,
+            *unfinished(earlier),
+        )
+        query = (
+            select(OutboxEvent)
+            .where(*unfinished(), OutboxEvent.next_attempt_at <= now, ~blocked)
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=OutboxEvent)
+        )
+        return (await self.session.scalars(query)).all()
+
+    async def mark_published(self, event_ids: list[int]) -> None:
+        if event_ids:
+            query = (
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(event_ids))
+                .values(published_at=text("TIMEZONE('utc',now())"))
+                .execution_options(synchronize_session=False)
+            )
+            await self.session.execute(query)
+
+    async def backlog(self) -> Row:
+        """(pending, failed, oldest pending created_at)."""
+        query = select(
+            func.count().filter(*unfinished()).label("pending"),
+            func.count().filter(OutboxEvent.failed_at.is_not(None)).label("failed"),
+            func.min(OutboxEvent.created_at).filter(*unfinished()).label("oldest_pending_at"),
+        ).where(OutboxEvent.published_at.is_(None))
+        result = await self.session.execute(query)
+        return result.one()
+
+
+__all__ = ("OutboxDao",)
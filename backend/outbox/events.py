@@ -0,0 +1,23 @@
+from enum import Enum
+from typing import Any
+
+
+class OutboxEventType(str, Enum):
+    USER_REGISTERED = "user.registered"
+    USER_VERIFICATION_REQUESTED = "user.verification_requested"
+    USER_PASSWORD_RECOVERY_REQUESTED = "user.password_recovery_requested"
+    ORDER_PLACED = "order.placed"
+    ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+def outbox_event(event_type: OutboxEventType, *, aggregate_type: str, aggregate_id: Any, payload: dict[str, Any]) -> dict[str, Any]:
+    """Row for OutboxDao.add; `payload` must be JSON serializable."""
+    return {
+        "event_type": event_type.value,
+        "aggregate_type": aggregate_type,
+        "aggregate_id": str(aggregate_id),
+        "payload": payload,
+    }
+
+
+__all__ = ("OutboxEventType", "outbox_event")
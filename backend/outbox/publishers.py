@@ -0,0 +1,43 @@
+import json
+from typing import Awaitable, Callable
+
+from backend.auth.tasks import enqueue_email
+from backend.database.redis_client import redis_manager
+from backend.models import OutboxEvent
+from backend.outbox.events import OutboxEventType
+from backend.settings import settings
+
+
+Publisher = Callable[[OutboxEvent], Awaitable[None]]
+
+
+async def publish_to_stream(event: OutboxEvent) -> None:
+    """Default: append to the Redis stream events:<aggregate_type> for downstream consumers."""
+    await redis_manager.client.xadd(
+        f"events:{event.aggregate_type}",
+        {
+            "event_id": event.id,
+            "event_type": event.event_type,
+            "aggregate_id": event.aggregate_id,
+            "payload": json.dumps(event.payload),
+            "created_at": event.created_at.isoformat(),
+        },
+        maxlen=settings.outbox_settings.outbox_stream_maxlen,
+        approximate=True,
+    )
+
+
+def email_publisher(kind: str) -> Publisher:
+    async def publish(event: OutboxEvent) -> None:
+        await enqueue_email(kind, event.payload["email"])
+    return publish
+
+
+PUBLISHERS: dict[str, Publisher] = {
+    OutboxEventType.USER_REGISTERED.value: email_publisher("confirm"),
+    OutboxEventType.USER_VERIFICATION_REQUESTED.value: email_publisher("confirm"),
+    OutboxEventType.USER_PASSWORD_RECOVERY_REQUESTED.value: email_publisher("password_recovery"),
+}
+
+
+__all__ = ("PUBLISHERS", "Publisher", "publish_to_stream")
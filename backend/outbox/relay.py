@@ -0,0 +1,131 @@
+import asyncio
+import datetime
+import time
+from typing import Mapping
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.redis_client import redis_manager
+from backend.models import OutboxEvent
+from backend.outbox.dao_outbox import OutboxDao
+from backend.outbox.publishers import PUBLISHERS, Publisher, publish_to_stream
+from backend.settings import settings
+
+
+def utcnow() -> datetime.datetime:
+    # timestamps are stored as naive UTC
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class OutboxRelay:
+    """
+    Moves committed outbox events to Celery / Redis, at least once.
+
+    Each batch is claimed with FOR UPDATE SKIP LOCKED, so any number of relays can
+    run side by side. A batch holds at most one event per aggregate (see
+    OutboxDao.claim), which lets it be published concurrently without reordering.
+    A failed event is retried with exponential backoff and blocks the later events
+    of its aggregate until it succeeds or is given up after `max_attempts`.
+    Counters are kept in a Redis hash shared by all relays.
+    """
+
+    metrics_key = "outbox:metrics"
+
+    def __init__(
+        self,
+        publishers: Mapping[str, Publisher],
+        *,
+        batch_size: int,
+        max_batches: int,
+        max_attempts: int,
+        backoff: int,
+        backoff_max: int,
+    ) -> None:
+        self.publishers = publishers
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+    async def _publish(self, event: OutboxEvent) -> None:
+        await self.publishers.get(event.event_type, publish_to_stream)(event)
+
+    def _retry_later(self, event: OutboxEvent, error: BaseException, now: datetime.datetime) -> bool:
+        """Schedules the next attempt; True when the event is given up instead."""
+        event.attempts += 1
+        event.last_error = f"{type(error).__name__}: {error}"[:2000]
+        if event.attempts >= self.max_attempts:
+            event.failed_at = now
+            return True
+        delay = min(self.backoff * 2 ** (event.attempts - 1), self.backoff_max)
+        event.next_attempt_at = now + datetime.timedelta(seconds=delay)
+        return False
+
+    async def _record(self, published: int, retried: int, failed: int, elapsed: float) -> None:
+        try:
+            async with redis_manager.client.pipeline(transaction=False) as pipe:
+                pipe.hincrby(self.metrics_key, "batches", 1)
+                pipe.hincrby(self.metrics_key, "published", published)
+                pipe.hincrby(self.metrics_key, "retried", retried)
+                pipe.hincrby(self.metrics_key, "failed", failed)
+                pipe.hincrbyfloat(self.metrics_key, "busy_seconds", elapsed)
+                pipe.hset(self.metrics_key, mapping={"last_batch_at": time.time(), "last_batch_size": published + retried + failed})
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+
+    async def relay_batch(self, session: AsyncSession) -> int:
+        """Claims, publishes and settles one batch in one transaction. Returns the number claimed."""
+        started = time.perf_counter()
+        dao = OutboxDao(session)
+        now = utcnow()
+        events = await dao.claim(self.batch_size, now)
+        if not events:
+            await session.rollback()
+            return 0
+
+        outcomes = await asyncio.gather(*(self._publish(event) for event in events), return_exceptions=True)
+        published, retried, failed = [], 0, 0
+        for event, outcome in zip(events, outcomes):
+            if isinstance(outcome, BaseException):
+                print(f"Outbox event {event.id} ({event.event_type}) failed: {outcome}")
+                if self._retry_later(event, outcome, now):
+                    failed += 1
+                else:
+                    retried += 1
+            else:
+                published.append(event.id)
+        await dao.mark_published(published)
+        await session.commit()
+
+        await self._record(len(published), retried, failed, time.perf_counter() - started)
+        return len(events)
+
+    async def run(self, session: AsyncSession) -> int:
+        """Drains due events, up to `max_batches` batches. Returns the number claimed."""
+        claimed = 0
+        for _ in range(self.max_batches):
+            batch = await self.relay_batch(session)
+            claimed += batch
+            if batch < self.batch_size:
+                break
+        return claimed
+
+    async def metrics(self) -> dict[str, float]:
+        raw = await redis_manager.client.hgetall(self.metrics_key)
+        return {key.decode(): float(value) for key, value in raw.items()}
+
+
+outbox_relay = OutboxRelay(
+    PUBLISHERS,
+    batch_size=settings.outbox_settings.outbox_batch_size,
+    max_batches=settings.outbox_settings.outbox_max_batches_per_run,
+    max_attempts=settings.outbox_settings.outbox_max_attempts,
+    backoff=settings.outbox_settings.outbox_retry_backoff,
+    backoff_max=settings.outbox_settings.outbox_retry_backoff_max,
+)
+
+
+__all__ = ("OutboxRelay", "outbox_relay")
@@ -0,0 +1,22 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+
+from backend.auth.dependencies import require_role
+from backend.models import UserRole
+from backend.outbox.schemas import OutboxStatsSchema
+from backend.outbox.service import OutboxAdminService
+
+
+admin_router = APIRouter(dependencies=[Depends(require_role(UserRole.ADMIN))])
+
+
+@admin_router.get(
+    "/stats",
+    status_code=status.HTTP_200_OK,
+    response_model=OutboxStatsSchema,
+    description="Outbox backlog and relay throughput",
+)
+async def get_outbox_stats(service: Annotated[OutboxAdminService, Depends()]) -> OutboxStatsSchema:
+    response = await service.stats()
+    return response
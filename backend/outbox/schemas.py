@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class OutboxStatsSchema(BaseModel):
+    pending: int
+    failed: int
+    oldest_pending_age_seconds: float | None = None
+    # totals over all relays since the metrics were last reset
+    published: int = 0
+    retried: int = 0
+    given_up: int = 0
+    batches: int = 0
+    events_per_busy_second: float | None = None
+    last_batch_at: float | None = None
+    last_batch_size: int | None = None
@@ -0,0 +1,39 @@
+from fastapi import Depends
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.db import get_session
+from backend.outbox.dao_outbox import OutboxDao
+from backend.outbox.relay import outbox_relay, utcnow
+from backend.outbox.schemas import OutboxStatsSchema
+
+
+class OutboxAdminService:
+
+    # the primary: a replica would report events as pending that are long published
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.outbox_dao = OutboxDao(session)
+
+    async def stats(self) -> OutboxStatsSchema:
+        backlog = await self.outbox_dao.backlog()
+        try:
+            metrics = await outbox_relay.metrics()
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            metrics = {}
+        published = int(metrics.get("published", 0))
+        busy_seconds = metrics.get("busy_seconds", 0.0)
+        return OutboxStatsSchema(
+            pending=backlog.pending,
+            failed=backlog.failed,
+            oldest_pending_age_seconds=(
+                (utcnow() - backlog.oldest_pending_at).total_seconds() if backlog.oldest_pending_at else None
+            ),
+            published=published,
+            retried=int(metrics.get("retried", 0)),
+            given_up=int(metrics.get("failed", 0)),
+            batches=int(metrics.get("batches", 0)),
+            events_per_busy_second=published / busy_seconds if busy_seconds else None,
+            last_batch_at=metrics.get("last_batch_at"),
+            last_batch_size=int(metrics["last_batch_size"]) if "last_batch_size" in metrics else None,
+        )
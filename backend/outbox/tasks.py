@@ -0,0 +1,39 @@
+"""
+Without a worker and beat, e.g. in eager mode, the outbox can be drained by hand:
+    python -c "from backend.outbox.tasks import relay_outbox; relay_outbox()"
+"""
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.celery_app import celery_app, run_in_worker_loop
+from backend.database.db import standalone_session
+from backend.outbox.relay import outbox_relay
+
+
+async def relay_outbox_async() -> int:
+    async with standalone_session() as session:
+        return await outbox_relay.run(session)
+
+
+async def relay_after_commit() -> None:
+    """
+    Eager mode (celery_task_always_eager) runs no beat, so nothing would ever poll the
+    outbox: the request that committed events relays them itself. A no-op otherwise.
+    """
+    if not celery_app.conf.task_always_eager:
+        return
+    try:
+        await relay_outbox_async()
+    except SQLAlchemyError as e:
+        print(f"SQLAlchemyError: {e}")
+    except (RedisError, OSError) as e:
+        print(f"RedisError: {e}")
+
+
+@celery_app.task(name="outbox.relay")
+def relay_outbox() -> int:
+    """Periodic (celery beat); overlapping runs are safe, they claim disjoint rows."""
+    claimed = run_in_worker_loop(relay_outbox_async())
+    if claimed:
+        print(f"Outbox relayed {claimed} events")
+    return claimed
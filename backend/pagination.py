@@ -0,0 +1,25 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(kind: str, values: list[Any]) -> str:
+    """Opaque keyset cursor: `kind` ties it to the ordering it was produced for."""
+    raw = json.dumps([kind, values], separators=(",", ":"), default=str).encode("utf-8")
+    return urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, kind: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_kind, values = json.loads(urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if cursor_kind != kind or not isinstance(values, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match the requested ordering")
+    return values
+
+
+__all__ = ("encode_cursor", "decode_cursor")
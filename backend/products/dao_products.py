@@ -0,0 +1,322 @@
+import datetime
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, Numeric, case, cast, column, func, select, true, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased, load_only, raiseload
+
+from backend.dao_base import BaseDao
+from backend.loader_profiles import PRODUCT_CARD, PRODUCT_CARD_COLUMNS
+from backend.models import Comment, Product, RatingEnum
+from backend.pagination import decode_cursor, encode_cursor
+from backend.products.facets import ProductFilter, facets_statement, parse_facets
+from backend.products.schemas import ProductFacetsSchema, ProductSort
+
+
+# sort -> (sort column, descending, parser for the cursor value)
+SORT_KEYS = {
+    ProductSort.PRICE_ASC: (Product.product_price, False, Decimal),
+    ProductSort.PRICE_DESC: (Product.product_price, True, Decimal),
+    ProductSort.NEWEST: (Product.created_at, True, datetime.datetime.fromisoformat),
+    ProductSort.RATING: (Product.rating_avg, True, Decimal),
+}
+
+class ProductDao(BaseDao):
+
+    model = Product
+
+    async def find_card(self, product_id: UUID) -> Product | None:
+        query = PRODUCT_CARD.apply(select(Product)).filter_by(id=product_id)
+        return await self.session.scalar(query)
+
+    async def find_prices(self, product_ids: list[UUID]) -> dict[UUID, Row]:
+        """Price, discount and stock of many products in one query."""
+        if not product_ids:
+            return {}
+        query = select(
+            Product.id,
+            Product.product_name,
+            Product.product_price,
+            Product.product_discount,
+            Product.product_quantity,
+            Product.is_hot_inventory,
+            Product.category_id,
+            Product.merchant_id,
+        ).where(Product.id.in_(product_ids))
+        result = await self.session.execute(query)
+        return {row.id: row for row in result.all()}
+
+    async def list_page(
+        self,
+        *,
+        sort: ProductSort,
+        limit: int,
+        cursor: str | None = None,
+        category_id: int | None = None,
+        merchant_id: UUID | None = None,
+    ) -> tuple[list[Product], str | None]:
+        """
+        Keyset pagination over (sort key, id): the cost of a page does not depend
+        on how deep it is, as long as a matching (filter, sort key, id) index exists.
+        """
+        query = PRODUCT_CARD.apply(select(Product))
+        if category_id is not None:
+            query = query.where(Product.category_id == category_id)
+        if merchant_id is not None:
+            query = query.where(Product.merchant_id == merchant_id)
+        query = self._after_cursor(query, sort, cursor)
+        result = await self.session.scalars(self._ordered(query, Product, sort).limit(limit + 1))
+        return self._cut_page(list(result.all()), sort, limit)
+
+    def _after_cursor(self, query, sort: ProductSort, cursor: str | None):
+        if cursor is None:
+            return query
+        sort_column, descending, parse = SORT_KEYS[sort]
+        values = decode_cursor(cursor, sort.value)
+        try:
+            sort_value, last_id = values
+            after = tuple_(parse(sort_value), UUID(last_id))
+        except (ValueError, ArithmeticError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        key = tuple_(sort_column, Product.id)
+        return query.where(key < after if descending else key > after)
+
+    def _ordered(self, query, entity, sort: ProductSort):
+        sort_column, descending, _ = SORT_KEYS[sort]
+        sort_column, entity_id = getattr(entity, sort_column.key), entity.id
+        if descending:
+            return query.order_by(sort_column.desc(), entity_id.desc())
+        return query.order_by(sort_column.asc(), entity_id.asc())
+
+    def _cut_page(self, products: list[Product], sort: ProductSort, limit: int) -> tuple[list[Product], str | None]:
+        """Pages are fetched with limit + 1 rows, the extra row only says there is a next page."""
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            last = products[-1]
+            next_cursor = encode_cursor(sort.value, [getattr(last, SORT_KEYS[sort][0].key), last.id])
+        return products, next_cursor
+
+    async def browse_page(
+        self,
+        *,
+        product_filter: ProductFilter,
+        sort: ProductSort,
+        limit: int,
+        cursor: str | None = None,
+    ) -> tuple[list[Product], str | None]:
+        """Keyset page of the products matching every filter."""
+        query = PRODUCT_CARD.apply(select(Product)).where(*product_filter.scope(), *product_filter.facet_conditions().values())
+        query = self._after_cursor(query, sort, cursor)
+        result = await self.session.scalars(self._ordered(query, Product, sort).limit(limit + 1))
+        return self._cut_page(list(result.all()), sort, limit)
+
+    async def browse_page_with_facets(
+        self,
+        *,
+        product_filter: ProductFilter,
+        sort: ProductSort,
+        limit: int,
+        cursor: str | None = None,
+    ) -> tuple[list[Product], str | None, ProductFacetsSchema]:
+        """
+        Filtered keyset page and the facet counts in a single statement:
+        the facets are one JSON value, the page rows are left-joined to it,
+        so an empty page still brings the facets back.
+        """
+        page_query = select(Product).where(*product_filter.scope(), *product_filter.facet_conditions().values())
+        page_query = self._after_cursor(page_query, sort, cursor)
+        page_query = self._ordered(page_query, Product, sort).limit(limit + 1).subquery("page")
+        page = aliased(Product, page_query)
+        facets = facets_statement(product_filter).subquery("facets")
+
+        # the facets value is sent with the first row only, not repeated on every page row
+        first_row_facets = case((func.row_number().over() == 1, facets.c.facets)).label("facets")
+        query = (
+            select(first_row_facets, page)
+            .select_from(facets)
+            .outerjoin(page, true())
+            # PRODUCT_CARD, restated for the aliased entity
+            .options(load_only(*(getattr(page, column.key) for column in PRODUCT_CARD_COLUMNS)), raiseload("*"))
+        )
+        result = await self.session.execute(self._ordered(query, page, sort))
+        rows = result.all()
+
+        products = [product for _, product in rows if product is not None]
+        facet_rows = next((row.facets for row in rows if row.facets is not None), None)
+        products, next_cursor = self._cut_page(products, sort, limit)
+        return products, next_cursor, parse_facets(facet_rows)
+
+    async def find_facets(self, product_filter: ProductFilter) -> ProductFacetsSchema:
+        """All facet counts of the filter in one statement, independent of sort and cursor."""
+        return parse_facets(await self.session.scalar(facets_statement(product_filter)))
+
+    async def apply_rating_delta(self, product_id: UUID, sum_delta: int, count_delta: int):
+        """
+        Atomically shifts the rating aggregates of one product.
+        Returns (category_id, merchant_id) of the product, None if it does not exist.
+        """
+        new_sum = Product.rating_sum + sum_delta
+        new_count = Product.rating_count + count_delta
+        query = (
+            update(Product)
+            .where(Product.id == product_id)
+            .values(
+                rating_sum=new_sum,
+                rating_count=new_count,
+                rating_avg=rating_average(new_sum, new_count),
+            )
+            .returning(Product.category_id, Product.merchant_id)
+        )
+        result = await self.session.execute(query)
+        return result.one_or_none()
+
+    async def reserve_stock(self, items: dict[UUID, int]) -> list[Row]:
+        """
+        Takes `items` (product_id -> quantity) out of stock in one statement.
+        Rows are locked in id order, so concurrent checkouts never deadlock on each
+        other, and only products with enough stock are decremented. Returns the
+        reserved rows; fewer rows than items means the caller must roll back.
+        """
+        requested = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="requested",
+        ).data(list(items.items()))
+        locked = (
+            select(Product.id, requested.c.quantity)
+            .join(requested, requested.c.product_id == Product.id)
+            .where(Product.product_quantity >= requested.c.quantity, Product.is_hot_inventory.is_(False))
+            .order_by(Product.id)
+            .with_for_update(key_share=True, of=Product)
+            .cte("locked")
+        )
+        query = (
+            update(Product)
+            # rechecked after the lock: a product switched to hot mode meanwhile is not reserved here
+            .where(Product.id == locked.c.id, Product.product_quantity >= locked.c.quantity, Product.is_hot_inventory.is_(False))
+            .values(product_quantity=Product.product_quantity - locked.c.quantity)
+            .returning(
+                Product.id,
+                Product.product_name,
+                Product.product_price,
+                Product.product_discount,
+                Product.category_id,
+                Product.merchant_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def restock(self, items: dict[UUID, int]) -> list[Row]:
+        """Puts quantities of canceled orders back, locking in the same order as reserve_stock."""
+        if not items:
+            return []
+        returned = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="returned",
+        ).data(sorted(items.items()))
+        locked = (
+            select(Product.id, returned.c.quantity)
+            .join(returned, returned.c.product_id == Product.id)
+            .order_by(Product.id)
+            .with_for_update(key_share=True, of=Product)
+            .cte("locked")
+        )
+        query = (
+            update(Product)
+            .where(Product.id == locked.c.id)
+            .values(product_quantity=Product.product_quantity + locked.c.quantity)
+            .returning(Product.id, Product.category_id, Product.merchant_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def hot_products_page(self, after_id: UUID | None, limit: int) -> list[Row]:
+        query = (
+            select(Product.id, Product.product_quantity)
+            .where(Product.is_hot_inventory.is_(True))
+            .order_by(Product.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            query = query.where(Product.id > after_id)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def write_back_quantities(self, quantities: dict[UUID, int]) -> list[Row]:
+        """Copies Redis counters into product_quantity; only rows that changed are written."""
+        if not quantities:
+            return []
+        counted = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="counted",
+        ).data(sorted(quantities.items()))
+        query = (
+            update(Product)
+            .where(
+                Product.id == counted.c.product_id,
+                # a product that just left hot mode already got its final count
+                Product.is_hot_inventory.is_(True),
+                Product.product_quantity.is_distinct_from(counted.c.quantity),
+            )
+            .values(product_quantity=counted.c.quantity)
+            .returning(Product.id, Product.category_id, Product.merchant_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def recompute_rating_aggregates(self, product_ids: list[UUID] | None = None) -> int:
+        """
+        Rebuilds the aggregates from comments in one statement; only rows that drifted are written.
+        Returns the number of repaired products.
+        """
+        rating_value = case({rating: rating.value for rating in RatingEnum}, value=Comment.rating)
+        totals = (
+            select(
+                Comment.product_id.label("product_id"),
+                func.sum(rating_value).label("rating_sum"),
+                func.count().label("rating_count"),
+            )
+            .group_by(Comment.product_id)
+            .subquery()
+        )
+        target = aliased(Product, name="target")
+        expected_sum = func.coalesce(totals.c.rating_sum, 0)
+        expected_count = func.coalesce(totals.c.rating_count, 0)
+        source = (
+            select(Product.id.label("id"), expected_sum.label("rating_sum"), expected_count.label("rating_count"))
+            .outerjoin(totals, totals.c.product_id == Product.id)
+        )
+        if product_ids is not None:
+            source = source.where(Product.id.in_(product_ids))
+        source = source.subquery()
+
+        query = (
+            update(target)
+            .where(target.id == source.c.id)
+            .where(tuple_(target.rating_sum, target.rating_count) != tuple_(source.c.rating_sum, source.c.rating_count))
+            .values(
+                rating_sum=source.c.rating_sum,
+                rating_count=source.c.rating_count,
+                rating_avg=rating_average(source.c.rating_sum, source.c.rating_count),
+            )
+            .returning(target.id)
+        )
+        result = await self.session.execute(query)
+        return len(result.all())
+
+
+def rating_average(rating_sum, rating_count):
+    return case(
+        (rating_count > 0, func.round(cast(rating_sum, Numeric) / rating_count, 2)),
+        else_=0,
+    )
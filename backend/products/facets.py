@@ -0,0 +1,172 @@
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import JSON, Select, and_, case, func, not_, select, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+from backend.models import Product
+from backend.products.schemas import (
+    CategoryFacetSchema,
+    MerchantFacetSchema,
+    PriceBucketFacetSchema,
+    ProductFacetsSchema,
+)
+
+
+# lower bounds of the price buckets, the last bucket is open-ended
+PRICE_BUCKET_BOUNDS = (Decimal(0), Decimal(10), Decimal(50), Decimal(100), Decimal(500), Decimal(1000))
+# categories and merchants are cut to the biggest groups, the sidebar never shows more
+MAX_FACET_VALUES = 50
+
+IN_STOCK = Product.product_quantity > 0
+DISCOUNTED = Product.product_discount > 0
+
+
+@dataclass(frozen=True)
+class ProductFilter:
+    """
+    `category_id` is the browsing scope and is applied to everything, facets included.
+    The other filters are facets: each facet is counted with all filters but its own,
+    so the sidebar still shows how many products choosing another value would give.
+    """
+    category_id: int | None = None
+    merchant_id: UUID | None = None
+    min_price: Decimal | None = None
+    max_price: Decimal | None = None
+    in_stock: bool | None = None
+    discounted: bool | None = None
+
+    def as_params(self) -> dict:
+        return asdict(self)
+
+    def scope(self) -> list[ColumnElement[bool]]:
+        if self.category_id is None:
+            return []
+        return [Product.category_id == self.category_id]
+
+    def facet_conditions(self) -> dict[str, ColumnElement[bool]]:
+        conditions = {}
+        if self.merchant_id is not None:
+            conditions["merchant"] = Product.merchant_id == self.merchant_id
+        price = []
+        if self.min_price is not None:
+            price.append(Product.product_price >= self.min_price)
+        if self.max_price is not None:
+            price.append(Product.product_price <= self.max_price)
+        if price:
+            conditions["price"] = and_(*price)
+        if self.in_stock is not None:
+            conditions["in_stock"] = IN_STOCK if self.in_stock else not_(IN_STOCK)
+        if self.discounted is not None:
+            conditions["discounted"] = DISCOUNTED if self.discounted else not_(DISCOUNTED)
+        return conditions
+
+
+def price_bucket():
+    return case(
+        *((Product.product_price < upper, index) for index, upper in enumerate(PRICE_BUCKET_BOUNDS[1:])),
+        else_=len(PRICE_BUCKET_BOUNDS) - 1,
+    )
+
+
+# grouping(category_id, merchant_id, in_stock, discounted, price_bucket): a bit is set
+# for every column that is NOT part of the grouping set of the row
+FACET_MASKS = {
+    "categories": 0b01111,
+    "merchants": 0b10111,
+    "in_stock": 0b11011,
+    "discounted": 0b11101,
+    "price_buckets": 0b11110,
+    "total": 0b11111,
+}
+
+
+def facets_statement(product_filter: ProductFilter) -> Select:
+    """
+    One aggregate pass over the scope: GROUPING SETS give every facet its groups,
+    FILTER clauses give every facet its own combination of the other filters.
+    The result is a single JSON array, one row for the whole sidebar.
+    """
+    conditions = product_filter.facet_conditions()
+    scoped = (
+        select(
+            Product.category_id,
+            Product.merchant_id,
+            IN_STOCK.label("in_stock"),
+            DISCOUNTED.label("discounted"),
+            price_bucket().label("price_bucket"),
+            *(condition.label(f"m_{name}") for name, condition in conditions.items()),
+        )
+        .where(*product_filter.scope())
+        .subquery("scoped")
+    )
+
+    def count_without(facet: str | None):
+        flags = [scoped.c[f"m_{name}"] for name in conditions if name != facet]
+        return func.count().filter(and_(*flags)) if flags else func.count()
+
+    columns = (scoped.c.category_id, scoped.c.merchant_id, scoped.c.in_stock, scoped.c.discounted, scoped.c.price_bucket)
+    n_total = count_without(None)
+    n_merchant = count_without("merchant")
+    grouping = func.grouping(*columns)
+    grouped = (
+        select(
+            *columns,
+            grouping.label("g"),
+            n_total.label("n_total"),
+            n_merchant.label("n_merchant"),
+            count_without("in_stock").label("n_in_stock"),
+            count_without("discounted").label("n_discounted"),
+            count_without("price").label("n_price"),
+            func.row_number().over(
+                partition_by=grouping,
+                order_by=case((grouping == FACET_MASKS["merchants"], n_merchant), else_=n_total).desc(),
+            ).label("rank"),
+        )
+        .group_by(func.grouping_sets(tuple_(), *(tuple_(column) for column in columns)))
+        .subquery("facet_rows")
+    )
+    visible = select(grouped).where(grouped.c.rank <= MAX_FACET_VALUES).subquery("facet_values")
+    return select(func.json_agg(visible.table_valued(), type_=JSON).label("facets"))
+
+
+def parse_facets(rows: list[dict] | None) -> ProductFacetsSchema:
+    total = 0
+    categories, merchants = [], []
+    bucket_counts = [0] * len(PRICE_BUCKET_BOUNDS)
+    in_stock = discounted = 0
+    for row in rows or ():
+        mask = row["g"]
+        if mask == FACET_MASKS["total"]:
+            total = row["n_total"]
+        elif mask == FACET_MASKS["categories"]:
+            if row["n_total"]:
+                categories.append(CategoryFacetSchema(category_id=row["category_id"], count=row["n_total"]))
+        elif mask == FACET_MASKS["merchants"]:
+            if row["n_merchant"]:
+                merchants.append(MerchantFacetSchema(merchant_id=row["merchant_id"], count=row["n_merchant"]))
+        elif mask == FACET_MASKS["in_stock"]:
+            if row["in_stock"]:
+                in_stock = row["n_in_stock"]
+        elif mask == FACET_MASKS["discounted"]:
+            if row["discounted"]:
+                discounted = row["n_discounted"]
+        elif mask == FACET_MASKS["price_buckets"]:
+            bucket_counts[row["price_bucket"]] = row["n_price"]
+
+    bounds = PRICE_BUCKET_BOUNDS + (None,)
+    return ProductFacetsSchema(
+        total=total,
+        categories=sorted(categories, key=lambda facet: (-facet.count, facet.category_id)),
+        merchants=sorted(merchants, key=lambda facet: (-facet.count, str(facet.merchant_id))),
+        price_buckets=[
+            PriceBucketFacetSchema(min_price=bounds[index], max_price=bounds[index + 1], count=count)
+            for index, count in enumerate(bucket_counts)
+        ],
+        in_stock=in_stock,
+        discounted=discounted,
+    )
+
+
+__all__ = ("PRICE_BUCKET_BOUNDS", "ProductFilter", "facets_statement", "parse_facets")
@@ -0,0 +1,151 @@
+import time
+from uuid import UUID
+
+from backend.database.redis_client import redis_manager
+
+
+# KEYS[1] reservation hash, KEYS[2] expiry zset, KEYS[3..] stock counters;
+# ARGV order id, expiry timestamp, then product_id / quantity pairs in KEYS order.
+# All or nothing: returns the 1-based positions of the short products, or an empty list.
+RESERVE_LUA = """
+local short = {}
+for i = 3, #KEYS do
+    local stock = redis.call('GET', KEYS[i])
+    if not stock or tonumber(stock) < tonumber(ARGV[(i - 2) * 2 + 2]) then
+        short[#short + 1] = i - 2
+    end
+end
+if #short > 0 then
+    return short
+end
+for i = 3, #KEYS do
+    local quantity = ARGV[(i - 2) * 2 + 2]
+    redis.call('DECRBY', KEYS[i], quantity)
+    redis.call('HINCRBY', KEYS[1], ARGV[(i - 2) * 2 + 1], quantity)
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+return {}
+"""
+
+# KEYS[1] reservation hash, KEYS[2] expiry zset; ARGV order id, stock key prefix.
+# Puts reserved quantities back. Products that are no longer hot (counter gone) are
+# returned as product_id / quantity pairs for the caller to restore in Postgres.
+RELEASE_LUA = """
+local reserved = redis.call('HGETALL', KEYS[1])
+local orphaned = {}
+for i = 1, #reserved, 2 do
+    local counter = ARGV[2] .. reserved[i]
+    if redis.call('EXISTS', counter) == 1 then
+        redis.call('INCRBY', counter, reserved[i + 1])
+    else
+        orphaned[#orphaned + 1] = reserved[i]
+        orphaned[#orphaned + 1] = reserved[i + 1]
+    end
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return orphaned
+"""
+
+
+class HotInventory:
+    """
+    Available stock of flagged products ("hot" SKUs, Product.is_hot_inventory)
+    lives in Redis counters, so flash-sale checkouts never queue on the product
+    row. Each checkout reserves its hot lines under the order id with an expiry;
+    paid orders confirm the reservation, abandoned ones release it. The
+    reconciler task writes the counters back to products.product_quantity.
+
+    A missing counter reads as out of stock until the reconciler seeds it again
+    from the last written-back count.
+    """
+
+    stock_prefix = "inventory:stock:"
+    reservation_prefix = "inventory:reservation:"
+    expiry_key = "inventory:reservations"
+
+    def __init__(self) -> None:
+        self._reserve_script = None
+        self._release_script = None
+
+    def _stock_key(self, product_id: UUID) -> str:
+        return f"{self.stock_prefix}{product_id}"
+
+    def _reservation_key(self, order_id: UUID) -> str:
+        return f"{self.reservation_prefix}{order_id}"
+
+    async def reserve(self, order_id: UUID, items: dict[UUID, int], ttl: int) -> list[UUID]:
+        """Reserves all `items` or none. Returns the products without enough stock."""
+        if self._reserve_script is None:
+            self._reserve_script = redis_manager.client.register_script(RESERVE_LUA)
+        product_ids = list(items)
+        args = [str(order_id), time.time() + ttl]
+        for product_id in product_ids:
+            args += [str(product_id), items[product_id]]
+        short = await self._reserve_script(
+            keys=[self._reservation_key(order_id), self.expiry_key, *(self._stock_key(product_id) for product_id in product_ids)],
+            args=args,
+        )
+        return [product_ids[position - 1] for position in short]
+
+    async def release(self, order_id: UUID) -> dict[UUID, int]:
+        """Puts the order's reservation back; idempotent. Returns the quantities that belong in Postgres."""
+        if self._release_script is None:
+            self._release_script = redis_manager.client.register_script(RELEASE_LUA)
+        orphaned = await self._release_script(
+            keys=[self._reservation_key(order_id), self.expiry_key],
+            args=[str(order_id), self.stock_prefix],
+        )
+        return {UUID(orphaned[i].decode()): int(orphaned[i + 1]) for i in range(0, len(orphaned), 2)}
+
+    async def confirm(self, order_ids: list[UUID]) -> None:
+        """The orders are paid: their reserved stock is sold for good."""
+        if not order_ids:
+            return
+        async with redis_manager.client.pipeline(transaction=True) as pipe:
+            pipe.delete(*(self._reservation_key(order_id) for order_id in order_ids))
+            pipe.zrem(self.expiry_key, *(str(order_id) for order_id in order_ids))
+            await pipe.execute()
+
+    async def expired(self, limit: int) -> list[UUID]:
+        order_ids = await redis_manager.client.zrangebyscore(self.expiry_key, "-inf", time.time(), start=0, num=limit)
+        return [UUID(order_id.decode()) for order_id in order_ids]
+
+    async def reserved(self, order_ids: list[UUID]) -> dict[UUID, dict[UUID, int]]:
+        """Hot lines still reserved per order."""
+        if not order_ids:
+            return {}
+        async with redis_manager.client.pipeline(transaction=False) as pipe:
+            for order_id in order_ids:
+                pipe.hgetall(self._reservation_key(order_id))
+            raw = await pipe.execute()
+        return {
+            order_id: {UUID(product_id.decode()): int(quantity) for product_id, quantity in reservation.items()}
+            for order_id, reservation in zip(order_ids, raw)
+        }
+
+    async def counters(self, product_ids: list[UUID]) -> dict[UUID, int | None]:
+        if not product_ids:
+            return {}
+        raw = await redis_manager.client.mget([self._stock_key(product_id) for product_id in product_ids])
+        return {product_id: int(value) if value is not None else None for product_id, value in zip(product_ids, raw)}
+
+    async def seed(self, stock: dict[UUID, int], *, overwrite: bool = True) -> None:
+        """Sets counters; with overwrite=False only missing counters are created."""
+        if not stock:
+            return
+        async with redis_manager.client.pipeline(transaction=False) as pipe:
+            for product_id, quantity in stock.items():
+                pipe.set(self._stock_key(product_id), quantity, nx=not overwrite)
+            await pipe.execute()
+
+    async def drain(self, product_id: UUID) -> int | None:
+        """Removes the counter when a product leaves hot mode. Returns the last available stock."""
+        value = await redis_manager.client.getdel(self._stock_key(product_id))
+        return int(value) if value is not None else None
+
+
+hot_inventory = HotInventory()
+
+
+__all__ = ("HotInventory", "hot_inventory")
@@ -0,0 +1,311 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import JSON, Column, Integer, MetaData, Numeric, String, Table, distinct, func, literal, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.categories.registry import category_registry
+from backend.models import Product
+from backend.products.schemas import ImportRowErrorSchema, ProductImportResultSchema, ProductImportRowSchema
+
+
+IMPORT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000
+MAX_LINE_LENGTH = 64 * 1024
+
+CSV_CONTENT_TYPES = ("text/csv",)
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+STAGING_COLUMNS = (
+    "line_no",
+    "sku",
+    "product_name",
+    "product_price",
+    "product_description",
+    "product_discount",
+    "product_quantity",
+    "category_id",
+)
+
+staging_metadata = MetaData()
+staging = Table(
+    "product_import_staging",
+    staging_metadata,
+    Column("line_no", Integer, nullable=False),
+    Column("sku", String(64), nullable=False),
+    Column("product_name", String(50), nullable=False),
+    Column("product_price", Numeric(10, 2), nullable=False),
+    Column("product_description", String(500), nullable=False),
+    Column("product_discount", Numeric(10, 2), nullable=False),
+    Column("product_quantity", Integer, nullable=False),
+    Column("category_id", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+class RowError(ValueError):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a streamed UTF-8 body into lines, holding at most one partial line in memory."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            if len(buffer) > MAX_LINE_LENGTH:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Line is too long")
+            for line in lines:
+                yield line.rstrip("\r")
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload is not valid UTF-8")
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+class _NeedMoreLines(Exception):
+    pass
+
+
+class _CsvLineFeed:
+    """
+    Line source of a csv.reader fed from an async stream. The lines of the record
+    being read are kept until it is complete: when they run out mid-record (a quoted
+    field spans lines) the reader is interrupted, and after the next line arrives it
+    reads the record again from its first line.
+    """
+
+    def __init__(self) -> None:
+        self.pending: list[str] = []
+        self.position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if self.position < len(self.pending):
+            self.position += 1
+            return self.pending[self.position - 1]
+        raise _NeedMoreLines
+
+    def read(self, reader) -> list[str] | RowError | None:
+        """The next record, None while it is still incomplete."""
+        self.position = 0
+        try:
+            values = next(reader)
+        except _NeedMoreLines:
+            if sum(map(len, self.pending)) > MAX_LINE_LENGTH:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Record is too long")
+            return None
+        except csv.Error as e:
+            values = RowError(str(e))
+        del self.pending[:self.position]
+        return values
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict[str, Any] | RowError]]:
+    """
+    One record per row, quoted fields may span lines; the first record is the header.
+    Rows are numbered by record, the header being record 1. Empty cells fall back to
+    the schema defaults.
+    """
+    feed = _CsvLineFeed()
+    reader = csv.reader(feed)
+
+    async def records():
+        async for line in lines:
+            feed.pending.append(line + "\n")
+            values = feed.read(reader)
+            if values is not None:
+                yield values
+        if feed.pending:
+            yield RowError("unterminated quoted field")
+
+    header = None
+    record_no = 0
+    async for values in records():
+        record_no += 1
+        if isinstance(values, RowError):
+            yield record_no, values
+            continue
+        if len(values) < 2 and not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_no, RowError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield record_no, {name: value for name, value in zip(header, values) if value != ""}
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict[str, Any] | RowError]]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_no, RowError("expected a JSON object")
+            continue
+        yield line_no, row
+
+
+def row_parser(content_type: str | None):
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return iter_csv_rows
+    if media_type in NDJSON_CONTENT_TYPES:
+        return iter_ndjson_rows
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Upload text/csv or application/x-ndjson"
+    )
+
+
+def validate_row(row: dict[str, Any] | RowError) -> ProductImportRowSchema:
+    if isinstance(row, RowError):
+        raise row
+    product = ProductImportRowSchema.model_validate(row)
+    if category_registry.get(product.category_id) is None:
+        raise RowError("category_id: unknown category")
+    return product
+
+
+def format_errors(exc: Exception) -> list[str]:
+    if isinstance(exc, ValidationError):
+        return [f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()]
+    return [str(exc)]
+
+
+class ProductImporter:
+    """
+    Streams an upload into a temporary staging table with COPY, batch by batch,
+    then upserts everything into products on (merchant_id, sku) in one statement.
+    Invalid rows are reported and skipped; the valid ones are imported in a single
+    transaction, so a failed merge leaves the catalog untouched.
+    """
+
+    def __init__(self, session: AsyncSession, merchant_id: UUID) -> None:
+        self.session = session
+        self.merchant_id = merchant_id
+        self.received = 0
+        self.failed = 0
+        self.errors: list[ImportRowErrorSchema] = []
+        self.category_ids: set[int] = set()
+        # merged quantities of hot products, their Redis counters must follow after the commit
+        self.hot_stock: dict[UUID, int] = {}
+
+    def _report(self, line_no: int, exc: Exception) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowErrorSchema(line=line_no, errors=format_errors(exc)))
+
+    async def _copy(self, records: list[tuple]) -> None:
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            staging.name, records=records, columns=STAGING_COLUMNS
+        )
+
+    async def stage(self, rows: AsyncIterator[tuple[int, dict[str, Any] | RowError]]) -> None:
+        connection = await self.session.connection()
+        await connection.run_sync(staging.create)
+
+        batch: list[tuple] = []
+        async for line_no, row in rows:
+            self.received += 1
+            try:
+                product = validate_row(row)
+            except (ValidationError, RowError) as e:
+                self._report(line_no, e)
+                continue
+            self.category_ids.add(product.category_id)
+            batch.append((
+                line_no,
+                product.sku,
+                product.product_name,
+                product.product_price,
+                product.product_description,
+                product.product_discount,
+                product.product_quantity,
+                product.category_id,
+            ))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await self._copy(batch)
+                batch = []
+        if batch:
+            await self._copy(batch)
+
+    async def previous_category_ids(self) -> set[int]:
+        """Categories the re-imported products are moving away from, for cache invalidation."""
+        query = (
+            select(distinct(Product.category_id))
+            .join(staging, staging.c.sku == Product.sku)
+            .where(Product.merchant_id == self.merchant_id)
+        )
+        return set((await self.session.scalars(query)).all())
+
+    async def merge(self) -> tuple[int, int]:
+        """Returns (inserted, updated). A SKU repeated in the upload resolves to its last line."""
+        latest = (
+            select(staging)
+            .distinct(staging.c.sku)
+            .order_by(staging.c.sku, staging.c.line_no.desc())
+            .subquery("latest")
+        )
+        copied = [name for name in STAGING_COLUMNS if name != "line_no"]
+        upsert = insert(Product.__table__).from_select(
+            ["id", "merchant_id", *copied],
+            select(func.gen_random_uuid(), literal(self.merchant_id), *(latest.c[name] for name in copied)),
+        )
+        upsert = upsert.on_conflict_do_update(
+            constraint="uq_products_merchant_sku",
+            set_={
+                **{name: upsert.excluded[name] for name in copied if name != "sku"},
+                # onupdate defaults do not apply to ON CONFLICT DO UPDATE
+                "updated_at": text("TIMEZONE('utc',now())"),
+            },
+        )
+        # xmax is 0 only for freshly inserted row versions
+        merged = upsert.returning(
+            literal_column("xmax = 0").label("inserted"),
+            Product.id,
+            Product.product_quantity,
+            Product.is_hot_inventory,
+        ).cte("merged")
+        hot_stock = func.json_object_agg(merged.c.id, merged.c.product_quantity, type_=JSON).filter(merged.c.is_hot_inventory)
+        result = await self.session.execute(
+            select(func.count(), func.count().filter(merged.c.inserted), hot_stock).select_from(merged)
+        )
+        total, inserted_count, hot_stock = result.one()
+        self.hot_stock = {UUID(product_id): quantity for product_id, quantity in (hot_stock or {}).items()}
+        return inserted_count, total - inserted_count
+
+    def result(self, inserted: int, updated: int) -> ProductImportResultSchema:
+        return ProductImportResultSchema(
+            received=self.received,
+            inserted=inserted,
+            updated=updated,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors),
+        )
+
+
+__all__ = ("ProductImporter", "iter_lines", "row_parser")
@@ -0,0 +1,182 @@
+from decimal import Decimal
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+
+from backend.auth.dependencies import require_role
+from backend.conditional import conditional, make_etag
+from backend.models import UserRole
+from backend.products.facets import ProductFilter
+from backend.products.schemas import AdminProductCreateSchema, HotInventorySchema, ProductBrowseSchema, ProductPageSchema, ProductResponseSchema, ProductSearchResultSchema, ProductSort, ProductUpdateSchema
+from backend.products.search import SearchBackend, SearchQuery, get_search_backend
+from backend.products.service import ProductService, ProductWriteService
+
+
+router = APIRouter()
+admin_router = APIRouter(dependencies=[Depends(require_role(UserRole.ADMIN))])
+
+def product_etag(product: ProductResponseSchema) -> str:
+    # the category name is resolved from the registry, a rename changes the body too
+    return make_etag("product", product.id, product.updated_at, product.rating_count, product.category_name)
+
+
+product_not_found = {
+    status.HTTP_404_NOT_FOUND: {
+        "description": "Product not found",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Product not found"}
+            }
+        }
+    }
+}
+
+
+@router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductPageSchema,
+    description="Product listing, paginated with an opaque cursor",
+)
+async def list_products(
+    service: Annotated[ProductService, Depends()],
+    sort: ProductSort = ProductSort.NEWEST,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+    category_id: int | None = None,
+    merchant_id: UUID | None = None,
+) -> ProductPageSchema:
+    response = await service.list_products(
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+        category_id=category_id,
+        merchant_id=merchant_id,
+    )
+    return response
+
+
+@router.get(
+    "/browse",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductBrowseSchema,
+    description="Filtered product listing with facet counts for the sidebar, paginated with an opaque cursor",
+)
+async def browse_products(
+    service: Annotated[ProductService, Depends()],
+    sort: ProductSort = ProductSort.NEWEST,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+    category_id: int | None = None,
+    merchant_id: UUID | None = None,
+    min_price: Annotated[Decimal | None, Query(ge=0)] = None,
+    max_price: Annotated[Decimal | None, Query(ge=0)] = None,
+    in_stock: bool | None = None,
+    discounted: bool | None = None,
+) -> ProductBrowseSchema:
+    response = await service.browse_products(
+        product_filter=ProductFilter(
+            category_id=category_id,
+            merchant_id=merchant_id,
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=in_stock,
+            discounted=discounted,
+        ),
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+    )
+    return response
+
+
+@router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductSearchResultSchema,
+    description="Full-text search over product name and description, words are matched by prefix",
+)
+async def search_products(
+    backend: Annotated[SearchBackend, Depends(get_search_backend)],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    category_id: int | None = None,
+    min_price: Annotated[Decimal | None, Query(ge=0)] = None,
+    max_price: Annotated[Decimal | None, Query(ge=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0, le=1000)] = 0,
+) -> ProductSearchResultSchema:
+    items = await backend.search(SearchQuery(
+        text=q,
+        category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
+        limit=limit,
+        offset=offset,
+    ))
+    return ProductSearchResultSchema(items=items)
+
+
+@router.get(
+    "/{product_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductResponseSchema,
+    description="Product by id, revalidate with If-None-Match / If-Modified-Since",
+    responses={**product_not_found, status.HTTP_304_NOT_MODIFIED: {"description": "Client copy is current"}},
+)
+async def get_product(
+    product_id: UUID,
+    request: Request,
+    response: Response,
+    service: Annotated[ProductService, Depends()],
+) -> ProductResponseSchema:
+    product = await service.get_product(product_id=product_id)
+    not_modified = conditional(request, response, etag=product_etag(product), last_modified=product.updated_at)
+    if not_modified is not None:
+        return not_modified
+    return product
+
+
+@admin_router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ProductResponseSchema,
+    description="Create product for any merchant",
+)
+async def admin_create_product(data: AdminProductCreateSchema, service: Annotated[ProductWriteService, Depends()]) -> ProductResponseSchema:
+    response = await service.create_product(data=data)
+    return response
+
+
+@admin_router.put(
+    "/{product_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductResponseSchema,
+    description="Update any product",
+    responses=product_not_found,
+)
+async def admin_update_product(product_id: UUID, data: ProductUpdateSchema, service: Annotated[ProductWriteService, Depends()]) -> ProductResponseSchema:
+    response = await service.update_product(product_id=product_id, data=data)
+    return response
+
+
+@admin_router.put(
+    "/{product_id}/hot-inventory",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductResponseSchema,
+    description="Switch a product to Redis-counted stock for a flash sale, or back",
+    responses=product_not_found,
+)
+async def admin_set_hot_inventory(product_id: UUID, data: HotInventorySchema, service: Annotated[ProductWriteService, Depends()]) -> ProductResponseSchema:
+    response = await service.set_hot_inventory(product_id=product_id, data=data)
+    return response
+
+
+@admin_router.delete(
+    "/{product_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description="Delete any product",
+    responses=product_not_found,
+)
+async def admin_delete_product(product_id: UUID, service: Annotated[ProductWriteService, Depends()]) -> None:
+    await service.delete_product(product_id=product_id)
@@ -0,0 +1,116 @@
+import datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+from backend.categories.registry import category_registry
+
+
+class ProductSort(str, Enum):
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    NEWEST = "newest"
+    RATING = "rating"
+
+class ProductResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    sku: str | None = None
+    product_name: str
+    product_price: Decimal
+    product_description: str
+    product_discount: Decimal
+    product_quantity: int
+    is_hot_inventory: bool = False
+    category_id: int
+    merchant_id: UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime | None = None
+    rating_avg: Decimal = Decimal(0)
+    rating_count: int = 0
+
+    @computed_field
+    @property
+    def category_name(self) -> str | None:
+        return category_registry.name(self.category_id)
+
+class ProductPageSchema(BaseModel):
+    items: list[ProductResponseSchema]
+    next_cursor: str | None = None
+
+class CategoryFacetSchema(BaseModel):
+    category_id: int
+    count: int
+
+    @computed_field
+    @property
+    def category_name(self) -> str | None:
+        return category_registry.name(self.category_id)
+
+class MerchantFacetSchema(BaseModel):
+    merchant_id: UUID
+    count: int
+
+class PriceBucketFacetSchema(BaseModel):
+    min_price: Decimal
+    max_price: Decimal | None
+    count: int
+
+class ProductFacetsSchema(BaseModel):
+    """Each facet is counted with every filter applied except its own."""
+    total: int
+    categories: list[CategoryFacetSchema]
+    merchants: list[MerchantFacetSchema]
+    price_buckets: list[PriceBucketFacetSchema]
+    in_stock: int
+    discounted: int
+
+class ProductBrowseSchema(BaseModel):
+    items: list[ProductResponseSchema]
+    next_cursor: str | None = None
+    facets: ProductFacetsSchema
+
+class ProductSearchResultSchema(BaseModel):
+    items: list[ProductResponseSchema]
+
+class ProductCreateSchema(BaseModel):
+    sku: str | None = Field(default=None, min_length=1, max_length=64, description="Merchant's article number, unique per merchant")
+    product_name: str = Field(default=..., min_length=1, max_length=50, description="Name, 1 to 50 symbols")
+    product_price: Decimal = Field(default=..., gt=0, max_digits=10, decimal_places=2)
+    product_description: str = Field(default=..., max_length=500, description="Description, up to 500 symbols")
+    product_discount: Decimal = Field(default=0, ge=0, max_digits=10, decimal_places=2)
+    product_quantity: int = Field(default=0, ge=0)
+    category_id: int
+
+class AdminProductCreateSchema(ProductCreateSchema):
+    merchant_id: UUID
+
+class ProductUpdateSchema(BaseModel):
+    sku: str | None = Field(default=None, min_length=1, max_length=64)
+    product_name: str | None = Field(default=None, min_length=1, max_length=50)
+    product_price: Decimal | None = Field(default=None, gt=0, max_digits=10, decimal_places=2)
+    product_description: str | None = Field(default=None, max_length=500)
+    product_discount: Decimal | None = Field(default=None, ge=0, max_digits=10, decimal_places=2)
+    product_quantity: int | None = Field(default=None, ge=0)
+    category_id: int | None = None
+
+class HotInventorySchema(BaseModel):
+    enabled: bool = Field(default=..., description="Count the product's stock in Redis, for flash sales")
+
+class ProductImportRowSchema(ProductCreateSchema):
+    sku: str = Field(default=..., min_length=1, max_length=64, description="Merchant's article number, rows are upserted on it")
+
+class ImportRowErrorSchema(BaseModel):
+    line: int = Field(default=..., description="Line of an NDJSON upload, record of a CSV upload (the header is record 1)")
+    errors: list[str]
+
+class ProductImportResultSchema(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: list[ImportRowErrorSchema]
+    errors_truncated: bool = False
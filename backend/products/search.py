@@ -0,0 +1,182 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Protocol
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import String, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.db import get_read_session
+from backend.loader_profiles import PRODUCT_CARD
+from backend.models import Product
+from backend.products.schemas import ProductResponseSchema
+
+
+# the token types of the Postgres default parser that show up in product texts; it keeps
+# emails, host names and dotted numbers whole, splits on "_" and "'", and indexes a
+# hyphenated word both whole and by its parts
+TOKEN_RE = re.compile(
+    r"(?P<email>[^\W_][\w.+-]*@[^\W_]+(?:[.-][^\W_]+)*\.[^\W\d_]{2,})"
+    r"|(?P<host>[^\W_]+(?:-[^\W_]+)*(?:\.[^\W_]+(?:-[^\W_]+)*)*\.[^\W\d_]{2,}\b)"
+    r"|(?P<number>[^\W_]+(?:\.\d+)+)"
+    r"|(?P<compound>[^\W_]+(?:-[^\W_]+)+)"
+    r"|(?P<word>[^\W_]+)"
+)
+
+def tokenize(value: str) -> list[str]:
+    """Lexemes of to_tsvector('simple', value), in text order; see InMemorySearchBackend for the gaps."""
+    tokens = []
+    for match in TOKEN_RE.finditer(value.lower()):
+        tokens.append(match.group())
+        if match.lastgroup == "compound":
+            tokens.extend(match.group().split("-"))
+    return tokens
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    text: str
+    category_id: int | None = None
+    min_price: Decimal | None = None
+    max_price: Decimal | None = None
+    limit: int = 20
+    offset: int = 0
+
+
+class SearchBackend(Protocol):
+    async def search(self, query: SearchQuery) -> list[ProductResponseSchema]: ...
+
+
+class PostgresSearchBackend:
+    """
+    Uses the trigger-maintained products.search_vector and its GIN index.
+    Every query word is matched as a prefix, all words must match.
+    """
+
+    text_config = "simple"
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def search(self, query: SearchQuery) -> list[ProductResponseSchema]:
+        if not tokenize(query.text):
+            return []
+        # the query goes through the same parser as the documents; every lexeme is quoted
+        # and matched as a prefix, so the tsquery syntax cannot be injected
+        lexeme = func.unnest(func.tsvector_to_array(func.to_tsvector(self.text_config, query.text))).column_valued("lexeme")
+        prefixes = func.string_agg(func.quote_literal(lexeme, type_=String).concat(":*"), literal(" & "))
+        ts_query = select(cast(prefixes, TSQUERY)).scalar_subquery()
+        rank = func.ts_rank_cd(Product.search_vector, ts_query)
+
+        statement = PRODUCT_CARD.apply(select(Product)).where(Product.search_vector.op("@@")(ts_query))
+        if query.category_id is not None:
+            statement = statement.where(Product.category_id == query.category_id)
+        if query.min_price is not None:
+            statement = statement.where(Product.product_price >= query.min_price)
+        if query.max_price is not None:
+            statement = statement.where(Product.product_price <= query.max_price)
+        statement = statement.order_by(rank.desc(), Product.id).limit(query.limit).offset(query.offset)
+
+        result = await self.session.scalars(statement)
+        return [ProductResponseSchema.model_validate(product) for product in result.all()]
+
+
+class InMemorySearchBackend:
+    """
+    Inverted index with the same matching rules as PostgresSearchBackend,
+    for tests and benchmarks that run without a database.
+
+    Matching follows Postgres for the token types TOKEN_RE covers; URLs, file
+    paths and signed numbers are still split differently. Ranking does not:
+    a hit scores the sum of its best weight per query word, name above
+    description, where ts_rank_cd also weighs how close the words stand, so
+    hits of similar score can come back in another order.
+    """
+
+    name_weight = 1.0
+    description_weight = 0.4
+
+    def __init__(self) -> None:
+        self._documents: dict[UUID, ProductResponseSchema] = {}
+        self._postings: dict[str, dict[UUID, float]] = defaultdict(dict)
+        self._terms: list[str] = []
+        self._terms_dirty = False
+
+    def add(self, product: ProductResponseSchema) -> None:
+        self.remove(product.id)
+        self._documents[product.id] = product
+        weights: dict[str, float] = {}
+        for term in tokenize(product.product_description):
+            weights[term] = weights.get(term, 0.0) + self.description_weight
+        for term in tokenize(product.product_name):
+            weights[term] = weights.get(term, 0.0) + self.name_weight
+        for term, weight in weights.items():
+            if term not in self._postings:
+                self._terms_dirty = True
+            self._postings[term][product.id] = weight
+
+    def remove(self, product_id: UUID) -> None:
+        product = self._documents.pop(product_id, None)
+        if product is None:
+            return
+        for term in set(tokenize(product.product_name)) | set(tokenize(product.product_description)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[term]
+                    self._terms_dirty = True
+
+    def _expand(self, prefix: str) -> list[str]:
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        start = bisect_left(self._terms, prefix)
+        end = start
+        while end < len(self._terms) and self._terms[end].startswith(prefix):
+            end += 1
+        return self._terms[start:end]
+
+    def _matches_filters(self, product: ProductResponseSchema, query: SearchQuery) -> bool:
+        if query.category_id is not None and product.category_id != query.category_id:
+            return False
+        if query.min_price is not None and product.product_price < query.min_price:
+            return False
+        if query.max_price is not None and product.product_price > query.max_price:
+            return False
+        return True
+
+    async def search(self, query: SearchQuery) -> list[ProductResponseSchema]:
+        words = tokenize(query.text)
+        if not words:
+            return []
+
+        scores: dict[UUID, float] | None = None
+        for word in words:
+            word_scores: dict[UUID, float] = {}
+            for term in self._expand(word):
+                for product_id, weight in self._postings[term].items():
+                    word_scores[product_id] = max(word_scores.get(product_id, 0.0), weight)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {product_id: score + word_scores[product_id] for product_id, score in scores.items() if product_id in word_scores}
+            if not scores:
+                return []
+
+        hits = [
+            (score, product_id) for product_id, score in scores.items()
+            if self._matches_filters(self._documents[product_id], query)
+        ]
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        return [self._documents[product_id] for _, product_id in hits[query.offset:query.offset + query.limit]]
+
+
+def get_search_backend(session: AsyncSession = Depends(get_read_session)) -> SearchBackend:
+    """Override with an InMemorySearchBackend (app.dependency_overrides) to search without Postgres."""
+    return PostgresSearchBackend(session)
@@ -0,0 +1,300 @@
+from typing import AsyncIterator, Awaitable, TypeVar
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.db import get_session
+from backend.models import Product
+from backend.products.dao_products import ProductDao
+from backend.products.facets import ProductFilter
+from backend.products.hot_inventory import hot_inventory
+from backend.products.importer import ProductImporter, iter_lines, row_parser
+from backend.products.schemas import HotInventorySchema, ProductBrowseSchema, ProductCreateSchema, ProductFacetsSchema, ProductImportResultSchema, ProductPageSchema, ProductResponseSchema, ProductSort, ProductUpdateSchema
+from backend.response_cache import catalog_cache
+
+
+T = TypeVar("T")
+
+
+def listing_scopes(category_id: int | None, merchant_id: UUID | None) -> list[str]:
+    scopes = []
+    if category_id is not None:
+        scopes.append(f"category-products:{category_id}")
+    if merchant_id is not None:
+        scopes.append(f"merchant-products:{merchant_id}")
+    return scopes or ["products"]
+
+def browse_scopes(category_id: int | None) -> list[str]:
+    # facets span every merchant of the scope, so a merchant filter cannot narrow the scope
+    if category_id is not None:
+        return [f"category-products:{category_id}"]
+    return ["products"]
+
+def product_scopes(product_id: UUID, category_id: int, merchant_id: UUID) -> list[str]:
+    return ["products", f"product:{product_id}", f"category-products:{category_id}", f"merchant-products:{merchant_id}"]
+
+
+class ProductService:
+    """
+    Every read goes through catalog_cache, so misses load from the primary: a replica
+    that has not replayed the write yet would pin its stale rows under the freshly
+    bumped scope version for the whole redis_ttl.
+    """
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.product_dao = ProductDao(session)
+
+    async def _load_product(self, product_id: UUID) -> ProductResponseSchema:
+        product = await self.product_dao.find_card(product_id)
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+        return ProductResponseSchema.model_validate(product)
+
+    async def get_product(self, *, product_id: UUID) -> ProductResponseSchema:
+        return await catalog_cache.get_or_load(
+            "product",
+            {"id": product_id},
+            scopes=[f"product:{product_id}"],
+            schema=ProductResponseSchema,
+            loader=lambda: self._load_product(product_id),
+        )
+
+    async def _load_page(self, **params) -> ProductPageSchema:
+        products, next_cursor = await self.product_dao.list_page(**params)
+        return ProductPageSchema(
+            items=[ProductResponseSchema.model_validate(product) for product in products],
+            next_cursor=next_cursor,
+        )
+
+    async def list_products(
+        self,
+        *,
+        sort: ProductSort,
+        limit: int,
+        cursor: str | None = None,
+        category_id: int | None = None,
+        merchant_id: UUID | None = None,
+    ) -> ProductPageSchema:
+        params = {
+            "sort": sort,
+            "limit": limit,
+            "cursor": cursor,
+            "category_id": category_id,
+            "merchant_id": merchant_id,
+        }
+        return await catalog_cache.get_or_load(
+            "products",
+            {**params, "sort": sort.value},
+            scopes=listing_scopes(category_id, merchant_id),
+            schema=ProductPageSchema,
+            loader=lambda: self._load_page(**params),
+        )
+
+    async def browse_products(
+        self,
+        *,
+        product_filter: ProductFilter,
+        sort: ProductSort,
+        limit: int,
+        cursor: str | None = None,
+    ) -> ProductBrowseSchema:
+        """
+        Facets depend on the filter only and are cached apart from the pages, so every
+        sort, page size and page of a filter shares one facet entry. A page miss with
+        the facets missing too loads both in one statement and caches the facets from it.
+        """
+        scopes = browse_scopes(product_filter.category_id)
+        facets_key, facets = await catalog_cache.peek(
+            "product-facets",
+            product_filter.as_params(),
+            scopes=scopes,
+            schema=ProductFacetsSchema,
+        )
+        params = {"product_filter": product_filter, "sort": sort, "limit": limit, "cursor": cursor}
+
+        async def load_page() -> ProductPageSchema:
+            nonlocal facets
+            if facets is not None:
+                products, next_cursor = await self.product_dao.browse_page(**params)
+            else:
+                products, next_cursor, facets = await self.product_dao.browse_page_with_facets(**params)
+                await catalog_cache.store(facets_key, facets)
+            return ProductPageSchema(
+                items=[ProductResponseSchema.model_validate(product) for product in products],
+                next_cursor=next_cursor,
+            )
+
+        page = await catalog_cache.get_or_load(
+            "products-browse",
+            {**product_filter.as_params(), "sort": sort.value, "limit": limit, "cursor": cursor},
+            scopes=scopes,
+            schema=ProductPageSchema,
+            loader=load_page,
+        )
+        if facets is None:
+            # the page came from the cache, the facets of its filter did not
+            facets = await self.product_dao.find_facets(product_filter)
+            await catalog_cache.store(facets_key, facets)
+        return ProductBrowseSchema(items=page.items, next_cursor=page.next_cursor, facets=facets)
+
+
+class ProductWriteService:
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.product_dao = ProductDao(session)
+
+    async def _unknown_reference(self) -> HTTPException:
+        await self.product_dao.session.rollback()
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown category or merchant, or SKU already taken"
+        )
+
+    async def _commit(self) -> None:
+        try:
+            await self.product_dao.session.commit()
+        except IntegrityError:
+            raise await self._unknown_reference()
+        except SQLAlchemyError as e:
+            await self.product_dao.session.rollback()
+            print(f"SQLAlchemyError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Oops.. Something unexpected happened"
+            )
+
+    async def _call_inventory(self, operation: Awaitable[T]) -> T:
+        try:
+            return await operation
+        except (RedisError, OSError) as e:
+            await self.product_dao.session.rollback()
+            print(f"RedisError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Inventory is temporarily unavailable"
+            )
+
+    async def _after_commit(self, operation: Awaitable) -> None:
+        # the database change already stands: a missing counter is reseeded by the reconciler
+        try:
+            await operation
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+
+    async def _get_owned(self, product_id: UUID, merchant_id: UUID | None) -> Product:
+        filters = {"id": product_id}
+        if merchant_id is not None:
+            filters["merchant_id"] = merchant_id
+        product = await self.product_dao.find_one_or_none(**filters)
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+        return product
+
+    async def create_product(self, *, data: ProductCreateSchema, merchant_id: UUID | None = None) -> ProductResponseSchema:
+        values = data.model_dump()
+        if merchant_id is not None:
+            values["merchant_id"] = merchant_id
+        try:
+            product = await self.product_dao.insert_returning(values)
+        except IntegrityError:
+            raise await self._unknown_reference()
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Product with this SKU already exists"
+            )
+        await self._commit()
+        await catalog_cache.bump(*product_scopes(product.id, product.category_id, product.merchant_id))
+        return ProductResponseSchema.model_validate(product)
+
+    async def import_products(self, *, merchant_id: UUID, content_type: str | None, body: AsyncIterator[bytes]) -> ProductImportResultSchema:
+        parse_rows = row_parser(content_type)
+        importer = ProductImporter(self.product_dao.session, merchant_id)
+        try:
+            await importer.stage(parse_rows(iter_lines(body)))
+            previous_category_ids = await importer.previous_category_ids()
+            inserted, updated = await importer.merge()
+        except IntegrityError:
+            raise await self._unknown_reference()
+        except HTTPException:
+            await self.product_dao.session.rollback()
+            raise
+        await self._commit()
+        # the reconciler copies hot counters over product_quantity: restocks of hot products go to Redis too
+        await self._after_commit(hot_inventory.seed(importer.hot_stock))
+        if inserted or updated:
+            await catalog_cache.bump(
+                "products",
+                f"merchant-products:{merchant_id}",
+                *(f"category-products:{category_id}" for category_id in importer.category_ids | previous_category_ids),
+            )
+        return importer.result(inserted, updated)
+
+    async def update_product(self, *, product_id: UUID, data: ProductUpdateSchema, merchant_id: UUID | None = None) -> ProductResponseSchema:
+        """`merchant_id` restricts the update to that merchant's products."""
+        product = await self._get_owned(product_id, merchant_id)
+        old_category_id = product.category_id
+        changes = data.model_dump(exclude_unset=True, exclude_none=True)
+        for key, value in changes.items():
+            setattr(product, key, value)
+        await self._commit()
+        if product.is_hot_inventory and "product_quantity" in changes:
+            # a restock of a hot product sets the live counter
+            await self._after_commit(hot_inventory.seed({product.id: product.product_quantity}))
+        await catalog_cache.bump(
+            *product_scopes(product.id, product.category_id, product.merchant_id),
+            f"category-products:{old_category_id}",
+        )
+        return ProductResponseSchema.model_validate(product)
+
+    async def set_hot_inventory(self, *, product_id: UUID, data: HotInventorySchema) -> ProductResponseSchema:
+        """
+        Moves the live stock count between the product row and Redis. The row stays
+        locked meanwhile, so no regular checkout can reserve it halfway through.
+        """
+        product = await self.product_dao.session.get(Product, product_id, with_for_update=True)
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+        if product.is_hot_inventory != data.enabled:
+            if data.enabled:
+                product.is_hot_inventory = True
+                await self._commit()
+                # until the counter exists the product reads as out of stock; if seeding fails
+                # the reconciler seeds it from the product_quantity committed above
+                await self._after_commit(hot_inventory.seed({product.id: product.product_quantity}, overwrite=False))
+            else:
+                # drained first so no further flash-sale reservation can take from the counter
+                remaining = await self._call_inventory(hot_inventory.drain(product.id))
+                if remaining is not None:
+                    product.product_quantity = remaining
+                product.is_hot_inventory = False
+                try:
+                    await self._commit()
+                except HTTPException:
+                    # still hot: give the counter back instead of leaving it to a stale reseed
+                    if remaining is not None:
+                        await self._after_commit(hot_inventory.seed({product_id: remaining}))
+                    raise
+            await catalog_cache.bump(*product_scopes(product.id, product.category_id, product.merchant_id))
+        return ProductResponseSchema.model_validate(product)
+
+    async def delete_product(self, *, product_id: UUID, merchant_id: UUID | None = None) -> None:
+        product = await self._get_owned(product_id, merchant_id)
+        await self.product_dao.session.delete(product)
+        await self._commit()
+        if product.is_hot_inventory:
+            # a counter left behind belongs to no product and is never read again
+            await self._after_commit(hot_inventory.drain(product.id))
+        await catalog_cache.bump(*product_scopes(product.id, product.category_id, product.merchant_id))
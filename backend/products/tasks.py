@@ -0,0 +1,18 @@
+from backend.celery_app import celery_app, run_in_worker_loop
+from backend.database.db import standalone_session
+from backend.products.dao_products import ProductDao
+
+
+async def recompute_rating_aggregates_async(product_ids: list[str] | None = None) -> int:
+    async with standalone_session() as session:
+        repaired = await ProductDao(session).recompute_rating_aggregates(product_ids)
+        await session.commit()
+    return repaired
+
+
+@celery_app.task(name="products.recompute_rating_aggregates")
+def recompute_rating_aggregates(product_ids: list[str] | None = None) -> int:
+    """Repair job for the denormalized rating columns; safe to run at any time."""
+    repaired = run_in_worker_loop(recompute_rating_aggregates_async(product_ids))
+    print(f"Rating aggregates repaired for {repaired} products")
+    return repaired
@@ -0,0 +1,122 @@
+import math
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from backend.cache import TTLCache
+from backend.database.redis_client import redis_manager
+from backend.settings import settings
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    capacity: int
+    refill_per_second: float
+
+    @property
+    def ttl(self) -> int:
+        return math.ceil(self.capacity / self.refill_per_second) + 1
+
+
+# KEYS[1] bucket; ARGV capacity, refill rate, cost. Returns {allowed, retry_after}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RateLimiter:
+    """
+    Token buckets kept in Redis and updated atomically by a Lua script.
+    When Redis is unreachable the limiter keeps working on per-process buckets.
+    """
+
+    key_prefix = "ratelimit:"
+
+    def __init__(self, enabled: bool = True, fallback_size: int = 100000) -> None:
+        self._enabled = enabled
+        self._script = None
+        self._local = TTLCache(maxsize=fallback_size, ttl=60)
+
+    def _get_script(self):
+        if self._script is None:
+            self._script = redis_manager.client.register_script(TOKEN_BUCKET_LUA)
+        return self._script
+
+    async def _hit_redis(self, policy: RateLimitPolicy, key: str, cost: int) -> tuple[bool, float]:
+        allowed, retry_after = await self._get_script()(
+            keys=[f"{self.key_prefix}{policy.name}:{key}"],
+            args=[policy.capacity, policy.refill_per_second, cost, policy.ttl],
+        )
+        return bool(allowed), float(retry_after)
+
+    def _hit_local(self, policy: RateLimitPolicy, key: str, cost: int) -> tuple[bool, float]:
+        local_key = (policy.name, key)
+        now = time.monotonic()
+        tokens, ts = self._local.get(local_key, (policy.capacity, now))
+        tokens = min(policy.capacity, tokens + (now - ts) * policy.refill_per_second)
+        if tokens >= cost:
+            self._local.set(local_key, (tokens - cost, now), ttl=policy.ttl)
+            return True, 0.0
+        self._local.set(local_key, (tokens, now), ttl=policy.ttl)
+        return False, (cost - tokens) / policy.refill_per_second
+
+    async def hit(self, policy: RateLimitPolicy, key: str, cost: int = 1) -> None:
+        if not self._enabled:
+            return
+        try:
+            allowed, retry_after = await self._hit_redis(policy, key, cost)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            allowed, retry_after = self._hit_local(policy, key, cost)
+
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+rate_limiter = RateLimiter(enabled=settings.rate_limit_settings.rate_limit_enabled)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """Dependency limiting a route per client IP: Depends(RateLimit(policy))."""
+
+    def __init__(self, policy: RateLimitPolicy) -> None:
+        self.policy = policy
+
+    async def __call__(self, request: Request) -> None:
+        await rate_limiter.hit(self.policy, client_ip(request))
+
+
+__all__ = ("RateLimitPolicy", "RateLimit", "client_ip", "rate_limiter")
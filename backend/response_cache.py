@@ -0,0 +1,208 @@
+import asyncio
+from hashlib import sha1
+from typing import Any, Awaitable, Callable, Sequence, TypeVar
+
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from backend.cache import TTLCache
+from backend.database.redis_client import redis_manager
+from backend.settings import settings
+
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class _LoadAbandoned(Exception):
+    pass
+
+
+class ResponseCache:
+    """
+    Read-through cache for serialized responses: process-local LRU in front of Redis.
+
+    Every entry depends on a set of scopes ("product:<id>", "category:<id>", ...).
+    Each scope has a version counter in Redis and the current versions are part of
+    the cache key, so a write only has to bump the versions of the scopes it touches;
+    stale entries are never read again and simply age out.
+    Concurrent misses for the same key inside one process share a single load;
+    if the request doing it is cancelled, one of the waiting requests takes it over.
+    """
+
+    def __init__(self, namespace: str, local_size: int, local_ttl: float, redis_ttl: int, version_ttl: float) -> None:
+        self._namespace = namespace
+        self._local = TTLCache(maxsize=local_size, ttl=local_ttl)
+        self._versions = TTLCache(maxsize=local_size, ttl=version_ttl)
+        self._redis_ttl = redis_ttl
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _version_key(self, scope: str) -> str:
+        return f"{self._namespace}:version:{scope}"
+
+    async def versions(self, scopes: Sequence[str]) -> list[int]:
+        versions = {scope: self._versions.get(scope) for scope in scopes}
+        missing = [scope for scope, version in versions.items() if version is None]
+        if missing:
+            raw = await redis_manager.client.mget([self._version_key(scope) for scope in missing])
+            for scope, value in zip(missing, raw):
+                version = int(value) if value is not None else 0
+                self._versions.set(scope, version)
+                versions[scope] = version
+        return [versions[scope] for scope in scopes]
+
+    async def bump(self, *scopes: str) -> None:
+        if not scopes:
+            return
+        for scope in scopes:
+            self._versions.pop(scope)
+        try:
+            async with redis_manager.client.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.incr(self._version_key(scope))
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+
+    def _key(self, route: str, params: dict[str, Any], scopes: Sequence[str], versions: Sequence[int]) -> str:
+        normalized = "&".join(f"{name}={params[name]}" for name in sorted(params) if params[name] is not None)
+        stamp = ",".join(f"{scope}@{version}" for scope, version in zip(scopes, versions))
+        digest = sha1(f"{normalized}|{stamp}".encode("utf-8")).hexdigest()
+        return f"{self._namespace}:{route}:{digest}"
+
+    async def get_or_load(
+        self,
+        route: str,
+        params: dict[str, Any],
+        scopes: Sequence[str],
+        schema: type[SchemaT],
+        loader: Callable[[], Awaitable[SchemaT]],
+    ) -> SchemaT:
+        try:
+            versions = await self.versions(scopes)
+        except (RedisError, OSError) as e:
+            # without version stamps there is no safe way to tell a stale entry apart
+            print(f"RedisError: {e}")
+            return await loader()
+
+        key = self._key(route, params, scopes, versions)
+        while True:
+            value = self._local.get(key)
+            if value is not None:
+                self.local_hits += 1
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self._lead(key, schema, loader)
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _LoadAbandoned:
+                # the leader was cancelled: one of its waiters takes the load over
+                continue
+
+    async def _lead(self, key: str, schema: type[SchemaT], loader: Callable[[], Awaitable[SchemaT]]) -> SchemaT:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fetch(key, schema, loader)
+        except asyncio.CancelledError:
+            # the waiters are not cancelled with the request that happened to lead
+            future.set_exception(_LoadAbandoned())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # mark retrieved so a load failure with no waiters is not reported as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def peek(
+        self,
+        route: str,
+        params: dict[str, Any],
+        scopes: Sequence[str],
+        schema: type[SchemaT],
+    ) -> tuple[str | None, SchemaT | None]:
+        """
+        Cached entry without loading it on a miss, for values that come out of a
+        bigger load. Also returns the key a value loaded from now on is stored under
+        with `store`, None when the scope versions cannot be read.
+        """
+        try:
+            versions = await self.versions(scopes)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            return None, None
+        key = self._key(route, params, scopes, versions)
+        value = self._local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return key, value
+        return key, await self._read(key, schema)
+
+    async def store(self, key: str | None, value: BaseModel) -> None:
+        if key is None:
+            return
+        self.misses += 1
+        await self._write(key, value)
+
+    async def _read(self, key: str, schema: type[SchemaT]) -> SchemaT | None:
+        try:
+            raw = await redis_manager.client.get(key)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+            return None
+        if raw is None:
+            return None
+        self.redis_hits += 1
+        value = schema.model_validate_json(raw)
+        self._local.set(key, value)
+        return value
+
+    async def _write(self, key: str, value: BaseModel) -> None:
+        self._local.set(key, value)
+        try:
+            await redis_manager.client.set(key, value.model_dump_json(), ex=self._redis_ttl)
+        except (RedisError, OSError) as e:
+            print(f"RedisError: {e}")
+
+    async def _fetch(self, key: str, schema: type[SchemaT], loader: Callable[[], Awaitable[SchemaT]]) -> SchemaT:
+        value = await self._read(key, schema)
+        if value is not None:
+            return value
+        self.misses += 1
+        value = await loader()
+        await self._write(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "local": self._local.stats(),
+        }
+
+
+catalog_cache = ResponseCache(
+    namespace="catalog",
+    local_size=settings.cache_settings.response_cache_size,
+    local_ttl=settings.cache_settings.response_local_ttl,
+    redis_ttl=settings.cache_settings.response_redis_ttl,
+    version_ttl=settings.cache_settings.response_version_ttl,
+)
+
+
+__all__ = ("ResponseCache", "catalog_cache")
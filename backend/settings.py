@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import SecretStr  
 
@@ -6,6 +8,11 @@ class EmailSettings(BaseSettings):
     email_port: int  
     email_username: str  
     email_password: SecretStr  
+    email_use_tls: bool = True
+    email_pool_size: int = 2
+    email_batch_size: int = 20
+    email_timeout: float = 30
+    email_queue_size: int = 1000
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")  
 
@@ -28,6 +35,22 @@ class DbSettings(BaseSettings):
     db_port: int
     db_name: str
 
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+
+    db_replica_urls: list[str] = []
+    db_replica_max_lag: float = 5
+    db_replica_check_interval: float = 5
+    db_replica_eject_seconds: float = 30
+
+    # dev only: count statements per request and report repeated ones (N+1)
+    db_query_counter: bool = False
+    db_query_repeat_threshold: int = 5
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
 
@@ -53,6 +76,65 @@ class UrlSecretKeys(BaseSettings):
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
 
+class HashingSettings(BaseSettings):
+    hash_pool_kind: Literal["thread", "process"] = "thread"
+    hash_pool_workers: int = 4
+    hash_pool_max_queue: int = 64
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
+
+class CacheSettings(BaseSettings):
+    principal_cache_size: int = 10000
+    principal_local_ttl: float = 5.0
+    principal_redis_ttl: int = 300
+
+    response_cache_size: int = 10000
+    response_local_ttl: float = 30
+    response_redis_ttl: int = 300
+    response_version_ttl: float = 1
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
+
+class CelerySettings(BaseSettings):
+    celery_broker_url: str | None = None
+    celery_task_always_eager: bool = False
+    celery_email_max_retries: int = 5
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
+
+class RateLimitSettings(BaseSettings):
+    rate_limit_enabled: bool = True
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
+
+class CartSettings(BaseSettings):
+    cart_ttl: int = 30 * 24 * 3600
+    cart_anonymous_ttl: int = 7 * 24 * 3600
+    cart_max_items: int = 100
+    cart_max_quantity: int = 99
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
+
+class InventorySettings(BaseSettings):
+    # unpaid orders and their stock reservations are released after this many seconds
+    inventory_reservation_ttl: int = 15 * 60
+    inventory_reconcile_interval: float = 30.0
+    inventory_reconcile_batch_size: int = 500
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
+
+class OutboxSettings(BaseSettings):
+    outbox_batch_size: int = 200
+    outbox_poll_interval: float = 2.0
+    # batches per relay run, so one run cannot overlap the next beat tick for long
+    outbox_max_batches_per_run: int = 50
+    outbox_max_attempts: int = 10
+    outbox_retry_backoff: int = 5
+    outbox_retry_backoff_max: int = 3600
+    outbox_stream_maxlen: int = 100_000
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")
+
 class Settings(BaseSettings):   
     email_settings: EmailSettings = EmailSettings()  
     redis_settings: RedisSettings = RedisSettings()
@@ -60,6 +142,13 @@ class Settings(BaseSettings):
     jwt_settings: JwtSettings = JwtSettings()
     csrf_settings: CsrfSettings = CsrfSettings()
     url_secret_keys: UrlSecretKeys = UrlSecretKeys()
+    hashing_settings: HashingSettings = HashingSettings()
+    cache_settings: CacheSettings = CacheSettings()
+    celery_settings: CelerySettings = CelerySettings()
+    rate_limit_settings: RateLimitSettings = RateLimitSettings()
+    cart_settings: CartSettings = CartSettings()
+    inventory_settings: InventorySettings = InventorySettings()
+    outbox_settings: OutboxSettings = OutboxSettings()
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf8", extra="ignore")  
 
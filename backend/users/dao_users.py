@@ -1,42 +1,70 @@
+import datetime
 from uuid import UUID
 
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_, update
 
-from fastapi import HTTPException
+from fastapi import HTTPException, status
 
-from backend.models import User
+from backend.dao_base import BaseDao
+from backend.loader_profiles import ADMIN_USER_LIST
+from backend.models import User, UserRole
+from backend.pagination import decode_cursor, encode_cursor
 
-class UserDao:
+class UserDao(BaseDao):
 
-    def __init__(self, session: AsyncSession) -> None:
-        self.session = session
+    model = User
 
-    async def find_one_or_none(self, **user_data) -> User:
-        query = select(User).filter_by(**user_data)
-        result = await self.session.execute(query)
-        user = result.scalar_one_or_none()
-        return user
-
-    async def add_user(self, **user_data) -> User:
-        new_user = User(**user_data)
-        self.session.add(new_user)
-        return new_user
-    
-    async def delete_user_by_id(self, user_id: UUID):
+    async def insert_user(self, **user_data) -> User | None:
+        """Inserts the user; None if username, email or phone number is already taken."""
+        return await self.insert_returning(user_data)
+
+    # Writes return the affected usernames, the caller invalidates the principal cache
+    # for them once its transaction has committed.
+
+    async def delete_user_by_id(self, user_id: UUID) -> str:
         query = select(User).filter_by(id=user_id)
         result = await self.session.execute(query)
         user_to_delete = result.scalar_one_or_none()
         if user_to_delete is None:
             raise HTTPException(status_code=404, detail="User not found")
         await self.session.delete(user_to_delete)
-    
-    async def update_verification(self, email:str):
+        return user_to_delete.username
+
+    async def _update_returning_usernames(self, query) -> list[str]:
+        result = await self.session.execute(query.returning(User.username))
+        return list(result.scalars().all())
+
+    async def update_verification(self, email:str) -> list[str]:
         query = update(User).filter_by(email=email).values(is_verificated=True)
-        await self.session.execute(query)
-    
-    async def update_password(self, email: str, new_passw: str):
+        return await self._update_returning_usernames(query)
+
+    async def update_password(self, email: str, new_passw: str) -> list[str]:
         query = update(User).filter_by(email=email).values(password=new_passw)
-        await self.session.execute(query)
+        return await self._update_returning_usernames(query)
+
+    async def update_blocked(self, user_id: UUID, is_blocked: bool) -> User | None:
+        query = update(User).filter_by(id=user_id).values(is_blocked=is_blocked).returning(User)
+        return (await self.session.execute(query)).scalar_one_or_none()
+
+    async def update_role(self, user_id: UUID, role: UserRole) -> User | None:
+        query = update(User).filter_by(id=user_id).values(role=role).returning(User)
+        return (await self.session.execute(query)).scalar_one_or_none()
 
+    async def list_for_admin(self, *, limit: int, cursor: str | None = None) -> tuple[list[User], str | None]:
+        """Newest users first, keyset paginated over (created_at, id)."""
+        query = ADMIN_USER_LIST.apply(select(User))
+        if cursor is not None:
+            try:
+                created_at, last_id = decode_cursor(cursor, "users")
+                after = tuple_(datetime.datetime.fromisoformat(created_at), UUID(last_id))
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            query = query.where(tuple_(User.created_at, User.id) < after)
+        query = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
 
+        users = list((await self.session.scalars(query)).all())
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor("users", [users[-1].created_at, users[-1].id])
+        return users, next_cursor
@@ -1,11 +1,86 @@
-from fastapi import APIRouter
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+
+from backend.auth.dependencies import get_current_user, require_role
+from backend.auth.schemas import PrincipalSchema
+from backend.conditional import conditional, make_etag
+from backend.models import UserRole
+from backend.users.schemas import AdminUserPageSchema, AdminUserSchema, UserBlockSchema, UserMeSchema, UserRoleUpdateSchema
+from backend.users.service import UserAdminService, UserAdminWriteService
 
 
 router = APIRouter()
+admin_router = APIRouter(dependencies=[Depends(require_role(UserRole.ADMIN))])
+
+
+@router.get(
+    "/me",
+    status_code=status.HTTP_200_OK,
+    response_model=UserMeSchema,
+    description="Profile of the current user, revalidate with If-None-Match / If-Modified-Since",
+)
+async def get_me(
+    request: Request,
+    response: Response,
+    user: Annotated[PrincipalSchema, Depends(get_current_user)],
+) -> UserMeSchema:
+    # the principal comes from the principal cache, a 304 costs no query at all
+    me = UserMeSchema.model_validate(user, from_attributes=True)
+    not_modified = conditional(
+        request,
+        response,
+        etag=make_etag("user", me.model_dump_json()),
+        last_modified=me.updated_at,
+        cache_control="private, no-cache",
+    )
+    if not_modified is not None:
+        return not_modified
+    return me
+
+
+@admin_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=AdminUserPageSchema,
+    description="All users, newest first, paginated with an opaque cursor",
+)
+async def list_users(
+    service: Annotated[UserAdminService, Depends()],
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    cursor: str | None = None,
+) -> AdminUserPageSchema:
+    response = await service.list_users(limit=limit, cursor=cursor)
+    return response
+
+
+@admin_router.put(
+    "/{user_id}/blocked",
+    status_code=status.HTTP_200_OK,
+    response_model=AdminUserSchema,
+    description="Block or unblock a user, takes effect on their next request",
+)
+async def set_user_blocked(user_id: UUID, data: UserBlockSchema, service: Annotated[UserAdminWriteService, Depends()]) -> AdminUserSchema:
+    response = await service.set_blocked(user_id=user_id, data=data)
+    return response
+
 
+@admin_router.put(
+    "/{user_id}/role",
+    status_code=status.HTTP_200_OK,
+    response_model=AdminUserSchema,
+    description="Change the role of a user",
+)
+async def set_user_role(user_id: UUID, data: UserRoleUpdateSchema, service: Annotated[UserAdminWriteService, Depends()]) -> AdminUserSchema:
+    response = await service.set_role(user_id=user_id, data=data)
+    return response
 
 
-# @router.get(
-#     "/me"
-# )
-# async def get_me
+@admin_router.delete(
+    "/{user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description="Delete a user together with their orders and comments",
+)
+async def delete_user(user_id: UUID, service: Annotated[UserAdminWriteService, Depends()]) -> None:
+    await service.delete_user(user_id=user_id)
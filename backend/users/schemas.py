@@ -0,0 +1,44 @@
+import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, EmailStr
+
+from backend.models import UserRole
+
+
+class UserMeSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    username: str
+    email: EmailStr
+    first_name: str
+    last_name: str
+    role: UserRole
+    is_verificated: bool
+    updated_at: datetime.datetime | None = None
+
+class AdminUserSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    username: str
+    email: EmailStr
+    first_name: str
+    last_name: str
+    role: UserRole
+    is_verificated: bool
+    is_blocked: bool
+    created_at: datetime.datetime
+
+class AdminUserPageSchema(BaseModel):
+    items: list[AdminUserSchema]
+    next_cursor: str | None = None
+
+
+class UserBlockSchema(BaseModel):
+    blocked: bool
+
+
+class UserRoleUpdateSchema(BaseModel):
+    role: UserRole
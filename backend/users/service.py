@@ -0,0 +1,73 @@
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.auth.principal_cache import principal_cache
+from backend.database.db import get_read_session, get_session
+from backend.models import User
+from backend.users.dao_users import UserDao
+from backend.users.schemas import AdminUserPageSchema, AdminUserSchema, UserBlockSchema, UserRoleUpdateSchema
+
+class UserAdminService:
+
+    def __init__(self, session: AsyncSession = Depends(get_read_session)) -> None:
+        self.user_dao = UserDao(session)
+
+    async def list_users(self, *, limit: int, cursor: str | None = None) -> AdminUserPageSchema:
+        users, next_cursor = await self.user_dao.list_for_admin(limit=limit, cursor=cursor)
+        return AdminUserPageSchema(
+            items=[AdminUserSchema.model_validate(user) for user in users],
+            next_cursor=next_cursor,
+        )
+
+
+class UserAdminWriteService:
+    """Every change is committed before the principal cache is invalidated; a concurrent
+    request that read the old row earlier cannot cache it afterwards, the invalidation
+    bumps the user's generation (see PrincipalCache)."""
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.user_dao = UserDao(session)
+
+    async def _commit(self) -> None:
+        try:
+            await self.user_dao.session.commit()
+        except IntegrityError:
+            await self.user_dao.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User is still referenced"
+            )
+        except SQLAlchemyError as e:
+            await self.user_dao.session.rollback()
+            print(f"SQLAlchemyError: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Oops.. Something unexpected happened"
+            )
+
+    async def _commit_and_invalidate(self, user: User | None) -> AdminUserSchema:
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        response = AdminUserSchema.model_validate(user)
+        await self._commit()
+        await principal_cache.invalidate(response.username)
+        return response
+
+    async def set_blocked(self, *, user_id: UUID, data: UserBlockSchema) -> AdminUserSchema:
+        user = await self.user_dao.update_blocked(user_id=user_id, is_blocked=data.blocked)
+        return await self._commit_and_invalidate(user)
+
+    async def set_role(self, *, user_id: UUID, data: UserRoleUpdateSchema) -> AdminUserSchema:
+        user = await self.user_dao.update_role(user_id=user_id, role=data.role)
+        return await self._commit_and_invalidate(user)
+
+    async def delete_user(self, *, user_id: UUID) -> None:
+        username = await self.user_dao.delete_user_by_id(user_id)
+        await self._commit()
+        await principal_cache.invalidate(username)
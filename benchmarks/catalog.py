@@ -0,0 +1,112 @@
+"""
+Shared fixture of the database benchmarks: a synthetic catalog seeded with
+INSERT ... SELECT generate_series. Seeding is idempotent, a rerun only tops
+the catalog up to the requested size, so a 1M row catalog is paid for once.
+
+Point DB_* at a throwaway database, the benchmarks create the schema there.
+"""
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import Base, Category, Merchant, Product
+
+MERCHANT_PREFIX = "bench-merchant-"
+CATEGORY_PREFIX = "bench-"
+SEED_CHUNK = 100_000
+
+
+@dataclass(frozen=True)
+class Catalog:
+    merchant_ids: list[UUID]
+    category_ids: list[int]
+    products: int
+
+
+async def create_schema(session: AsyncSession) -> None:
+    connection = await session.connection()
+    await connection.run_sync(Base.metadata.create_all)
+    await session.commit()
+
+
+async def _ensure_merchants(session: AsyncSession, count: int) -> list[UUID]:
+    await session.execute(
+        text(
+            "INSERT INTO merchants (id, merchant_name, email, first_name, last_name, description, hashed_password, salt, is_active) "
+            "SELECT gen_random_uuid(), :prefix || g, :prefix || g || '@example.com', 'Bench', 'Merchant', 'benchmark merchant', '-', '-', true "
+            "FROM generate_series(0, :count - 1) AS g "
+            "ON CONFLICT (merchant_name) DO NOTHING"
+        ),
+        {"prefix": MERCHANT_PREFIX, "count": count},
+    )
+    query = select(Merchant.id).where(Merchant.merchant_name.startswith(MERCHANT_PREFIX)).order_by(Merchant.merchant_name).limit(count)
+    return list((await session.scalars(query)).all())
+
+
+async def _ensure_categories(session: AsyncSession, count: int) -> list[int]:
+    query = select(Category.id).where(Category.category_name.startswith(CATEGORY_PREFIX)).order_by(Category.id)
+    category_ids = list((await session.scalars(query)).all())
+    for index in range(len(category_ids), count):
+        category = Category(category_name=f"{CATEGORY_PREFIX}{index}")
+        session.add(category)
+        await session.flush()
+        category_ids.append(category.id)
+    return category_ids[:count]
+
+
+async def ensure_catalog(session: AsyncSession, *, products: int, merchants: int = 20, categories: int = 20) -> Catalog:
+    await create_schema(session)
+    merchant_ids = await _ensure_merchants(session, merchants)
+    category_ids = await _ensure_categories(session, categories)
+    await session.commit()
+
+    query = select(func.count()).select_from(Product).where(Product.merchant_id.in_(merchant_ids))
+    existing = await session.scalar(query)
+    if existing < products:
+        print(f"seeding {products - existing} products ...")
+        started = time.perf_counter()
+        for start in range(existing, products, SEED_CHUNK):
+            stop = min(start + SEED_CHUNK, products) - 1
+            await session.execute(
+                text(
+                    "INSERT INTO products (id, sku, product_name, product_price, product_description, product_discount, "
+                    "product_quantity, category_id, merchant_id, created_at, rating_avg) "
+                    "SELECT gen_random_uuid(), 'bench-' || g, 'Product ' || g, round((random() * 1200)::numeric, 2), "
+                    "'Benchmark product number ' || g, CASE WHEN g % 7 = 0 THEN 5 ELSE 0 END, (g * 37) % 101, "
+                    "(CAST(:category_ids AS integer[]))[1 + g % :categories], (CAST(:merchant_ids AS uuid[]))[1 + (g / 7) % :merchants], "
+                    "TIMEZONE('utc', now()) - g * interval '1 second', round((random() * 10)::numeric, 2) "
+                    "FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS g "
+                    "ON CONFLICT (merchant_id, sku) DO NOTHING"
+                ),
+                {
+                    "category_ids": category_ids,
+                    "categories": len(category_ids),
+                    "merchant_ids": merchant_ids,
+                    "merchants": len(merchant_ids),
+                    "start": start,
+                    "stop": stop,
+                },
+            )
+            await session.commit()
+        await session.execute(text("ANALYZE products"))
+        await session.commit()
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+    return Catalog(merchant_ids=merchant_ids, category_ids=category_ids, products=max(existing, products))
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name: str, samples: list[float]) -> None:
+    print(
+        f"{name:<36} median {percentile(samples, 0.5) * 1000:8.2f} ms"
+        f"   p95 {percentile(samples, 0.95) * 1000:8.2f} ms   ({len(samples)} runs)"
+    )
+
+
+__all__ = ("Catalog", "ensure_catalog", "percentile", "report")
@@ -0,0 +1,163 @@
+"""
+Oversell check for checkout: many users race for a few scarce products.
+
+    python -m benchmarks.checkout_oversell [--checkouts 500] [--products 5] [--stock 100] [--connections 50]
+
+Needs a running Postgres (DB_* settings, throwaway database); Redis is only
+used for cache invalidation and may be down. Every checkout runs concurrently
+through CheckoutService on its own session. The pool holds `--connections`
+connections, like an app worker would, and the rest of the checkouts queue for
+one. Each cart holds one to three of the contested products, so most
+checkouts lock several of the same rows.
+
+Afterwards, for every product, the stock taken out must equal the quantity
+sold in the orders that were placed, and no stock may be negative. The
+script exits non-zero otherwise. That check is the result: the 201/409 split
+and the latencies change from run to run with the order the checkouts get
+their connections in.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.auth.schemas import PrincipalSchema
+from backend.cart.store import CartOwner, InMemoryCartStore
+from backend.database.db import create_sessionmaker, standalone_session
+from backend.models import Order, OrderItem, Product, User, UserRole
+from backend.orders.schemas import CheckoutSchema
+from backend.orders.service import CheckoutService
+from backend.settings import settings
+from benchmarks.catalog import ensure_catalog, percentile
+
+USER_PREFIX = "bench-buyer-"
+SKU_PREFIX = "oversell-"
+
+
+async def ensure_users(session: AsyncSession, count: int) -> list[PrincipalSchema]:
+    query = select(User).where(User.username.startswith(USER_PREFIX)).order_by(User.username)
+    users = list((await session.scalars(query)).all())
+    if len(users) < count:
+        await session.execute(insert(User), [
+            {
+                "username": f"{USER_PREFIX}{index:05d}",
+                "email": f"{USER_PREFIX}{index:05d}@example.com",
+                "phone_number": f"+0{index:09d}",
+                "first_name": "Bench",
+                "last_name": "Buyer",
+                "password": "-",
+                "role": UserRole.USER,
+            }
+            for index in range(len(users), count)
+        ])
+        await session.commit()
+        users = list((await session.scalars(query)).all())
+    return [PrincipalSchema.model_validate(user) for user in users[:count]]
+
+
+async def reset_products(session: AsyncSession, count: int, stock: int) -> list[uuid.UUID]:
+    """The contested products, with every earlier benchmark order removed and stock refilled."""
+    catalog = await ensure_catalog(session, products=0)
+    query = select(Product.id).where(Product.sku.startswith(SKU_PREFIX)).order_by(Product.sku)
+    product_ids = list((await session.scalars(query)).all())
+    for index in range(len(product_ids), count):
+        product_ids.append(await session.scalar(insert(Product).values(
+            sku=f"{SKU_PREFIX}{index}",
+            product_name=f"Scarce product {index}",
+            product_price=10,
+            product_description="oversell benchmark",
+            product_quantity=stock,
+            category_id=catalog.category_ids[0],
+            merchant_id=catalog.merchant_ids[0],
+        ).returning(Product.id)))
+    product_ids = product_ids[:count]
+
+    orders = select(OrderItem.order_id).where(OrderItem.product_id.in_(product_ids))
+    order_ids = list((await session.scalars(orders)).all())
+    await session.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+    await session.execute(delete(Order).where(Order.id.in_(order_ids)))
+    await session.execute(
+        update(Product).where(Product.id.in_(product_ids)).values(product_quantity=stock, is_hot_inventory=False)
+    )
+    await session.commit()
+    return product_ids
+
+
+async def fill_carts(store: InMemoryCartStore, users: list[PrincipalSchema], product_ids: list[uuid.UUID]) -> None:
+    rng = random.Random(42)
+    for user in users:
+        picked = rng.sample(product_ids, k=rng.randint(1, min(3, len(product_ids))))
+        await store.add(CartOwner.user(user.id), {product_id: rng.randint(1, 3) for product_id in picked})
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with standalone_session() as session:
+        users = await ensure_users(session, args.checkouts)
+        product_ids = await reset_products(session, args.products, args.stock)
+
+    store = InMemoryCartStore(max_items=10, max_quantity=10)
+    await fill_carts(store, users, product_ids)
+    engine = create_async_engine(
+        settings.postgres_settings.postgres_url,
+        pool_size=args.connections,
+        max_overflow=0,
+        pool_timeout=600,
+    )
+    sessionmaker = create_sessionmaker(engine)
+    data = CheckoutSchema(shipping_address="Benchmark street 1", payment_method="card")
+    latencies: list[float] = []
+    outcomes: dict[int, int] = {}
+
+    async def checkout(user: PrincipalSchema) -> None:
+        started = time.perf_counter()
+        async with sessionmaker() as session:
+            try:
+                await CheckoutService(session, store).checkout(data=data, user=user)
+                code = 201
+            except HTTPException as e:
+                code = e.status_code
+        latencies.append(time.perf_counter() - started)
+        outcomes[code] = outcomes.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(checkout(user) for user in users))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    print(f"{len(users)} checkouts in {elapsed:.2f}s ({len(users) / elapsed:.0f}/s) over {args.connections} connections")
+    print(f"latency median {percentile(latencies, 0.5) * 1000:.1f} ms, p95 {percentile(latencies, 0.95) * 1000:.1f} ms")
+    print("outcomes: " + ", ".join(f"{code}: {count}" for code, count in sorted(outcomes.items())))
+
+    async with standalone_session() as session:
+        stock = dict((await session.execute(
+            select(Product.id, Product.product_quantity).where(Product.id.in_(product_ids))
+        )).all())
+        sold = dict((await session.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.product_id.in_(product_ids))
+            .group_by(OrderItem.product_id)
+        )).all())
+
+    consistent = True
+    for product_id in product_ids:
+        taken, units = args.stock - stock[product_id], sold.get(product_id, 0)
+        ok = stock[product_id] >= 0 and taken == units
+        consistent &= ok
+        print(f"  {product_id}: stock {args.stock} -> {stock[product_id]}, sold {units}{'' if ok else '  <-- MISMATCH'}")
+    print("no oversell" if consistent else "OVERSELL OR LOST STOCK")
+    if not consistent:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--products", type=int, default=5)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--connections", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Facet counts on a generated catalog: GROUPING SETS against one COUNT per facet,
+and the browse endpoint's service cold, with the facet cache warm and fully cached.
+
+    python -m benchmarks.facets [--products 1000000] [--repeat 20]
+
+Needs a running Postgres and Redis (DB_* and REDIS_* settings, throwaway
+database). "service, cold" bumps the scope before every run, so the page and
+the facets miss together and come from the single combined statement.
+"cached facets, page miss" asks for a different page size on every run, so
+the page is loaded from the database while the facets of the filter come
+from the cache.
+"""
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+
+from sqlalchemy import and_, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database.db import standalone_session
+from backend.database.redis_client import redis_manager
+from backend.models import Product
+from backend.products.dao_products import ProductDao
+from backend.products.facets import DISCOUNTED, IN_STOCK, ProductFilter, price_bucket
+from backend.products.schemas import ProductSort
+from backend.products.service import ProductService, browse_scopes
+from backend.response_cache import catalog_cache
+from benchmarks.catalog import ensure_catalog, report
+
+
+async def count_per_facet(session: AsyncSession, product_filter: ProductFilter) -> None:
+    """The naive sidebar: one statement per facet, each with all filters but its own."""
+    conditions = product_filter.facet_conditions()
+
+    def where(facet: str | None):
+        return and_(true(), *product_filter.scope(), *(condition for name, condition in conditions.items() if name != facet))
+
+    await session.scalar(select(func.count()).select_from(Product).where(where(None)))
+    await session.execute(select(Product.category_id, func.count()).where(where(None)).group_by(Product.category_id))
+    await session.execute(select(Product.merchant_id, func.count()).where(where("merchant")).group_by(Product.merchant_id))
+    bucket = price_bucket()
+    await session.execute(select(bucket, func.count()).where(where("price")).group_by(bucket))
+    await session.scalar(select(func.count()).select_from(Product).where(where("in_stock"), IN_STOCK))
+    await session.scalar(select(func.count()).select_from(Product).where(where("discounted"), DISCOUNTED))
+
+
+async def timed(repeat: int, run) -> list[float]:
+    samples = []
+    for index in range(repeat):
+        started = time.perf_counter()
+        await run(index)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with standalone_session() as session:
+        catalog = await ensure_catalog(session, products=args.products)
+        dao = ProductDao(session)
+        service = ProductService(session)
+        scenarios = {
+            "whole catalog": ProductFilter(),
+            "hot category": ProductFilter(category_id=catalog.category_ids[0]),
+            "category + price + in stock": ProductFilter(
+                category_id=catalog.category_ids[0], min_price=Decimal(50), max_price=Decimal(500), in_stock=True,
+            ),
+        }
+        for name, product_filter in scenarios.items():
+            print(f"-- {name}")
+            report("one COUNT per facet (6 statements)", await timed(args.repeat, lambda _: count_per_facet(session, product_filter)))
+            report("grouping sets, uncached", await timed(args.repeat, lambda _: dao.find_facets(product_filter)))
+            report("page only", await timed(args.repeat, lambda _: dao.browse_page(
+                product_filter=product_filter, sort=ProductSort.NEWEST, limit=20,
+            )))
+            report("page + facets, one statement", await timed(args.repeat, lambda _: dao.browse_page_with_facets(
+                product_filter=product_filter, sort=ProductSort.NEWEST, limit=20,
+            )))
+            session.expunge_all()
+
+            async def cold(_):
+                await catalog_cache.bump(*browse_scopes(product_filter.category_id))
+                await service.browse_products(product_filter=product_filter, sort=ProductSort.NEWEST, limit=20)
+
+            report("service, cold", await timed(args.repeat, cold))
+            session.expunge_all()
+            await catalog_cache.bump(*browse_scopes(product_filter.category_id))
+            await service.browse_products(product_filter=product_filter, sort=ProductSort.NEWEST, limit=20)
+            report("cached facets, page miss", await timed(args.repeat, lambda index: service.browse_products(
+                product_filter=product_filter, sort=ProductSort.NEWEST, limit=21 + index,
+            )))
+            report("cached facets and page", await timed(args.repeat, lambda _: service.browse_products(
+                product_filter=product_filter, sort=ProductSort.NEWEST, limit=20,
+            )))
+            session.expunge_all()
+    await redis_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""
+Latency of ProductDao.list_page by page depth, against OFFSET paging as a control.
+
+    python -m benchmarks.keyset_pagination [--products 1000000] [--limit 20] [--pages 1 100 10000]
+
+Needs a running Postgres (DB_* settings, throwaway database). The catalog is
+walked once through the cursors to reach every measured page, then each page
+is fetched `--repeat` times. Keyset latency should stay flat from the first
+to the last page, OFFSET latency grows with the depth.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from backend.database.db import standalone_session
+from backend.loader_profiles import PRODUCT_CARD
+from backend.models import Product
+from backend.products.dao_products import ProductDao
+from backend.products.schemas import ProductSort
+from benchmarks.catalog import ensure_catalog, report
+
+
+async def collect_cursors(dao: ProductDao, sort: ProductSort, limit: int, pages: list[int]) -> dict[int, str | None]:
+    """Cursor that opens each requested page, page 1 has none."""
+    wanted, cursors = set(pages), {}
+    cursor = None
+    for page in range(1, max(pages) + 1):
+        if page in wanted:
+            cursors[page] = cursor
+        _, cursor = await dao.list_page(sort=sort, limit=limit, cursor=cursor)
+        dao.session.expunge_all()
+        if cursor is None and page < max(pages):
+            raise SystemExit(f"catalog ends at page {page}, seed more products or ask for fewer pages")
+    return cursors
+
+
+async def time_keyset(dao: ProductDao, sort: ProductSort, limit: int, cursor: str | None, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await dao.list_page(sort=sort, limit=limit, cursor=cursor)
+        samples.append(time.perf_counter() - started)
+        dao.session.expunge_all()
+    return samples
+
+
+async def time_offset(dao: ProductDao, limit: int, page: int, repeat: int) -> list[float]:
+    query = (
+        PRODUCT_CARD.apply(select(Product))
+        .order_by(Product.product_price.asc(), Product.id.asc())
+        .offset((page - 1) * limit)
+        .limit(limit + 1)
+    )
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        (await dao.session.scalars(query)).all()
+        samples.append(time.perf_counter() - started)
+        dao.session.expunge_all()
+    return samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with standalone_session() as session:
+        catalog = await ensure_catalog(session, products=args.products)
+        print(f"{catalog.products} products, {args.limit} per page, {args.repeat} runs per page")
+        dao = ProductDao(session)
+        sort = ProductSort.PRICE_ASC
+        cursors = await collect_cursors(dao, sort, args.limit, args.pages)
+        for page in args.pages:
+            report(f"keyset  page {page}", await time_keyset(dao, sort, args.limit, cursors[page], args.repeat))
+        for page in args.pages:
+            report(f"offset  page {page}", await time_offset(dao, args.limit, page, args.repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+"""
+Settings are read from the environment like the app's, the defaults below only
+make the backend importable. Tests that need Postgres are skipped unless DB_*
+points at a reachable server: use a throwaway database, the tests create the
+schema there and empty the tables they use.
+"""
+import os
+
+import pytest
+
+for name, value in {
+    "EMAIL_HOST": "localhost",
+    "EMAIL_PORT": "1025",
+    "EMAIL_USERNAME": "shop@example.com",
+    "EMAIL_PASSWORD": "test",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_DB": "0",
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+    "SECRET_KEY_CSRF": "test",
+    "SALT_CSRF": "test",
+    "SECRET_KEY_URL_REG": "test",
+    "SECRET_KEY_URL_PWD": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+import asyncpg  # noqa: E402
+from sqlalchemy.exc import SQLAlchemyError  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from backend.database.db import create_sessionmaker  # noqa: E402
+from backend.models import Base  # noqa: E402
+from backend.settings import settings  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def sessionmaker():
+    engine = create_async_engine(settings.postgres_settings.postgres_url)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    except (SQLAlchemyError, asyncpg.PostgresError, OSError) as e:
+        await engine.dispose()
+        pytest.skip(f"needs Postgres: {e}")
+    yield create_sessionmaker(engine)
+    await engine.dispose()
@@ -0,0 +1,146 @@
+"""
+InMemoryCartStore stands in for RedisCartStore in tests, so both run the same
+cases: the Redis store against fakeredis, which runs the Lua scripts.
+"""
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import fakeredis
+import pytest
+
+from backend.cart.service import CartService
+from backend.cart.store import CartFullError, CartOwner, InMemoryCartStore, RedisCartStore
+from backend.database.redis_client import redis_manager
+from backend.products.hot_inventory import hot_inventory
+
+
+pytestmark = pytest.mark.anyio
+
+MAX_ITEMS = 3
+MAX_QUANTITY = 5
+
+
+@pytest.fixture
+async def fake_redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(redis_manager, "_client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "redis":
+        request.getfixturevalue("fake_redis")
+        return RedisCartStore(max_items=MAX_ITEMS, max_quantity=MAX_QUANTITY)
+    return InMemoryCartStore(max_items=MAX_ITEMS, max_quantity=MAX_QUANTITY)
+
+
+@pytest.fixture
+def owner():
+    return CartOwner(f"user:{uuid4()}", 60)
+
+
+async def test_add_sums_quantities(store, owner):
+    product_id = uuid4()
+    await store.add(owner, {product_id: 1})
+    assert await store.add(owner, {product_id: 2}) == {product_id: 3}
+    assert await store.get(owner) == {product_id: 3}
+
+
+async def test_add_caps_quantity(store, owner):
+    product_id = uuid4()
+    assert await store.add(owner, {product_id: MAX_QUANTITY + 10}) == {product_id: MAX_QUANTITY}
+    assert await store.add(owner, {product_id: 1}) == {product_id: MAX_QUANTITY}
+
+
+async def test_add_rejects_lines_over_max_items(store, owner):
+    first = {uuid4(): 1 for _ in range(MAX_ITEMS - 1)}
+    await store.add(owner, first)
+    with pytest.raises(CartFullError):
+        await store.add(owner, {uuid4(): 1, uuid4(): 1})
+    # all or nothing: the cart is unchanged
+    assert await store.get(owner) == first
+    # lines already in the cart do not count against the limit
+    existing = next(iter(first))
+    cart = await store.add(owner, {existing: 1, uuid4(): 1})
+    assert len(cart) == MAX_ITEMS
+    assert cart[existing] == 2
+
+
+async def test_set_quantity(store, owner):
+    product_id = uuid4()
+    await store.add(owner, {product_id: 1})
+    assert await store.set_quantity(owner, product_id, 4) == {product_id: 4}
+    assert await store.set_quantity(owner, product_id, MAX_QUANTITY + 1) == {product_id: MAX_QUANTITY}
+    assert await store.set_quantity(owner, product_id, 0) == {}
+
+
+async def test_set_quantity_after_remove_returns_none(store, owner):
+    product_id, other_id = uuid4(), uuid4()
+    await store.add(owner, {product_id: 1, other_id: 1})
+    await store.remove(owner, [product_id])
+    assert await store.set_quantity(owner, product_id, 2) is None
+    assert await store.get(owner) == {other_id: 1}
+
+
+async def test_clear(store, owner):
+    await store.add(owner, {uuid4(): 1})
+    await store.clear(owner)
+    assert await store.get(owner) == {}
+
+
+async def test_merge_on_login(store, owner):
+    anonymous = CartOwner(f"anon:{uuid4()}", 60)
+    shared, kept, extra, dropped = uuid4(), uuid4(), uuid4(), uuid4()
+    await store.add(owner, {shared: 4, kept: 1})
+    await store.add(anonymous, {shared: 3, extra: 2, dropped: 1})
+
+    merged = await store.merge(anonymous, owner)
+
+    # the shared line is capped, only one new line fits next to the two already there
+    cart = await store.get(owner)
+    assert merged == 2
+    assert len(cart) == MAX_ITEMS
+    assert cart[shared] == MAX_QUANTITY
+    assert cart[kept] == 1
+    assert await store.get(anonymous) == {}
+
+
+class PriceDao:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def find_prices(self, product_ids):
+        return {product_id: self.rows[product_id] for product_id in product_ids if product_id in self.rows}
+
+
+def price_row(product_id, quantity, *, hot=False):
+    return SimpleNamespace(
+        id=product_id,
+        product_name="Mug",
+        product_price=Decimal("10"),
+        product_discount=Decimal("0"),
+        product_quantity=quantity,
+        is_hot_inventory=hot,
+    )
+
+
+async def test_availability_of_hot_products_comes_from_the_counter(fake_redis, owner):
+    regular, hot, unseeded = uuid4(), uuid4(), uuid4()
+    store = InMemoryCartStore(max_items=MAX_ITEMS, max_quantity=MAX_QUANTITY)
+    service = CartService(session=None, store=store)
+    # product_quantity of hot products is stale: the counters were sold down since the last write-back
+    service.product_dao = PriceDao({
+        regular: price_row(regular, 10),
+        hot: price_row(hot, 10, hot=True),
+        unseeded: price_row(unseeded, 10, hot=True),
+    })
+    await hot_inventory.seed({hot: 1})
+    await store.add(owner, {regular: 2, hot: 2, unseeded: 2})
+
+    cart = await service.get_cart(owner=owner)
+
+    available = {line.product_id: line.available for line in cart.items}
+    assert available == {regular: True, hot: False, unseeded: False}
@@ -0,0 +1,53 @@
+import pytest
+
+from backend.products.importer import RowError, iter_csv_rows, iter_lines
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def parse(text: str, chunk_size: int = 7) -> list:
+    async def chunks():
+        data = text.encode("utf-8")
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    return [row async for row in iter_csv_rows(iter_lines(chunks()))]
+
+
+async def test_rows_are_numbered_by_record():
+    rows = await parse("sku,product_name\r\nA-1,Mug\r\n\r\nA-2,Cup\r\n")
+    assert rows == [(2, {"sku": "A-1", "product_name": "Mug"}), (4, {"sku": "A-2", "product_name": "Cup"})]
+
+
+async def test_quoted_fields_span_lines():
+    rows = await parse(
+        'sku,product_description,product_name\n'
+        'A-1,"Holds 300 ml.\n\nDishwasher safe, ""stackable""",Mug\n'
+        'A-2,,"Cup\r\n"\n'
+    )
+    assert rows == [
+        (2, {"sku": "A-1", "product_description": 'Holds 300 ml.\n\nDishwasher safe, "stackable"', "product_name": "Mug"}),
+        (3, {"sku": "A-2", "product_name": "Cup\n"}),
+    ]
+
+
+async def test_quote_inside_an_unquoted_field_is_literal():
+    rows = await parse('sku,product_name\nA-1,12" pizza plate\nA-2,Cup\n')
+    assert rows == [(2, {"sku": "A-1", "product_name": '12" pizza plate'}), (3, {"sku": "A-2", "product_name": "Cup"})]
+
+
+async def test_column_count_errors_name_the_record():
+    rows = await parse('sku,product_name\nA-1,"Mug\nwith lid"\nA-2\nA-3,Cup\n')
+    record_no, error = rows[1]
+    assert record_no == 3
+    assert isinstance(error, RowError)
+    assert rows[2] == (4, {"sku": "A-3", "product_name": "Cup"})
+
+
+async def test_unterminated_quote_is_reported():
+    rows = await parse('sku,product_name\nA-1,Mug\nA-2,"Cup\n')
+    assert rows[0] == (2, {"sku": "A-1", "product_name": "Mug"})
+    record_no, error = rows[1]
+    assert record_no == 3
+    assert isinstance(error, RowError)
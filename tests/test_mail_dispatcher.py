@@ -0,0 +1,160 @@
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+
+from backend.mail.dispatcher import MailDispatcher, MailDispatcherClosedError
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingHandler:
+    """Keeps what the server accepted; can drop a connection or refuse a recipient on request."""
+
+    def __init__(self) -> None:
+        self.delivered: list[tuple[tuple, str]] = []
+        self.drop_next = False
+        self.refused: set[str] = set()
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        if self.drop_next:
+            self.drop_next = False
+            server.transport.close()
+            return "421 Closing connection"
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.append((session.peer, envelope.rcpt_tos[0]))
+        return "250 OK"
+
+    @property
+    def recipients(self) -> list[str]:
+        return [recipient for _, recipient in self.delivered]
+
+    @property
+    def connections(self) -> set[tuple]:
+        return {peer for peer, _ in self.delivered}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+async def make_dispatcher(smtp_server):
+    _, port = smtp_server
+    dispatchers = []
+
+    def make(**options) -> MailDispatcher:
+        dispatcher = MailDispatcher(hostname="127.0.0.1", port=port, use_tls=False, timeout=5, **options)
+        dispatchers.append(dispatcher)
+        return dispatcher
+
+    yield make
+    for dispatcher in dispatchers:
+        await dispatcher.close()
+
+
+def message(to_email: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg.set_content("test")
+    msg["From"] = "shop@example.com"
+    msg["To"] = to_email
+    msg["Subject"] = "Test"
+    return msg
+
+
+def recipients(count: int, prefix: str = "user") -> list[str]:
+    return [f"{prefix}{index}@example.com" for index in range(count)]
+
+
+async def test_concurrent_sends_share_the_pooled_connections(smtp_server, make_dispatcher):
+    handler, _ = smtp_server
+    dispatcher = make_dispatcher(pool_size=2, batch_size=1)
+
+    await asyncio.gather(*(dispatcher.send(message(to)) for to in recipients(10)))
+    for to in recipients(5, prefix="later"):
+        await dispatcher.send(message(to))
+
+    assert sorted(handler.recipients) == sorted(recipients(10) + recipients(5, prefix="later"))
+    assert len(handler.connections) == 2
+
+
+async def test_queued_messages_are_sent_in_batches(smtp_server, make_dispatcher):
+    handler, _ = smtp_server
+    dispatcher = make_dispatcher(pool_size=1, batch_size=5)
+
+    await asyncio.gather(*(dispatcher.send(message(to)) for to in recipients(12)))
+
+    # one connection, messages go out in queue order
+    assert handler.recipients == recipients(12)
+    assert len(handler.connections) == 1
+    assert dispatcher.stats()["batches"] == 3
+
+
+async def test_dropped_connection_is_reopened_and_the_message_resent(smtp_server, make_dispatcher):
+    handler, _ = smtp_server
+    dispatcher = make_dispatcher(pool_size=1)
+
+    await dispatcher.send(message("first@example.com"))
+    handler.drop_next = True
+    await dispatcher.send(message("second@example.com"))
+
+    assert handler.recipients == ["first@example.com", "second@example.com"]
+    assert len(handler.connections) == 2
+    assert dispatcher.stats()["reconnects"] == 1
+
+
+async def test_counters(smtp_server, make_dispatcher):
+    handler, _ = smtp_server
+    handler.refused.add("nobody@example.com")
+    dispatcher = make_dispatcher(pool_size=1)
+
+    results = await asyncio.gather(
+        *(dispatcher.send(message(to)) for to in ["a@example.com", "nobody@example.com", "b@example.com"]),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], aiosmtplib.SMTPRecipientsRefused)
+    assert results[0] is None and results[2] is None
+    stats = dispatcher.stats()
+    assert stats["sent"] == 2
+    assert stats["failed"] == 1
+    assert stats["queued"] == 0
+    assert 0 < stats["avg_latency"] <= stats["max_latency"]
+
+
+async def test_close_fails_messages_still_queued(smtp_server, make_dispatcher):
+    handler, _ = smtp_server
+    dispatcher = make_dispatcher(pool_size=1, batch_size=1)
+
+    sends = [asyncio.ensure_future(dispatcher.send(message(to))) for to in recipients(5)]
+    # let the sends queue up; the single worker picks the first one
+    await asyncio.sleep(0)
+    await dispatcher.close()
+    results = await asyncio.gather(*sends, return_exceptions=True)
+
+    assert all(isinstance(result, MailDispatcherClosedError) for result in results)
+    assert handler.recipients == []
+    assert dispatcher.stats()["failed"] == 5
@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from backend.models import OutboxEvent
+from backend.outbox.dao_outbox import OutboxDao
+from backend.outbox.events import OutboxEventType, outbox_event
+from backend.outbox.relay import utcnow
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def outbox(sessionmaker):
+    async with sessionmaker() as session:
+        await session.execute(delete(OutboxEvent))
+        await session.commit()
+    yield sessionmaker
+    async with sessionmaker() as session:
+        await session.execute(delete(OutboxEvent))
+        await session.commit()
+
+
+async def add_events(sessionmaker, *aggregate_ids: str) -> list[int]:
+    """One event per aggregate id, in order; returns their ids."""
+    async with sessionmaker() as session:
+        await OutboxDao(session).add(*(
+            outbox_event(OutboxEventType.ORDER_PLACED, aggregate_type="order", aggregate_id=aggregate_id, payload={"n": n})
+            for n, aggregate_id in enumerate(aggregate_ids)
+        ))
+        await session.commit()
+        return list((await session.scalars(select(OutboxEvent.id).order_by(OutboxEvent.id))).all())
+
+
+async def claim_ids(session, limit: int = 10, now: datetime.datetime | None = None) -> list[int]:
+    return [event.id for event in await OutboxDao(session).claim(limit, now or utcnow())]
+
+
+async def settle(sessionmaker, event_id: int, **values) -> None:
+    async with sessionmaker() as session:
+        await session.execute(update(OutboxEvent).where(OutboxEvent.id == event_id).values(**values))
+        await session.commit()
+
+
+async def test_claims_only_the_oldest_unfinished_event_per_aggregate(outbox):
+    a1, b1, a2, a3 = await add_events(outbox, "a", "b", "a", "a")
+    async with outbox() as session:
+        assert await claim_ids(session) == [a1, b1]
+
+    await settle(outbox, a1, published_at=utcnow())
+    async with outbox() as session:
+        assert await claim_ids(session) == [b1, a2]
+
+
+async def test_claim_respects_limit_and_id_order(outbox):
+    ids = await add_events(outbox, "a", "b", "c", "d")
+    async with outbox() as session:
+        assert await claim_ids(session, limit=2) == ids[:2]
+
+
+async def test_backed_off_event_is_not_due_and_holds_back_its_aggregate(outbox):
+    a1, a2, b1 = await add_events(outbox, "a", "a", "b")
+    later = utcnow() + datetime.timedelta(minutes=5)
+    await settle(outbox, a1, next_attempt_at=later, attempts=1)
+    async with outbox() as session:
+        assert await claim_ids(session) == [b1]
+    async with outbox() as session:
+        assert await claim_ids(session, now=later) == [a1, b1]
+
+
+async def test_given_up_event_no_longer_blocks_its_aggregate(outbox):
+    a1, a2 = await add_events(outbox, "a", "a")
+    await settle(outbox, a1, failed_at=utcnow(), attempts=10)
+    async with outbox() as session:
+        assert await claim_ids(session) == [a2]
+
+
+async def test_concurrent_relays_claim_disjoint_events(outbox):
+    a1, b1, c1 = await add_events(outbox, "a", "b", "c")
+    async with outbox() as first, outbox() as second:
+        # the first relay's transaction stays open and keeps its rows locked
+        assert await claim_ids(first, limit=2) == [a1, b1]
+        assert await claim_ids(second) == [c1]
+        await first.rollback()
+        await second.rollback()
+    async with outbox() as session:
+        assert await claim_ids(session) == [a1, b1, c1]
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import fakeredis
+import pytest
+
+from backend.auth.principal_cache import PrincipalCache
+from backend.database.redis_client import redis_manager
+from backend.models import UserRole
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def fake_redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(redis_manager, "_client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return PrincipalCache(maxsize=100, local_ttl=60, redis_ttl=60)
+
+
+def user(*, is_blocked: bool = False):
+    return SimpleNamespace(
+        id=uuid4(),
+        username="alice",
+        email="alice@example.com",
+        first_name="Alice",
+        last_name="Smith",
+        role=UserRole.USER,
+        is_blocked=is_blocked,
+    )
+
+
+def loader(row):
+    async def load():
+        return row
+    return load
+
+
+async def test_loaded_principal_is_cached(cache):
+    await cache.get("alice", loader(user()))
+    principal = await cache.get("alice", loader(None))
+    assert principal.username == "alice"
+
+
+async def test_invalidate_drops_the_entry(cache):
+    await cache.get("alice", loader(user()))
+    await cache.invalidate("alice")
+    principal = await cache.get("alice", loader(user(is_blocked=True)))
+    assert principal.is_blocked
+
+
+async def test_load_that_raced_an_invalidation_is_not_cached(cache, fake_redis):
+    stale = user()
+
+    async def load_then_commit():
+        # the row was read, then another request commits a change and invalidates
+        await cache.invalidate("alice")
+        return stale
+
+    principal = await cache.get("alice", load_then_commit)
+
+    # the request itself goes on with what it read, nobody after it does
+    assert not principal.is_blocked
+    assert await fake_redis.get(cache._key("alice")) is None
+    fresh = await cache.get("alice", loader(user(is_blocked=True)))
+    assert fresh.is_blocked
+
+
+async def test_redis_down_falls_back_to_loading(cache, monkeypatch):
+    class Down:
+        async def mget(self, keys):
+            raise ConnectionError("down")
+
+    monkeypatch.setattr(redis_manager, "_client", Down())
+    principal = await cache.get("alice", loader(user()))
+    assert principal.username == "alice"
@@ -0,0 +1,81 @@
+import asyncio
+
+import fakeredis
+import pytest
+from pydantic import BaseModel
+
+from backend.database.redis_client import redis_manager
+from backend.response_cache import ResponseCache
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Page(BaseModel):
+    loaded_by: str
+
+
+@pytest.fixture
+async def cache(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(redis_manager, "_client", client)
+    yield ResponseCache(namespace="test", local_size=100, local_ttl=60, redis_ttl=60, version_ttl=60)
+    await client.aclose()
+
+
+def get(cache: ResponseCache, loader):
+    return cache.get_or_load("page", {"page": 1}, ["scope"], Page, loader)
+
+
+async def test_concurrent_misses_share_one_load(cache):
+    release = asyncio.Event()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await release.wait()
+        return Page(loaded_by="leader")
+
+    tasks = [asyncio.create_task(get(cache, load)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert [page.loaded_by for page in await asyncio.gather(*tasks)] == ["leader"] * 5
+    assert calls == [1]
+    assert cache.coalesced == 4
+
+
+async def test_waiter_takes_over_when_the_leader_is_cancelled(cache):
+    never = asyncio.Event()
+
+    async def load_forever():
+        await never.wait()
+
+    async def load():
+        return Page(loaded_by="waiter")
+
+    leader = asyncio.create_task(get(cache, load_forever))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(get(cache, load))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert (await waiter).loaded_by == "waiter"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert (await get(cache, load_forever)).loaded_by == "waiter"
+
+
+async def test_load_failure_reaches_the_waiters(cache):
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        raise ValueError("broken")
+
+    tasks = [asyncio.create_task(get(cache, load)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
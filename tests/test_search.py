@@ -0,0 +1,117 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.products.schemas import ProductResponseSchema
+from backend.products.search import InMemorySearchBackend, SearchQuery, tokenize
+
+pytestmark = pytest.mark.anyio
+
+MERCHANT_ID = uuid.uuid4()
+
+# product texts and the lexemes to_tsvector('simple', ...) gives for them
+PARSER_SAMPLES = {
+    "Wi-Fi router_x2 v1.2": ["wi-fi", "wi", "fi", "router", "x2", "v1.2"],
+    "3.5mm jack": ["3.5", "mm", "jack"],
+    "Café crème": ["café", "crème"],
+    "user@example.com www.shop.com": ["user@example.com", "www.shop.com"],
+    "O'Reilly book: Python 3.12 (2nd ed.)": ["o", "reilly", "book", "python", "3.12", "2nd", "ed"],
+    "Sony WH-1000XM4, 10,5 kg": ["sony", "wh-1000xm4", "wh", "1000xm4", "10", "5", "kg"],
+}
+
+
+def product(name: str, description: str = "", *, category_id: int = 1, price: str = "10") -> ProductResponseSchema:
+    return ProductResponseSchema(
+        id=uuid.uuid4(),
+        product_name=name,
+        product_description=description,
+        product_price=Decimal(price),
+        product_discount=Decimal(0),
+        product_quantity=1,
+        category_id=category_id,
+        merchant_id=MERCHANT_ID,
+        created_at=datetime.datetime(2026, 1, 1),
+    )
+
+
+def index(*products) -> InMemorySearchBackend:
+    backend = InMemorySearchBackend()
+    for item in products:
+        backend.add(item)
+    return backend
+
+
+async def names(backend: InMemorySearchBackend, text: str, **filters) -> list[str]:
+    return [item.product_name for item in await backend.search(SearchQuery(text=text, **filters))]
+
+
+@pytest.mark.parametrize("text, lexemes", PARSER_SAMPLES.items())
+def test_tokenize_follows_the_postgres_parser(text, lexemes):
+    assert tokenize(text) == lexemes
+
+
+async def test_tokenize_matches_to_tsvector(sessionmaker):
+    async with sessionmaker() as session:
+        for text in PARSER_SAMPLES:
+            lexemes = await session.scalar(select(func.tsvector_to_array(func.to_tsvector("simple", text))))
+            assert sorted(lexemes) == sorted(set(tokenize(text)))
+
+
+async def test_name_match_ranks_above_description_match():
+    backend = index(
+        product("Kettle", "comes with a free mug"),
+        product("Mug", "ceramic"),
+        product("Mug warmer", "keeps a mug warm"),
+    )
+    assert await names(backend, "mug") == ["Mug warmer", "Mug", "Kettle"]
+
+
+async def test_every_word_must_match():
+    backend = index(
+        product("Steel water bottle"),
+        product("Glass water bottle"),
+        product("Steel pan"),
+    )
+    assert await names(backend, "steel bottle") == ["Steel water bottle"]
+    assert await names(backend, "steel cup") == []
+
+
+async def test_words_match_as_prefixes():
+    backend = index(product("Headphones"), product("Headband"), product("Phone case"))
+    assert sorted(await names(backend, "head")) == ["Headband", "Headphones"]
+    assert await names(backend, "phon") == ["Phone case"]
+    assert await names(backend, "headphonez") == []
+
+
+async def test_hyphenated_words_match_whole_and_by_part():
+    backend = index(product("Wi-Fi router"), product("Hi-Fi speaker"))
+    assert await names(backend, "wi-fi") == ["Wi-Fi router"]
+    assert sorted(await names(backend, "fi")) == ["Hi-Fi speaker", "Wi-Fi router"]
+
+
+async def test_category_and_price_filters():
+    backend = index(
+        product("Lamp cheap", category_id=1, price="5"),
+        product("Lamp mid", category_id=1, price="50"),
+        product("Lamp dear", category_id=1, price="500"),
+        product("Lamp other", category_id=2, price="50"),
+    )
+    assert sorted(await names(backend, "lamp", category_id=1)) == ["Lamp cheap", "Lamp dear", "Lamp mid"]
+    assert sorted(await names(backend, "lamp", min_price=Decimal(50))) == ["Lamp dear", "Lamp mid", "Lamp other"]
+    assert await names(backend, "lamp", category_id=1, min_price=Decimal(10), max_price=Decimal(50)) == ["Lamp mid"]
+
+
+async def test_limit_offset_and_removal():
+    items = [product(f"Cable {index}") for index in range(5)]
+    backend = index(*items)
+    first = await names(backend, "cable", limit=2)
+    second = await names(backend, "cable", limit=2, offset=2)
+    assert len(first) == 2 and len(second) == 2 and not set(first) & set(second)
+
+    for item in items[:4]:
+        backend.remove(item.id)
+    assert await names(backend, "cable") == ["Cable 4"]
+    assert await names(backend, "") == []